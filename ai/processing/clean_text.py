@@ -1,12 +1,13 @@
-import json
 import easyocr
 import os
 
+from utils.records import RecordWriter, iter_records
+
 input_folder = "data/processed"
 input_files = [
-    "top10_redbubble.json",
-    "top10_society6.json",
-    "top10_threadless.json"
+    "top10_redbubble.jsonl",
+    "top10_society6.jsonl",
+    "top10_threadless.jsonl"
 ]
 max_items_per_file = 10
 
@@ -23,36 +24,32 @@ def has_text(image_path, min_chars=3):
     return len(extracted_text.strip()) >= min_chars
 
 
-# Process each JSON file
+# Process each JSONL file
 for file_name in input_files:
     file_path = os.path.join(input_folder, file_name)
 
     if not os.path.exists(file_path):
-        print(f"JSON file not found: {file_path}")
+        print(f"JSONL file not found: {file_path}")
         continue
 
-    # Load JSON
-    with open(file_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    filtered_data = []
-    for item in data:
-        if len(filtered_data) >= max_items_per_file:
-            break  # Stop once we have 10 items
-
-        image_path = item.get("local_image_url")
-        cropped_path = item.get("local_cropped_url")
-
-        # Check both image paths
-        if (image_path and has_text(image_path)) or (cropped_path and has_text(cropped_path)):
-            print(f"Skipping {image_path} / {cropped_path} (text detected)")
-        else:
-            print(f"Keeping {image_path} / {cropped_path} (no text)")
-            filtered_data.append(item)
-
-    # Overwrite JSON file with filtered content (max 10 items)
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(filtered_data, f, indent=2, ensure_ascii=False)
-
-    print(f"\n {file_name}: Kept {len(filtered_data)} items "
-          f"(removed {len(data) - len(filtered_data)} with text).\n")
+    # Overwrite the file with the filtered content (max 10 items), streamed
+    # so the items after the 10th are never read
+    checked = 0
+    with RecordWriter(file_path) as out:
+        for item in iter_records(file_path):
+            if out.count >= max_items_per_file:
+                break  # Stop once we have 10 items
+            checked += 1
+
+            image_path = item.get("local_image_url")
+            cropped_path = item.get("local_cropped_url")
+
+            # Check both image paths
+            if (image_path and has_text(image_path)) or (cropped_path and has_text(cropped_path)):
+                print(f"Skipping {image_path} / {cropped_path} (text detected)")
+            else:
+                print(f"Keeping {image_path} / {cropped_path} (no text)")
+                out.write(item)
+
+    print(f"\n {file_name}: Kept {out.count} items "
+          f"(removed {checked - out.count} with text).\n")
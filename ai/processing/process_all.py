@@ -6,91 +6,108 @@ from utils.image_download import download_image
 from utils.crop_images import process_source_images
 from utils.blip_caption import generate_caption
 from utils.clip_tags import generate_tags, design_tags
+from utils.embeddings import save_embeddings
 from utils.description_generator import generate_descriptions
+from utils.dedup import DesignIndex, drop_duplicates
+from utils.records import RecordWriter, iter_records
 
 
-def process_all_for_source(source, prefix="", mode="top10"):
-    """Run download, crop, BLIP captioning, cleaning, and CLIP tagging for a single source."""
+def process_all_for_source(source, prefix="", mode="top10", design_index=None):
+    """
+    Run download, crop, dedup, BLIP captioning, cleaning, and CLIP tagging for a single source.
+
+    Each step streams the source's records from one JSON Lines file to the
+    next, so only the item being worked on is held in memory. With a
+    `design_index` (shared across sources), designs that near-duplicate one
+    seen earlier are dropped before captioning and listed in
+    `<source>_duplicates.jsonl` instead.
+    """
     
     # Setting up paths
-    raw_json = os.path.join("data", "raw", f"{prefix}{source}.json")
-    processed_json = os.path.join("data", "processed", f"{prefix}{source}.json")
+    raw_jsonl = os.path.join("data", "raw", f"{prefix}{source}.jsonl")
+    processed_jsonl = os.path.join("data", "processed", f"{prefix}{source}.jsonl")
     
-    if not os.path.exists(raw_json):
-        print(f"Raw JSON not found for source '{source}': {raw_json}")
+    if not os.path.exists(raw_jsonl):
+        print(f"Raw JSONL not found for source '{source}': {raw_jsonl}")
         return
     
     # Download images (skip if already exists)
-    with open(raw_json, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    
     image_subfolder = os.path.join("top10" if mode=="top10" else "raw", source)
     full_image_dir = os.path.join("data", "images", image_subfolder)
     os.makedirs(full_image_dir, exist_ok=True)
+    os.makedirs(os.path.dirname(processed_jsonl), exist_ok=True)
     
-    for i, item in enumerate(data):
-        url = item.get("image_url")
-        if not url:
-            continue
-        filename = f"{i}.jpg"
-        local_path = os.path.join(full_image_dir, filename)
-        if not os.path.exists(local_path):
-            local_path = download_image(url, image_subfolder, filename)
-        if local_path:
-            item["local_image_url"] = local_path
-    
-    # Save after download
-    os.makedirs(os.path.dirname(processed_json), exist_ok=True)
-    with open(processed_json, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    print(f"Images info saved: {processed_json}")
+    with RecordWriter(processed_jsonl) as out:
+        for i, item in enumerate(iter_records(raw_jsonl)):
+            url = item.get("image_url")
+            if url:
+                filename = f"{i}.jpg"
+                local_path = os.path.join(full_image_dir, filename)
+                if not os.path.exists(local_path):
+                    local_path = download_image(url, image_subfolder, filename)
+                if local_path:
+                    item["local_image_url"] = local_path
+            out.write(item)
+    print(f"Images info saved: {processed_jsonl}")
     
     # Crop images
-    process_source_images(source, processed_json, mode=mode)
-    
+    process_source_images(source, processed_jsonl, mode=mode)
+
+    records = iter_records(processed_jsonl)
+
+    # Collapse near-duplicate designs so they aren't captioned and tagged again
+    duplicates = None
+    if design_index is not None:
+        duplicates_jsonl = os.path.join("data", "processed", f"{prefix}{source}_duplicates.jsonl")
+        duplicates = RecordWriter(duplicates_jsonl)
+        records = drop_duplicates(records, design_index, source, duplicates.write)
+
     # BLIP captions + CLIP tagging
-    with open(processed_json, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    
-    for item in data:
-        img_path = item.get("local_cropped_url")
-        if not img_path or not os.path.exists(img_path):
-            continue
-        
-        # BLIP caption
-        try:    
-            item["caption"] = generate_caption(img_path).strip()
-            print(f"Captioned {img_path}: {item['caption']}")
-        except Exception as e:
-            print(f"Failed BLIP/clean caption for {img_path}: {e}")
-        
-        # CLIP tags
-        try:
-            item["tags"] = generate_tags(img_path, design_tags, top_k=7)
-        except Exception as e:
-            print(f"Failed CLIP tagging for {img_path}: {e}")
+    embeddings = {}
+    with RecordWriter(processed_jsonl) as out:
+        for item in records:
+            img_path = item.get("local_cropped_url")
+            if img_path and os.path.exists(img_path):
+                # BLIP caption
+                try:    
+                    item["caption"] = generate_caption(img_path).strip()
+                    print(f"Captioned {img_path}: {item['caption']}")
+                except Exception as e:
+                    print(f"Failed BLIP/clean caption for {img_path}: {e}")
+                
+                # CLIP tags (keep the image embedding for similarity search)
+                try:
+                    item["tags"], embeddings[img_path] = generate_tags(
+                        img_path, design_tags, top_k=7, return_embedding=True
+                    )
+                except Exception as e:
+                    print(f"Failed CLIP tagging for {img_path}: {e}")
+            out.write(item)
     
-    # Save after captions + tags
-    with open(processed_json, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    print(f"Captions and tags updated: {processed_json}")
+    if duplicates is not None:
+        duplicates.finalize()
+        print(f"Dropped {duplicates.count} near-duplicate design(s) from {source}: {duplicates.path}")
+    print(f"Captions and tags updated: {processed_jsonl}")
+    save_embeddings(processed_jsonl, embeddings)
 
-    generate_descriptions(source, processed_json)
+    generate_descriptions(source, processed_jsonl)
     
 
-def main(mode="top10"):
+def main(mode="top10", dedup=True):
     prefix = "top10_" if mode=="top10" else ""
     with open("data/data_sources.json", "r", encoding="utf-8") as f:
         sources = json.load(f)
     
+    # One index for all sources, so designs listed on several marketplaces are kept once
+    design_index = DesignIndex() if dedup else None
     for source in sources:
-        process_all_for_source(source, prefix=prefix, mode=mode)
+        process_all_for_source(source, prefix=prefix, mode=mode, design_index=design_index)
 
 
 if __name__ == "__main__":
     mode = sys.argv[1] if len(sys.argv) > 1 else "top10"
     if mode not in ("all", "top10"):
-        print("Usage: python process_all.py [all|top10]")
+        print("Usage: python process_all.py [all|top10] [--keep-duplicates]")
         sys.exit(1)
 
-    main(mode)
+    main(mode, dedup="--keep-duplicates" not in sys.argv[2:])
@@ -0,0 +1,111 @@
+import random
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageOps
+
+from utils.dedup import BKTree, DesignIndex, collapse_duplicates, dhash, drop_duplicates, hamming, phash
+
+
+def design(seed, size=256):
+    """A random arrangement of shapes, standing in for a cropped artwork."""
+    rng = random.Random(seed)
+    image = Image.new("RGB", (size, size), "white")
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x, y = rng.randrange(size), rng.randrange(size)
+        r = rng.randrange(10, size // 3)
+        colour = tuple(rng.randrange(256) for _ in range(3))
+        shape = draw.ellipse if rng.random() < 0.5 else draw.rectangle
+        shape((x - r, y - r, x + r, y + r), fill=colour)
+    return image
+
+
+def save(image, tmp_path, name):
+    path = tmp_path / name
+    image.save(path)
+    return str(path)
+
+
+def test_hashes_survive_resize_and_recolour():
+    original = design(1)
+    resized = original.resize((180, 180))
+    recoloured = ImageOps.autocontrast(original.convert("L")).convert("RGB")
+    other = design(2)
+
+    for variant in (resized, recoloured):
+        assert hamming(phash(original), phash(variant)) <= 8
+        assert hamming(dhash(original), dhash(variant)) <= 12
+    assert hamming(phash(original), phash(other)) > 8
+
+
+def test_bk_tree_query_matches_linear_scan():
+    rng = random.Random(4)
+    hashes = [rng.getrandbits(64) for _ in range(2000)]
+    # Clusters of close hashes so small radii find something
+    hashes += [h ^ (1 << rng.randrange(64)) for h in hashes[:200]]
+    tree = BKTree()
+    for i, h in enumerate(hashes):
+        tree.add(h, i)
+    assert tree.size == len(hashes)
+
+    for query in rng.sample(hashes, 50):
+        for radius in (0, 3, 8):
+            expected = sorted(i for i, h in enumerate(hashes) if hamming(query, h) <= radius)
+            found = tree.query(query, radius)
+            assert sorted(i for _, i in found) == expected
+            assert [d for d, _ in found] == sorted(d for d, _ in found)
+
+
+def test_collapse_keeps_first_occurrence_across_sources(tmp_path):
+    first = save(design(1), tmp_path, "a.png")
+    same_smaller = save(design(1).resize((200, 200)), tmp_path, "b.png")
+    different = save(design(2), tmp_path, "c.png")
+
+    index = DesignIndex()
+    kept, duplicates = collapse_duplicates(
+        [
+            {"product_url": "rb/1", "local_cropped_url": first},
+            {"product_url": "rb/2", "local_cropped_url": different},
+            {"product_url": "rb/3"},
+        ],
+        index,
+        "redbubble",
+    )
+    assert [item["product_url"] for item in kept] == ["rb/1", "rb/2", "rb/3"]
+    assert duplicates == []
+
+    kept, duplicates = collapse_duplicates(
+        [
+            {"product_url": "tl/1", "local_cropped_url": same_smaller},
+            {"product_url": "tl/2", "local_cropped_url": str(tmp_path / "missing.png")},
+        ],
+        index,
+        "threadless",
+    )
+    # An unreadable crop is kept rather than dropped
+    assert [item["product_url"] for item in kept] == ["tl/2"]
+    assert [(d["product_url"], d["duplicate_of"]) for d in duplicates] == [("tl/1", "rb/1")]
+    assert duplicates[0]["phash_distance"] <= 8
+
+
+def test_phash_ignores_brightness_offset():
+    pixels = np.asarray(design(3).convert("L"), dtype=np.int16)
+    brighter = Image.fromarray(np.clip(pixels + 20, 0, 255).astype(np.uint8))
+    assert hamming(phash(design(3)), phash(brighter)) <= 4
+
+
+def test_drop_duplicates_is_lazy(tmp_path):
+    path = save(design(5), tmp_path, "a.png")
+    seen = []
+
+    def records():
+        for n in range(3):
+            seen.append(n)
+            yield {"product_url": f"u{n}", "local_cropped_url": path}
+
+    duplicates = []
+    kept = drop_duplicates(records(), DesignIndex(), "redbubble", duplicates.append)
+    assert next(kept)["product_url"] == "u0"
+    assert seen == [0]
+    assert list(kept) == []
+    assert [d["duplicate_of"] for d in duplicates] == ["u0", "u0"]
@@ -0,0 +1,17 @@
+from utils.description_generator import generate_descriptions
+from utils.records import RecordWriter, iter_records
+
+
+def test_descriptions_are_streamed_back_into_the_file(tmp_path):
+    path = str(tmp_path / "top10_redbubble.jsonl")
+    with RecordWriter(path) as out:
+        out.write({"artist": "Ann", "caption": "a red fox", "tags": ["Fox", "Retro", "bold", "neon"]})
+        out.write({"artist": "Bo", "caption": "waves", "tags": []})
+
+    generate_descriptions("redbubble", path)
+
+    assert [item["description"] for item in iter_records(path)] == [
+        "A hoodie design from redbubble by Ann, featuring a red fox. Style: retro, bold, neon.",
+        "A hoodie design from redbubble by Bo, featuring waves.",
+    ]
+    assert not (tmp_path / "top10_redbubble.jsonl.partial").exists()
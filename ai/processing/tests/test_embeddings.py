@@ -0,0 +1,22 @@
+import numpy as np
+
+from utils.embeddings import embeddings_path, load_embeddings, save_embeddings
+
+
+def test_round_trip_in_float16(tmp_path):
+    processed = str(tmp_path / "top10_site.jsonl")
+    save_embeddings(processed, {"a.jpg": np.ones(4, dtype=np.float32), "b.jpg": np.zeros(4, dtype=np.float32)})
+    loaded = load_embeddings(processed)
+    assert sorted(loaded) == ["a.jpg", "b.jpg"]
+    assert loaded["a.jpg"].dtype == np.float16 and loaded["a.jpg"].tolist() == [1.0] * 4
+
+
+def test_saving_no_embeddings_removes_stale_file(tmp_path):
+    processed = str(tmp_path / "top10_site.jsonl")
+    save_embeddings(processed, {"a.jpg": np.ones(4, dtype=np.float32)})
+    save_embeddings(processed, {})
+    assert not (tmp_path / "top10_site_embeddings.npz").exists()
+    assert embeddings_path(processed) == str(tmp_path / "top10_site_embeddings.npz")
+    assert load_embeddings(processed) == {}
+    # Nothing to remove is fine too
+    save_embeddings(processed, {})
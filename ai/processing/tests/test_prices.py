@@ -0,0 +1,21 @@
+import pytest
+
+from utils.prices import to_gbp
+
+
+@pytest.mark.parametrize("price, expected", [
+    ("£41", "£41.00"),
+    ("GBP 41.50", "£41.50"),
+    ("$45.00", "£33.30"),
+    ("US$1,000", "£740.00"),
+    ("USD 54.00", "£39.96"),
+    ("30 EUR", "£25.50"),
+    ("€30", "£25.50"),
+])
+def test_known_currencies_become_gbp(price, expected):
+    assert to_gbp(price) == expected
+
+
+@pytest.mark.parametrize("price", ["", None, "Sold out", "45", "CAD 60", "¥5000"])
+def test_unconvertible_prices_are_dropped(price):
+    assert to_gbp(price) == ""
@@ -1,46 +1,52 @@
 import json
 import os
-import re
+import sys
+
+import numpy as np
+
+from utils.embeddings import load_embeddings
+from utils.prices import to_gbp
+from utils.records import iter_records
 
 input_folder = "data/processed"
 output_folder_backend = "../backend/data"
 output_file_backend = os.path.join(output_folder_backend, "hoodies.json")
 output_file_trendy = os.path.join(input_folder, "trendy_captions.json")
+# CLIP embeddings for the backend's similarity search, row i <-> embedding_ids[i]
+output_file_embeddings = os.path.join(output_folder_backend, "embeddings.npy")
+output_file_embedding_ids = os.path.join(output_folder_backend, "embedding_ids.json")
+# With --sqlite, the backend's SQLite catalog is synced to the same items
+output_file_sqlite = os.path.join(output_folder_backend, "hoodies.db")
+use_sqlite = "--sqlite" in sys.argv[1:]
+
+if use_sqlite:
+    sys.path.append(os.path.abspath("../backend"))
+    from app.sqlite_store import connect, upsert_hoodies
 
 input_files = [
-    "top10_redbubble.json",
-    "top10_society6.json",
-    "top10_threadless.json"
+    "top10_redbubble.jsonl",
+    "top10_society6.jsonl",
+    "top10_threadless.jsonl"
 ]
 
 all_data = []
+embedding_ids = []
+embedding_rows = []
 current_id = 1
 
 # Hugging Face dataset base URL
 HF_BASE_URL = "https://huggingface.co/datasets/AndyXIP/generated-hoodies/resolve/main"
 
-# USD to GBP conversion
-def parse_price(price_str: str) -> str:
-    exchange_rate = 0.74
-    if not price_str:
-        return ""
-    match = re.match(r"\$([\d.,]+)", price_str)
-    if match:
-        usd = float(match.group(1).replace(",", ""))
-        gbp = round(usd * exchange_rate, 2)
-        return f"£{gbp}"
-    return price_str
-
 for filename in input_files:
     path = os.path.join(input_folder, filename)
     if not os.path.exists(path):
         print(f"⚠ File not found: {path}")
         continue
 
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    source = os.path.splitext(filename)[0].replace("top10_", "")
+    embeddings = load_embeddings(path)
 
-    for entry in data:
+    for entry in iter_records(path):
         # Filter out typography tags
         tags = [tag.lower() for tag in entry.get("tags", []) if tag and "typography" not in tag.lower()]
         top_tags = tags[:3]  # Take top 3 tags
@@ -51,11 +57,17 @@ for filename in input_files:
         if top_tags:
             combined_description += ". Style: " + ", ".join(top_tags)
 
+        # Every catalog price is in GBP; ones we can't convert are left blank
+        price = to_gbp(entry.get("price", ""))
+        if entry.get("price") and not price:
+            print(f"⚠ Dropping price {entry['price']!r} of {entry.get('product_url', '')}: unknown currency")
+
         transformed = {
             "id": str(current_id),
             "name": entry.get("title", ""),
             "artist": entry.get("artist", ""),
-            "price": parse_price(entry.get("price", "")),
+            "source": source,
+            "price": price,
             "product_url": entry.get("product_url", ""),
             "original_image_url": f"{HF_BASE_URL}/original/{current_id}.jpg",
             "ai_image_url": f"{HF_BASE_URL}/generated/{current_id}.png",
@@ -64,10 +76,34 @@ for filename in input_files:
             "description": combined_description
         }
         all_data.append(transformed)
+
+        embedding = embeddings.get(entry.get("local_cropped_url"))
+        if embedding is not None:
+            embedding_ids.append(transformed["id"])
+            embedding_rows.append(embedding)
+
         current_id += 1
 
 # Save to backend folder
 os.makedirs(output_folder_backend, exist_ok=True)
+
+# Embeddings go first: the backend reloads when hoodies.json changes.
+# Write-then-rename, since running workers may have the old file memory-mapped.
+if embedding_rows:
+    with open(output_file_embeddings + ".tmp", "wb") as out_f:
+        np.save(out_f, np.stack(embedding_rows).astype(np.float16))
+    with open(output_file_embedding_ids + ".tmp", "w", encoding="utf-8") as out_f:
+        json.dump(embedding_ids, out_f)
+    os.replace(output_file_embeddings + ".tmp", output_file_embeddings)
+    os.replace(output_file_embedding_ids + ".tmp", output_file_embedding_ids)
+    print(f"Saved {len(embedding_rows)} embeddings to {output_file_embeddings}")
+else:
+    # Stale embeddings from an earlier run would point at rows that are gone
+    for stale_path in (output_file_embeddings, output_file_embedding_ids):
+        if os.path.exists(stale_path):
+            os.remove(stale_path)
+            print(f"Removed stale {stale_path}")
+
 with open(output_file_backend, "w", encoding="utf-8") as out_f:
     json.dump(all_data, out_f, indent=2, ensure_ascii=False)
 
@@ -76,3 +112,12 @@ with open(output_file_trendy, "w", encoding="utf-8") as out_f:
     json.dump(all_data, out_f, indent=2, ensure_ascii=False)
 
 print(f"Saved {len(all_data)} entries to {output_file_backend} and {output_file_trendy}")
+
+# One transaction: ids from earlier runs that are no longer produced are removed
+if use_sqlite:
+    sqlite_conn = connect(output_file_sqlite)
+    try:
+        written = upsert_hoodies(sqlite_conn, all_data, prune=True)
+    finally:
+        sqlite_conn.close()
+    print(f"Synced {len(all_data)} entries into {output_file_sqlite} ({written} row(s) changed)")
@@ -4,6 +4,8 @@ import json
 import torch
 from PIL import Image
 from transformers import Blip2Processor, Blip2ForConditionalGeneration
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from records import RecordWriter, iter_records
 
 # Device
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
@@ -37,34 +39,30 @@ def main(mode="top10"):
 
     for source in sources:
         source_name = source.lower()
-        processed_json_path = f"data/processed/{prefix}{source_name}.json"
+        processed_json_path = f"data/processed/{prefix}{source_name}.jsonl"
 
         if not os.path.exists(processed_json_path):
             print(f"Processed JSON not found for source '{source_name}' at {processed_json_path}")
             continue
 
-        with open(processed_json_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
         updated = False
-        for item in data:
-            # Use cropped images if available
-            img_path = item.get("local_cropped_url")
-            if not img_path or not os.path.exists(img_path):
-                print(f"Image path not found or missing: {img_path}")
-                continue
-
-            try:
-                caption = generate_caption(img_path)
-                item["caption"] = caption
-                updated = True
-                print(f"Captioned {img_path}: {caption}")
-            except Exception as e:
-                print(f"Failed captioning {img_path}: {e}")
+        with RecordWriter(processed_json_path) as out:
+            for item in iter_records(processed_json_path):
+                # Use cropped images if available
+                img_path = item.get("local_cropped_url")
+                if not img_path or not os.path.exists(img_path):
+                    print(f"Image path not found or missing: {img_path}")
+                else:
+                    try:
+                        caption = generate_caption(img_path)
+                        item["caption"] = caption
+                        updated = True
+                        print(f"Captioned {img_path}: {caption}")
+                    except Exception as e:
+                        print(f"Failed captioning {img_path}: {e}")
+                out.write(item)
 
         if updated:
-            with open(processed_json_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
             print(f"Updated captions saved to {processed_json_path}")
 
 if __name__ == "__main__":
@@ -3,6 +3,8 @@ import os
 import sys
 import json
 from pathlib import Path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from records import RecordWriter, iter_records
 
 # --- Patterns for cleaning ---
 FILLER_PATTERN = re.compile(
@@ -43,32 +45,28 @@ def main(mode="top10"):
 
     for source in sources:
         source_name = source.lower()
-        processed_json_path = os.path.join("data", "processed", f"{prefix}{source_name}.json")
+        processed_json_path = os.path.join("data", "processed", f"{prefix}{source_name}.jsonl")
         
         if not os.path.exists(processed_json_path):
             print(f"Processed JSON not found for source '{source_name}' at {processed_json_path}")
             continue
         
-        with open(processed_json_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        
         updated = False
-        for item in data:
-            caption = item.get("caption")
-            if not caption:
-                continue  # skip empty captions
-            
-            try:
-                cleaned_caption = clean_caption(caption)
-                item["caption"] = cleaned_caption
-                updated = True
-                print(f"Cleaned: {cleaned_caption}")
-            except Exception as e:
-                print(f"Failed cleaning: {e}")
+        with RecordWriter(processed_json_path) as out:
+            for item in iter_records(processed_json_path):
+                caption = item.get("caption")
+                # Empty captions are passed through as they are
+                if caption:
+                    try:
+                        cleaned_caption = clean_caption(caption)
+                        item["caption"] = cleaned_caption
+                        updated = True
+                        print(f"Cleaned: {cleaned_caption}")
+                    except Exception as e:
+                        print(f"Failed cleaning: {e}")
+                out.write(item)
         
         if updated:
-            with open(processed_json_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
             print(f"Updated captions saved to {processed_json_path}")
 
 
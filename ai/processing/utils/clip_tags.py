@@ -6,13 +6,22 @@ import torch
 from PIL import Image
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data')))
 from design_tags import design_tags
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from embeddings import save_embeddings
+from records import RecordWriter, iter_records
 
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 print(f"Using device: {device}")
 
 model, preprocess = clip.load("ViT-B/32", device=device)
 
-def generate_tags(image_path, candidate_tags, top_k=5):
+def generate_tags(image_path, candidate_tags, top_k=5, return_embedding=False):
+    """
+    Pick the `top_k` candidate tags closest to the image in CLIP space.
+
+    With `return_embedding=True` returns (tags, embedding), where embedding is
+    the L2-normalised image feature vector as a float32 numpy array.
+    """
     image = preprocess(Image.open(image_path)).unsqueeze(0).to(device)
     
     with torch.no_grad():
@@ -26,6 +35,9 @@ def generate_tags(image_path, candidate_tags, top_k=5):
     similarity = (image_features @ text_features.T).squeeze(0)
     values, indices = similarity.topk(top_k)
     tags = [candidate_tags[i] for i in indices]
+    if return_embedding:
+        embedding = image_features.squeeze(0).float().cpu().numpy()
+        return tags, embedding
     return tags
 
 def main(mode="top10"):
@@ -37,34 +49,34 @@ def main(mode="top10"):
     
     for source in sources:
         source_name = source.lower()
-        processed_json_path = os.path.join("data", "processed", f"{prefix}{source_name}.json")
+        processed_json_path = os.path.join("data", "processed", f"{prefix}{source_name}.jsonl")
         
         if not os.path.exists(processed_json_path):
             print(f"Processed JSON not found for source '{source_name}' at {processed_json_path}")
             continue
         
-        with open(processed_json_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        
         updated = False
-        for item in data:
-            img_path = item.get("local_cropped_url")
-            if not img_path or not os.path.exists(img_path):
-                print(f"Image path not found or missing: {img_path}")
-                continue
-            
-            try:
-                tags = generate_tags(img_path, design_tags, top_k=7)
-                item["tags"] = tags
-                updated = True
-                print(f"Tagged {img_path}: {tags}")
-            except Exception as e:
-                print(f"Failed tagging {img_path}: {e}")
+        embeddings = {}
+        with RecordWriter(processed_json_path) as out:
+            for item in iter_records(processed_json_path):
+                img_path = item.get("local_cropped_url")
+                if not img_path or not os.path.exists(img_path):
+                    print(f"Image path not found or missing: {img_path}")
+                else:
+                    try:
+                        tags, embeddings[img_path] = generate_tags(
+                            img_path, design_tags, top_k=7, return_embedding=True
+                        )
+                        item["tags"] = tags
+                        updated = True
+                        print(f"Tagged {img_path}: {tags}")
+                    except Exception as e:
+                        print(f"Failed tagging {img_path}: {e}")
+                out.write(item)
         
         if updated:
-            with open(processed_json_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
             print(f"Updated tags saved to {processed_json_path}")
+            save_embeddings(processed_json_path, embeddings)
 
 
 if __name__ == "__main__":
@@ -1,6 +1,9 @@
 import os
+import sys
 import json
 from PIL import Image
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from records import RecordWriter, iter_records
 
 # Crop settings per platform (left, top, right, bottom in percent)
 CROP_PRESETS = {
@@ -33,38 +36,33 @@ def crop_and_resize_image(image_path: str, output_path: str, crop_box: tuple[int
         print(f"Failed to process {image_path}: {e}")
         return False
 
-def process_source_images(source: str, input_json: str, mode: str = "all") -> None:
-    """Process all images in a JSON file for a given source."""
+def process_source_images(source: str, input_jsonl: str, mode: str = "all") -> None:
+    """Process all images in a JSON Lines file for a given source, rewriting it as it goes."""
     crop_box = CROP_PRESETS.get(source.lower())
     if not crop_box:
         print(f"No crop preset for source '{source}', skipping.")
         return
 
-    if not os.path.exists(input_json):
-        print(f"JSON not found: {input_json}")
+    if not os.path.exists(input_jsonl):
+        print(f"JSONL not found: {input_jsonl}")
         return
 
-    with open(input_json, "r", encoding="utf-8") as f:
-        entries = json.load(f)
-
     output_dir = "data/images/top10_cropped" if mode == "top10" else "data/images/cropped"
 
-    for entry in entries:
-        img_path = entry.get("local_image_url")
-        if not img_path or not os.path.exists(img_path):
-            print(f"⚠ Missing local_image_url: {img_path}")
-            continue
-
-        filename = os.path.splitext(os.path.basename(img_path))[0] + "_cropped.jpg"
-        cropped_path = os.path.join(output_dir, source, filename)
+    with RecordWriter(input_jsonl) as out:
+        for entry in iter_records(input_jsonl):
+            img_path = entry.get("local_image_url")
+            if not img_path or not os.path.exists(img_path):
+                print(f"⚠ Missing local_image_url: {img_path}")
+            else:
+                filename = os.path.splitext(os.path.basename(img_path))[0] + "_cropped.jpg"
+                cropped_path = os.path.join(output_dir, source, filename)
 
-        if crop_and_resize_image(img_path, cropped_path, crop_box):
-            entry["local_cropped_url"] = cropped_path
+                if crop_and_resize_image(img_path, cropped_path, crop_box):
+                    entry["local_cropped_url"] = cropped_path
+            out.write(entry)
 
-    # Save updated JSON
-    with open(input_json, "w", encoding="utf-8") as f:
-        json.dump(entries, f, indent=2, ensure_ascii=False)
-    print(f"Updated JSON saved: {input_json}")
+    print(f"Updated JSONL saved: {input_jsonl}")
 
 def main(mode: str = "all"):
     with open("data/data_sources.json", "r", encoding="utf-8") as f:
@@ -72,8 +70,8 @@ def main(mode: str = "all"):
 
     for source in sources:
         prefix = "top10_" if mode == "top10" else ""
-        input_json = f"data/processed/{prefix}{source}.json"
-        process_source_images(source, input_json, mode=mode)
+        input_jsonl = f"data/processed/{prefix}{source}.jsonl"
+        process_source_images(source, input_jsonl, mode=mode)
 
 if __name__ == "__main__":
     import sys
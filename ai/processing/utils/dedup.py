@@ -0,0 +1,141 @@
+import numpy as np
+from PIL import Image
+
+# 64-bit hashes; two designs are near-duplicates when both hashes are within
+# these Hamming distances (pHash finds candidates, dHash confirms them)
+PHASH_RADIUS = 8
+DHASH_RADIUS = 12
+HASH_SIZE = 8
+PHASH_SCALE = 4  # pHash takes the DCT of a (HASH_SIZE * PHASH_SCALE)^2 thumbnail
+
+
+def _dct_matrix(n):
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n))
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+_DCT = _dct_matrix(HASH_SIZE * PHASH_SCALE)
+
+
+def _to_int(bits):
+    return int("".join("1" if b else "0" for b in bits.ravel()), 2)
+
+
+def phash(image):
+    """Perceptual hash: signs of the low-frequency DCT terms against their median."""
+    size = HASH_SIZE * PHASH_SCALE
+    pixels = np.asarray(image.convert("L").resize((size, size), Image.LANCZOS), dtype=np.float64)
+    low = (_DCT @ pixels @ _DCT.T)[:HASH_SIZE, :HASH_SIZE]
+    # The DC term only says how bright the image is; leave it out of the median
+    return _to_int(low > np.median(low.ravel()[1:]))
+
+
+def dhash(image):
+    """Difference hash: whether each pixel is brighter than its right neighbour."""
+    pixels = np.asarray(image.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS), dtype=np.int16)
+    return _to_int(pixels[:, 1:] > pixels[:, :-1])
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over hashes under Hamming distance.
+
+    A radius-r query only descends into children whose edge distance d is
+    within r of the query's distance to the node (triangle inequality), so
+    small radii visit a small fraction of the tree.
+    """
+
+    def __init__(self):
+        self.root = None  # [hash, value, {distance: child}]
+        self.size = 0
+
+    def add(self, hash_value, value):
+        self.size += 1
+        if self.root is None:
+            self.root = [hash_value, value, {}]
+            return
+        node = self.root
+        while True:
+            d = hamming(hash_value, node[0])
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [hash_value, value, {}]
+                return
+            node = child
+
+    def query(self, hash_value, radius):
+        """Return [(distance, value)] for every hash within `radius`, nearest first."""
+        found = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            d = hamming(hash_value, node[0])
+            if d <= radius:
+                found.append((d, node[1]))
+            for edge, child in node[2].items():
+                if d - radius <= edge <= d + radius:
+                    stack.append(child)
+        found.sort(key=lambda match: match[0])
+        return found
+
+
+class DesignIndex:
+    """Near-duplicate lookup for cropped designs, shared across sources."""
+
+    def __init__(self, phash_radius=PHASH_RADIUS, dhash_radius=DHASH_RADIUS):
+        self.phash_radius = phash_radius
+        self.dhash_radius = dhash_radius
+        self.tree = BKTree()
+
+    def match_or_add(self, image_path, key):
+        """
+        Return (key, distance) of an indexed design that `image_path`
+        duplicates, or add it under `key` and return None.
+        """
+        with Image.open(image_path) as image:
+            p, d = phash(image), dhash(image)
+        for distance, (other_key, other_dhash) in self.tree.query(p, self.phash_radius):
+            if hamming(d, other_dhash) <= self.dhash_radius:
+                return other_key, distance
+        self.tree.add(p, (key, d))
+        return None
+
+
+def drop_duplicates(records, index, source, on_duplicate):
+    """
+    Lazily yield the records of `records` whose cropped design doesn't match
+    one already in `index`, from this source or an earlier one; the first
+    occurrence is kept. Each duplicate is passed to `on_duplicate` with
+    duplicate_of and phash_distance added. Items without a crop, or whose
+    crop can't be hashed, are kept as they are.
+    """
+    for i, item in enumerate(records):
+        img_path = item.get("local_cropped_url")
+        if not img_path:
+            yield item
+            continue
+        key = item.get("product_url") or f"{source}:{i}"
+        try:
+            match = index.match_or_add(img_path, key)
+        except Exception as e:
+            print(f"Could not hash {img_path}: {e}")
+            yield item
+            continue
+        if match is None:
+            yield item
+        else:
+            on_duplicate({**item, "duplicate_of": match[0], "phash_distance": match[1]})
+
+
+def collapse_duplicates(data, index, source):
+    """Split `data` into (kept, duplicates) with drop_duplicates."""
+    duplicates = []
+    kept = list(drop_duplicates(data, index, source, duplicates.append))
+    return kept, duplicates
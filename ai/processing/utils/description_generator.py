@@ -1,49 +1,49 @@
 import os
+import sys
 import json
 from pathlib import Path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from records import RecordWriter, iter_records
 
 TOP_TAGS_LIMIT = 3
 
 def generate_descriptions(source: str, source_file: str):
-    """Update JSON items by adding a description field combining caption + tags."""
+    """Update JSON Lines items by adding a description field combining caption + tags."""
     source_path = Path(source_file)
 
     if not source_path.exists():
-        print(f"Processed JSON not found for source '{source}' at {source_path}")
+        print(f"Processed JSONL not found for source '{source}' at {source_path}")
         return
 
-    with open(source_path, "r", encoding="utf-8") as f:
-        items = json.load(f)
-
     updated = False
 
-    for i, item in enumerate(items):
-        try:
-            caption = item.get("caption", "").strip()
-            tags = [tag.lower() for tag in item.get("tags", []) if tag.lower() not in caption.lower()]
-            top_tags = tags[:TOP_TAGS_LIMIT]
-
-            if top_tags:
-                description = (
-                    f"A hoodie design from {source} by {item.get('artist', 'unknown')}, "
-                    f"featuring {caption}. Style: {', '.join(top_tags)}."
-                )
-            else:
-                description = (
-                    f"A hoodie design from {source} by {item.get('artist', 'unknown')}, "
-                    f"featuring {caption}."
-                )
-
-            item["description"] = description
-            updated = True
-
-        except KeyError as e:
-            print(f"Skipping item {i} in '{source}' due to missing key: {e}")
+    with RecordWriter(source_file) as out:
+        for i, item in enumerate(iter_records(source_file)):
+            try:
+                caption = item.get("caption", "").strip()
+                tags = [tag.lower() for tag in item.get("tags", []) if tag.lower() not in caption.lower()]
+                top_tags = tags[:TOP_TAGS_LIMIT]
+
+                if top_tags:
+                    description = (
+                        f"A hoodie design from {source} by {item.get('artist', 'unknown')}, "
+                        f"featuring {caption}. Style: {', '.join(top_tags)}."
+                    )
+                else:
+                    description = (
+                        f"A hoodie design from {source} by {item.get('artist', 'unknown')}, "
+                        f"featuring {caption}."
+                    )
+
+                item["description"] = description
+                updated = True
+
+            except KeyError as e:
+                print(f"Skipping item {i} in '{source}' due to missing key: {e}")
+            out.write(item)
 
     if updated:
-        with open(source_path, "w", encoding="utf-8") as f:
-            json.dump(items, f, indent=2, ensure_ascii=False)
-        print(f"[{source}] Description field added/updated in JSON.")
+        print(f"[{source}] Description field added/updated in JSONL.")
     else:
         print(f"[{source}] No updates made.")
 
@@ -62,7 +62,7 @@ def main(mode="top10"):
 
     for source in sources:
         source_name = source.lower()
-        processed_json_path = os.path.join("data", "processed", f"{prefix}{source_name}.json")
+        processed_json_path = os.path.join("data", "processed", f"{prefix}{source_name}.jsonl")
         generate_descriptions(source, processed_json_path)
 
 
@@ -0,0 +1,34 @@
+import os
+import numpy as np
+
+
+def embeddings_path(processed_json):
+    """Side file holding the CLIP embeddings for a processed JSON file."""
+    return os.path.splitext(processed_json)[0] + "_embeddings.npz"
+
+
+def save_embeddings(processed_json, embeddings):
+    """
+    Save {local_cropped_url: embedding} next to `processed_json` as float16.
+    With no embeddings the side file is deleted, so a stale one from an
+    earlier run isn't matched against the new records.
+    """
+    path = embeddings_path(processed_json)
+    if not embeddings:
+        if os.path.exists(path):
+            os.remove(path)
+            print(f"Removed stale {path}")
+        return
+    keys = list(embeddings)
+    matrix = np.stack([embeddings[k] for k in keys]).astype(np.float16)
+    np.savez(path, keys=np.asarray(keys), embeddings=matrix)
+    print(f"Saved {len(keys)} embeddings to {path}")
+
+
+def load_embeddings(processed_json):
+    """Load the {local_cropped_url: embedding} map saved by `save_embeddings`."""
+    path = embeddings_path(processed_json)
+    if not os.path.exists(path):
+        return {}
+    with np.load(path) as data:
+        return dict(zip(data["keys"].tolist(), data["embeddings"]))
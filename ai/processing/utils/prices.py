@@ -0,0 +1,33 @@
+import re
+
+# Pounds per unit of each currency the scrapers see; fixed, like the rest
+# of the catalog's display prices
+GBP_RATES = {"GBP": 1.0, "USD": 0.74, "EUR": 0.85}
+CURRENCY_SYMBOLS = {"£": "GBP", "$": "USD", "€": "EUR"}
+
+PRICE_RE = re.compile(
+    r"(?P<code>[A-Z]{3})?\s*(?P<symbol>US\$|[£$€])?\s*(?P<amount>\d[\d,]*(?:\.\d+)?)\s*(?P<suffix>[A-Z]{3})?"
+)
+
+
+def to_gbp(price):
+    """
+    Convert a scraped display price ("$45.00", "USD 54", "£41") to "£x.xx".
+
+    Returns "" for a missing price, or one whose currency is unknown or
+    not in GBP_RATES, so the catalog never holds a price it can't compare.
+    """
+    if not price:
+        return ""
+    match = PRICE_RE.search(str(price).strip())
+    if not match:
+        return ""
+    symbol = match.group("symbol")
+    currency = match.group("code") or match.group("suffix") or CURRENCY_SYMBOLS.get(
+        "$" if symbol == "US$" else symbol
+    )
+    rate = GBP_RATES.get(currency)
+    if rate is None:
+        return ""
+    amount = float(match.group("amount").replace(",", ""))
+    return f"£{amount * rate:.2f}"
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The scraper's JSON Lines reader and writer, so both halves of the pipeline
+# read and write data/raw and data/processed the same way
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "web-scraping", "utils")))
+from save_data import RecordWriter, iter_records  # noqa: E402,F401
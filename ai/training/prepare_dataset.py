@@ -1,6 +1,11 @@
 import os
+import sys
 import json
 
+# JSON Lines reader shared with the scraper and processing stages
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "web-scraping", "utils")))
+from save_data import iter_records
+
 with open("data/data_sources.json", "r", encoding="utf-8") as f:
     sources = json.load(f)
 
@@ -8,17 +13,14 @@ output_path = "data/processed/captions.jsonl"
 os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
 for source in sources:
-    source_path = f"data/processed/{source}.json"
+    source_path = f"data/processed/{source}.jsonl"
 
     if not os.path.exists(source_path):
         print(f"Unable to find '{source}' at {source_path}")
         continue
 
-    with open(source_path, "r", encoding="utf-8") as f:
-        items = json.load(f)
-
     with open(output_path, "a", encoding="utf-8") as out_file:
-        for i, item in enumerate(items):
+        for i, item in enumerate(iter_records(source_path)):
             try:
                 file_url = item.get("local_cropped_url")
                 description = item.get("description", "")
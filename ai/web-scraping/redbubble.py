@@ -1,13 +1,50 @@
 import sys
-import time
-from utils.driver_setup import setup_driver
-from utils.save_data import save_to_json
+from utils.card_extract import extract_cards, field
+from utils.driver_setup import get_pool, report_transfer, setup_driver
+from utils.http_extract import extract_listing
+from utils.save_data import save_to_jsonl
+from utils.scrolling import scroll_until_loaded
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+CARD_SELECTOR = 'div[data-testid="search-result-card"]'
+CARD_FIELDS = {
+    "title": field('span.styles_text__5c7a80ef'),
+    "artist": field({"selector": "span", "contains": "By ", "strip": "By "}),
+    "price": field('span[data-testid="line-item-price-price"]'),
+    "product_url": field({"selector": "a.styles_link__51d7d395", "attr": "href"}),
+    "image_url": field({"selector": "img.ProductCard_productCardImage____xct", "attr": "src"}),
+}
 
-def scrape_redbubble(pages=1, limit=None, headless=False, start_page=1):
+
+def _parse_card(card):
+    """Per-card fallback for cards the batch selectors can't fully read."""
+    link_elem = card.find_element(By.CSS_SELECTOR, 'a.styles_link__51d7d395')
+    product_url = link_elem.get_attribute("href")
+
+    title_elem = card.find_element(By.CSS_SELECTOR, 'span.styles_text__5c7a80ef')
+    title = title_elem.text.strip()
+
+    artist_elem = card.find_element(By.XPATH, './/span[contains(text(), "By ")]')
+    artist = artist_elem.text.replace("By ", "").strip()
+
+    price_elem = card.find_element(By.CSS_SELECTOR, 'span[data-testid="line-item-price-price"]')
+    price = price_elem.text.strip()
+
+    img_elem = card.find_element(By.CSS_SELECTOR, 'img.ProductCard_productCardImage____xct')
+    image_url = img_elem.get_attribute("src")
+
+    return {
+        "title": title,
+        "artist": artist,
+        "price": price,
+        "product_url": product_url,
+        "image_url": image_url
+    }
+
+
+def scrape_redbubble(pages=1, limit=None, headless=False, start_page=1, pool=None, engine="selenium"):
     """
     Scrape Redbubble hoodie listings.
 
@@ -16,74 +53,57 @@ def scrape_redbubble(pages=1, limit=None, headless=False, start_page=1):
         limit (int|None): maximum number of hoodie data to scrape.
         headless (bool): run browser headless.
         start_page (int): first page number to scrape (defaults to 1).
+        pool (DriverPool|None): browsers to lease from; defaults to the shared pool.
+        engine (str): "selenium", or "http" to read the page's structured data
+            without a browser, using Selenium only for pages that have none.
     """
     base_url = (
         "https://www.redbubble.com/shop"
         "?country=GB&iaCode=u-sweatshirts&locale=en&page={page}&sortOrder=trending"
     )
-    driver = setup_driver(headless=headless)
+    pool = pool or get_pool(setup_driver, headless=headless)
     all_results = []
 
     # checks different web pages for hoodie data
     for page in range(start_page, start_page + pages):
         url = base_url.format(page=page)
         print(f"Scraping page {page}: {url}")
-        driver.get(url)
 
-        wait = WebDriverWait(driver, 20)
+        if engine == "http":
+            items = extract_listing(url, "redbubble")
+            if items:
+                all_results.extend(items)
+                if limit and len(all_results) >= limit:
+                    return all_results[:limit]
+                continue
+            print(f"No usable structured listing data on page {page}, falling back to Selenium")
 
-        # Scroll down the web page to load all dynamic elements
-        for _ in range(3):
-            driver.execute_script("window.scrollBy(0, window.innerHeight);")
-            time.sleep(1)
+        with pool.lease() as lease:
+            driver = lease.driver
+            driver.get(url)
 
-        try:
-            wait.until(
-                EC.presence_of_element_located(
-                    (By.CSS_SELECTOR, 'div.styles_box__54ba70e3.SearchResultsGrid_grid__z2G0D')
-                )
-            )
-        except Exception as e:
-            print(f"Timeout waiting for products on page {page}: {e}")
-            continue
+            wait = WebDriverWait(driver, 20)
 
-        product_cards = driver.find_elements(By.CSS_SELECTOR, 'div[data-testid="search-result-card"]')
+            # Scroll down the web page to load all dynamic elements
+            scroll_until_loaded(driver, CARD_SELECTOR)
 
-        for card in product_cards:
             try:
-                link_elem = card.find_element(By.CSS_SELECTOR, 'a.styles_link__51d7d395')
-                product_url = link_elem.get_attribute("href")
-
-                title_elem = card.find_element(By.CSS_SELECTOR, 'span.styles_text__5c7a80ef')
-                title = title_elem.text.strip()
-
-                artist_elem = card.find_element(By.XPATH, './/span[contains(text(), "By ")]')
-                artist = artist_elem.text.replace("By ", "").strip()
-
-                price_elem = card.find_element(By.CSS_SELECTOR, 'span[data-testid="line-item-price-price"]')
-                price = price_elem.text.strip()
-
-                img_elem = card.find_element(By.CSS_SELECTOR, 'img.ProductCard_productCardImage____xct')
-                image_url = img_elem.get_attribute("src")
-
-                all_results.append({
-                    "title": title,
-                    "artist": artist,
-                    "price": price,
-                    "product_url": product_url,
-                    "image_url": image_url
-                })
-
-                # Stop early if limit reached (for top 10 hoodies)
-                if limit and len(all_results) >= limit:
-                    driver.quit()
-                    return all_results
-
+                wait.until(
+                    EC.presence_of_element_located(
+                        (By.CSS_SELECTOR, 'div.styles_box__54ba70e3.SearchResultsGrid_grid__z2G0D')
+                    )
+                )
             except Exception as e:
-                print(f"Error parsing product card on page {page}: {e}")
+                print(f"Timeout waiting for products on page {page}: {e}")
                 continue
 
-    driver.quit()
+            all_results.extend(extract_cards(driver, CARD_SELECTOR, CARD_FIELDS, _parse_card))
+            report_transfer(driver, f"Redbubble page {page}")
+
+            # Stop early if limit reached (for top 10 hoodies)
+            if limit and len(all_results) >= limit:
+                return all_results[:limit]
+
     return all_results
 
 
@@ -97,11 +117,11 @@ def main():
 
     if mode == "top10":
         hoodies = scrape_redbubble(pages=1, limit=10, start_page=1, headless=True)
-        save_to_json(hoodies, "top10_redbubble.json")
+        save_to_jsonl(hoodies, "top10_redbubble.jsonl")
         print(f"Saved {len(hoodies)} hoodies (top 10)")
     else:
         hoodies = scrape_redbubble(pages=10, start_page=1, headless=True)
-        save_to_json(hoodies, "redbubble.json")
+        save_to_jsonl(hoodies, "redbubble.jsonl")
         print(f"Saved {len(hoodies)} hoodies (all)")
 
 
@@ -1,26 +1,31 @@
+import argparse
+import functools
 import json
 import os
 import sys
-import io
-import requests
-import numpy as np
 import inspect
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
 
 from redbubble import scrape_redbubble
 from society6 import scrape_society6
 from threadless import scrape_threadless
-from utils.save_data import save_to_json
-import easyocr
-from PIL import Image
-
-# OCR setup
-READER = easyocr.Reader(['en'], gpu=False)
-HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; no-text-scraper/1.0)"}
-HTTP_TIMEOUT = 12
-MIN_SIDE = 128      # skip tiny icons/thumbnails
-MIN_CHARS = 3       # num of char to consider as text
+from utils.checkpoint import Checkpoint, dedupe
+from utils.ocr_filter import filter_no_text
+from utils.save_data import RecordWriter, raw_data_path, save_to_jsonl
+
 TOP10_KEEP_LIMIT = 10
 
+# Sources scraped at once; each worker runs its own browser (and OCR model
+# in top10 mode), so keep this low on small machines
+DEFAULT_WORKERS = int(os.getenv("SCRAPE_WORKERS", max(1, min(3, (os.cpu_count() or 2) // 2))))
+
+# "selenium" always uses the browser; "http" reads listing pages' embedded
+# data without one and only opens Chrome for pages where that data is
+# missing or incomplete
+ENGINES = ("http", "selenium")
+DEFAULT_ENGINE = os.getenv("SCRAPE_ENGINE", "selenium")
+
 SCRAPE_FUNCTIONS = {
     "redbubble": scrape_redbubble,
     "society6": scrape_society6,
@@ -33,69 +38,41 @@ MAX_PAGES = {
     "threadless": 25,  # 48/page
 }
 
-def fetch_image_from_url(url: str):
-    """Return PIL.Image (RGB) or None on failure."""
-    try:
-        r = requests.get(url, headers=HEADERS, timeout=HTTP_TIMEOUT)
-        r.raise_for_status()
-        return Image.open(io.BytesIO(r.content)).convert("RGB")
-    except Exception:
-        return None
-
-def too_small(img: Image.Image, min_side=MIN_SIDE) -> bool:
-    w, h = img.size
-    return min(w, h) < min_side
-
-def has_text_in_image(img: Image.Image, min_chars=MIN_CHARS) -> bool:
-    """EasyOCR detection for PIL image."""
-    try:
-        arr = np.array(img)
-        results = READER.readtext(arr)
-        extracted = " ".join([t[1] for t in results]).strip()
-        return len(extracted) >= min_chars
-    except Exception:
-        # fail-safe: don't over-filter on OCR errors
-        return False
 
-def supports_start_page(func):
+def supports_param(func, param):
     try:
-        return "start_page" in inspect.signature(func).parameters
+        return param in inspect.signature(func).parameters
     except Exception:
         return False
 
-def scrape(mode="top10"):
-    if mode not in ("all", "top10"):
-        print("Usage: python scrape.py [top10|all]")
-        sys.exit(1)
+def scrape_source(name, mode="top10", resume=False, engine=DEFAULT_ENGINE):
+    """
+    Scrape one source and save its output file. Returns the number of items saved.
 
+    In 'all' mode pages are checkpointed as they finish; `resume` skips the
+    pages a previous, interrupted run already completed.
+    """
+    scrape_func = SCRAPE_FUNCTIONS[name]
     filename_prefix = "" if mode == "all" else "top10_"
 
-    data_sources_path = os.path.join(os.path.dirname(__file__), "..", "data", "data_sources.json")
-    with open(data_sources_path, "r", encoding="utf-8") as f:
-        source_names = json.load(f)
-
-    total_count = 0
-
-    for name in source_names:
-        scrape_func = SCRAPE_FUNCTIONS.get(name)
-        if not scrape_func:
-            print(f"No scraper function defined for '{name}'")
-            continue
+    print(f"\nScraping {name} ({mode})...")
+    max_pages = MAX_PAGES.get(name, 1)
 
-        print(f"\nScraping {name} ({mode})...")
-        max_pages = MAX_PAGES.get(name, 1)
+    # Only Threadless should be non-headless
+    this_headless = (name != "threadless")
+    if supports_param(scrape_func, "engine"):
+        scrape_func = functools.partial(scrape_func, engine=engine)
 
-        # Only Threadless should be non-headless
-        this_headless = (name != "threadless")
+    if mode == "top10":
+        has_start = supports_param(scrape_func, "start_page")
+        prev_cum_len = 0
+        seen = set()
 
-        if mode == "top10":
-            collected = []
-            has_start = supports_start_page(scrape_func)
-            prev_cum_len = 0
-
-            # Scrape first 10 hoodies without text
+        # Scrape first 10 hoodies without text; kept items are written as
+        # the OCR filter accepts them
+        with RecordWriter(raw_data_path(f"{filename_prefix}{name}.jsonl")) as writer:
             for page in range(1, max_pages + 1):
-                if len(collected) >= TOP10_KEEP_LIMIT:
+                if writer.count >= TOP10_KEEP_LIMIT:
                     break
 
                 if has_start:
@@ -107,36 +84,103 @@ def scrape(mode="top10"):
                     page_items = cumulative[prev_cum_len:]
                     prev_cum_len = len(cumulative)
 
+                # Listings re-sort between page loads, so the same hoodie can show up twice
+                page_items = dedupe(page_items, seen)
                 print(f"Pulled {len(page_items)} items from {name} page {page}. Running OCR filter...")
 
-                for item in page_items:
-                    if len(collected) >= TOP10_KEEP_LIMIT:
-                        break
-                    url = item.get("image_url")
-                    if not url:
-                        continue
-                    img = fetch_image_from_url(url)
-                    if img is None:
-                        continue
-                    if too_small(img):
-                        continue
-                    if has_text_in_image(img):
-                        continue
-                    collected.append(item)
-
-            save_to_json(collected, f"{filename_prefix}{name}.json")
-            print(f"Saved {len(collected)} no-text item(s) from {name}")
-            total_count += len(collected)
-
-        else:
-            # No OCR for fine-tuning data
-            items = scrape_func(pages=max_pages, headless=this_headless)
-            save_to_json(items, f"{filename_prefix}{name}.json")
-            print(f"Saved {len(items)} item(s) from {name} (no OCR in 'all')")
-            total_count += len(items)
+                writer.write_all(filter_no_text(page_items, limit=TOP10_KEEP_LIMIT - writer.count))
+
+        print(f"Saved {writer.count} no-text item(s) from {name}")
+        return writer.count
+
+    # No OCR for fine-tuning data
+    if not supports_param(scrape_func, "start_page"):
+        items = scrape_func(pages=max_pages, headless=this_headless)
+        save_to_jsonl(items, f"{filename_prefix}{name}.jsonl")
+        print(f"Saved {len(items)} item(s) from {name} (no OCR in 'all')")
+        return len(items)
+
+    checkpoint = Checkpoint(name, resume=resume)
+    if checkpoint.completed:
+        print(f"Resuming {name}: {len(checkpoint.completed)} page(s), {len(checkpoint.seen)} item(s) already done")
+
+    for page in range(1, max_pages + 1):
+        if page in checkpoint.completed:
+            continue
+        page_items = scrape_func(pages=1, limit=None, headless=this_headless, start_page=page)
+        if not page_items:
+            # Usually a timeout; leave the page open so --resume retries it
+            print(f"No items from {name} page {page}, not marking it done")
+            continue
+        fresh = checkpoint.record_page(page, page_items)
+        print(f"Checkpointed {len(fresh)} new item(s) from {name} page {page}")
+
+    # Streamed from the checkpoint file, so the source is never held in memory
+    count = save_to_jsonl(checkpoint.items(), f"{filename_prefix}{name}.jsonl")
+    if len(checkpoint.completed) == max_pages:
+        checkpoint.clear()
+    else:
+        print(f"{name} is missing {max_pages - len(checkpoint.completed)} page(s); rerun with --resume to fill them in")
+    print(f"Saved {count} item(s) from {name} (no OCR in 'all')")
+    return count
+
+def scrape(mode="top10", workers=DEFAULT_WORKERS, resume=False, engine=DEFAULT_ENGINE):
+    if mode not in ("all", "top10") or engine not in ENGINES:
+        print("Usage: python scrape.py [top10|all] [--workers N] [--resume] [--engine http|selenium]")
+        sys.exit(1)
+
+    data_sources_path = os.path.join(os.path.dirname(__file__), "..", "data", "data_sources.json")
+    with open(data_sources_path, "r", encoding="utf-8") as f:
+        source_names = json.load(f)
+
+    names = []
+    for name in source_names:
+        if name not in SCRAPE_FUNCTIONS:
+            print(f"No scraper function defined for '{name}'")
+            continue
+        names.append(name)
+
+    total_count = 0
+
+    if workers <= 1 or len(names) <= 1:
+        for name in names:
+            total_count += scrape_source(name, mode, resume, engine)
+    else:
+        # One process per source, each with its own browser; results are
+        # reported (and already saved) as each source finishes
+        workers = min(workers, len(names))
+        print(f"Scraping {len(names)} sources with {workers} worker(s)...")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+            futures = {pool.submit(scrape_source, name, mode, resume, engine): name for name in names}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    count = future.result()
+                except Exception as e:
+                    print(f"Scraping {name} failed: {e}")
+                    continue
+                print(f"Finished {name}: {count} item(s)")
+                total_count += count
 
     print(f"\nSaved a total of {total_count} item(s) ({mode})")
 
 if __name__ == "__main__":
-    mode = sys.argv[1] if len(sys.argv) > 1 else "top10"
-    scrape(mode)
+    parser = argparse.ArgumentParser(description="Scrape hoodie listings from every data source")
+    parser.add_argument("mode", nargs="?", default="top10", choices=["top10", "all"])
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="sources scraped in parallel (1 = one after another)")
+    parser.add_argument("--resume", action="store_true",
+                        help="in 'all' mode, continue an interrupted run from its checkpoints")
+    parser.add_argument("--engine", default=DEFAULT_ENGINE, choices=ENGINES,
+                        help="'http' skips the browser for pages with embedded listing data")
+    parser.add_argument("--lean", action="store_true",
+                        help="block images, fonts, media and trackers in the browser")
+    parser.add_argument("--report-transfer", action="store_true",
+                        help="print bytes downloaded and load time for every browser page")
+    args = parser.parse_args()
+    # Set through the environment so spawned workers' browsers pick them up
+    if args.lean:
+        os.environ["SCRAPE_LEAN_BROWSER"] = "1"
+    if args.report_transfer:
+        os.environ["SCRAPE_TRANSFER_REPORT"] = "1"
+    scrape(args.mode, workers=args.workers, resume=args.resume, engine=args.engine)
@@ -1,25 +1,50 @@
 import sys
-import time
-from utils.driver_setup import setup_driver
-from utils.save_data import save_to_json
+from utils.card_extract import extract_cards, field
+from utils.driver_setup import get_pool, report_transfer, setup_driver
+from utils.http_extract import extract_listing
+from utils.save_data import save_to_jsonl
+from utils.scrolling import scroll_until_loaded
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+CARD_SELECTOR = "li.algolia-products-grid__product-item"
+GRID_CARD_SELECTOR = f"ol.algolia-products-grid__grid {CARD_SELECTOR}"
+CARD_FIELDS = {
+    "title": field({"selector": "div.product-item__product-gallery a", "attr": "aria-label"}),
+    "artist": field("div.artist-link a"),
+    "price": field("span.product-item__product-price-label"),
+    "product_url": field({"selector": "div.product-item__product-gallery a", "attr": "href"}),
+    "image_url": field({"selector": "img", "attr": "src"}),
+}
 
-# Scroll to trigger dynamic loading elements on the web page
-def scroll_to_bottom(driver, step=300, pause=0.75):
-    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    time.sleep(pause)
-    current_scroll = driver.execute_script("return window.pageYOffset;")
-    while current_scroll > 0:
-        new_scroll = max(0, current_scroll - step)
-        driver.execute_script(f"window.scrollTo(0, {new_scroll});")
-        time.sleep(pause)
-        current_scroll = new_scroll
 
+def _parse_card(card):
+    """Per-card fallback for cards the batch selectors can't fully read."""
+    link_container = card.find_element(By.CSS_SELECTOR, "div.product-item__product-gallery")
+    link_elem = link_container.find_element(By.TAG_NAME, "a")
+    product_url = link_elem.get_attribute("href")
+    title = link_elem.get_attribute("aria-label")
 
-def scrape_society6(pages=1, limit=None, headless=False, start_page=1):
+    artist_elem = card.find_element(By.CSS_SELECTOR, "div.artist-link")
+    artist = artist_elem.find_element(By.TAG_NAME, "a").text.strip()
+
+    price_elem = card.find_element(By.CSS_SELECTOR, "span.product-item__product-price-label")
+    price = price_elem.text.strip()
+
+    img_elem = card.find_element(By.CSS_SELECTOR, "img")
+    image_url = img_elem.get_attribute("src")
+
+    return {
+        "title": title,
+        "artist": artist,
+        "price": price,
+        "product_url": product_url,
+        "image_url": image_url
+    }
+
+
+def scrape_society6(pages=1, limit=None, headless=False, start_page=1, pool=None, engine="selenium"):
     """
     Scrape Society6 hoodie listings.
 
@@ -28,60 +53,46 @@ def scrape_society6(pages=1, limit=None, headless=False, start_page=1):
         limit (int|None): maximum number of hoodie data to scrape.
         headless (bool): run browser headless.
         start_page (int): first page number to scrape (defaults to 1).
+        pool (DriverPool|None): browsers to lease from; defaults to the shared pool.
+        engine (str): "selenium", or "http" to read the page's structured data
+            without a browser, using Selenium only for pages that have none.
     """
     base_url = "https://society6.com/collections/hoodies?page={page}"
-    driver = setup_driver(headless=headless)
-    wait = WebDriverWait(driver, 20)
+    pool = pool or get_pool(setup_driver, headless=headless)
     all_results = []
 
     # checks different web pages for hoodie data
     for page in range(start_page, start_page + pages):
         url = base_url.format(page=page)
         print(f"Scraping Society6 page {page}: {url}")
-        driver.get(url)
-
-        wait.until(EC.presence_of_element_located(
-            (By.CSS_SELECTOR, "ol.algolia-products-grid__grid"))
-        )
-
-        scroll_to_bottom(driver)
 
-        container = driver.find_element(By.CSS_SELECTOR, "ol.algolia-products-grid__grid")
-        product_cards = container.find_elements(By.CSS_SELECTOR, "li.algolia-products-grid__product-item")
-
-        for card in product_cards:
-            try:
-                link_container = card.find_element(By.CSS_SELECTOR, "div.product-item__product-gallery")
-                link_elem = link_container.find_element(By.TAG_NAME, "a")
-                product_url = link_elem.get_attribute("href")
-                title = link_elem.get_attribute("aria-label")
-
-                artist_elem = card.find_element(By.CSS_SELECTOR, "div.artist-link")
-                artist = artist_elem.find_element(By.TAG_NAME, "a").text.strip()
+        if engine == "http":
+            items = extract_listing(url, "society6")
+            if items:
+                all_results.extend(items)
+                if limit and len(all_results) >= limit:
+                    return all_results[:limit]
+                continue
+            print(f"No usable structured listing data on page {page}, falling back to Selenium")
 
-                price_elem = card.find_element(By.CSS_SELECTOR, "span.product-item__product-price-label")
-                price = price_elem.text.strip()
+        with pool.lease() as lease:
+            driver = lease.driver
+            wait = WebDriverWait(driver, 20)
+            driver.get(url)
 
-                img_elem = card.find_element(By.CSS_SELECTOR, "img")
-                image_url = img_elem.get_attribute("src")
+            wait.until(EC.presence_of_element_located(
+                (By.CSS_SELECTOR, "ol.algolia-products-grid__grid"))
+            )
 
-                all_results.append({
-                    "title": title,
-                    "artist": artist,
-                    "price": price,
-                    "product_url": product_url,
-                    "image_url": image_url
-                })
+            # Scroll to trigger dynamic loading elements on the web page
+            scroll_until_loaded(driver, CARD_SELECTOR)
 
-                if limit and len(all_results) >= limit:
-                    driver.quit()
-                    return all_results
+            all_results.extend(extract_cards(driver, GRID_CARD_SELECTOR, CARD_FIELDS, _parse_card))
+            report_transfer(driver, f"Society6 page {page}")
 
-            except Exception as e:
-                print(f"Error parsing a product card: {e}")
-                continue
+            if limit and len(all_results) >= limit:
+                return all_results[:limit]
 
-    driver.quit()
     return all_results
 
 
@@ -94,11 +105,11 @@ def main():
 
     if mode == "top10":
         data = scrape_society6(pages=1, limit=10, start_page=1, headless=True)
-        save_to_json(data, "top10_society6.json")
+        save_to_jsonl(data, "top10_society6.jsonl")
         print(f"Saved {len(data)} hoodies (top 10)")
     else:
         data = scrape_society6(pages=21, start_page=1, headless=True)  # 21 pages max
-        save_to_json(data, "society6.json")
+        save_to_jsonl(data, "society6.jsonl")
         print(f"Saved {len(data)} hoodies (all)")
 
 
@@ -0,0 +1,18 @@
+import os
+
+import pytest
+
+from utils import checkpoint, save_data
+
+
+@pytest.fixture
+def raw_dir(tmp_path, monkeypatch):
+    """Send everything written under data/raw to a temporary directory."""
+
+    def raw_data_path(fname):
+        os.makedirs(tmp_path, exist_ok=True)
+        return os.path.join(tmp_path, fname)
+
+    monkeypatch.setattr(save_data, "raw_data_path", raw_data_path)
+    monkeypatch.setattr(checkpoint, "raw_data_path", raw_data_path)
+    return tmp_path
@@ -0,0 +1,51 @@
+from utils.checkpoint import Checkpoint, dedupe
+
+
+def item(url):
+    return {"title": url, "product_url": url}
+
+
+def urls(checkpoint):
+    return [i["product_url"] for i in checkpoint.items()]
+
+
+def test_dedupe_skips_seen_and_missing_urls():
+    seen = {"a"}
+    fresh = dedupe([item("a"), item("b"), {"title": "no url"}, item("b"), item("c")], seen)
+    assert [i["product_url"] for i in fresh] == ["b", "c"]
+    assert seen == {"a", "b", "c"}
+
+
+def test_resume_restores_pages_and_seen(raw_dir):
+    cp = Checkpoint("site")
+    assert cp.record_page(1, [item("u1"), item("u2")]) == [item("u1"), item("u2")]
+    cp.record_page(2, [item("u2"), item("u3")])
+
+    resumed = Checkpoint("site", resume=True)
+    assert resumed.completed == {1, 2}
+    assert urls(resumed) == ["u1", "u2", "u3"]
+    assert resumed.record_page(3, [item("u3"), item("u4")]) == [item("u4")]
+
+
+def test_without_resume_starts_over(raw_dir):
+    Checkpoint("site").record_page(1, [item("u1")])
+    fresh = Checkpoint("site")
+    assert fresh.completed == set()
+    assert urls(fresh) == []
+
+
+def test_crash_mid_write_keeps_every_item(raw_dir):
+    cp = Checkpoint("site")
+    cp.record_page(1, [item("u1"), item("u2")])
+    # Crash while writing page 2: half a record on disk, page not marked done
+    with open(cp.items_path, "a", encoding="utf-8") as f:
+        f.write('{"title": "u3", "product_u')
+
+    resumed = Checkpoint("site", resume=True)
+    assert resumed.completed == {1}
+    assert "u3" not in resumed.seen
+    # Page 2 is scraped again, then the run goes on
+    resumed.record_page(2, [item("u3")])
+    resumed.record_page(3, [item("u4")])
+
+    assert urls(Checkpoint("site", resume=True)) == ["u1", "u2", "u3", "u4"]
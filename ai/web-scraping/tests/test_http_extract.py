@@ -0,0 +1,149 @@
+import os
+
+import pytest
+
+from utils import http_extract
+from utils.http_extract import check_listing, json_blobs, parse_cards, parse_listing
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def load(name):
+    with open(os.path.join(FIXTURES, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def test_redbubble_next_data():
+    records = parse_listing(load("redbubble_next_data.html"), "redbubble")
+    assert len(records) == 100
+    assert records[0] == {
+        "title": "Retro Sunset Hoodie 1",
+        "artist": "Artist 1",
+        "price": "GBP 41",
+        "product_url": "https://www.redbubble.com/i/hoodie/Retro-Sunset-1-by-artist1/170000001.BN4XF",
+        "image_url": "https://ih1.redbubble.net/image.1.jpg",
+    }
+    # Colour variants nested in a product are not products of their own
+    assert not any("?color=" in r["product_url"] for r in records)
+    assert check_listing(records, "redbubble") is None
+
+
+def test_society6_json_ld():
+    records = parse_listing(load("society6_jsonld.html"), "society6")
+    assert [r["title"] for r in records[:2]] == ["Moon Phases Hoodie 1", "Moon Phases Hoodie 2"]
+    assert records[0]["artist"] == "Studio 1"
+    assert records[0]["price"] == "USD 54.00"
+    assert records[0]["image_url"] == "https://ctl.s6img.com/society6/img/1/w_700/hoodie.jpg"
+    assert check_listing(records, "society6") is None
+
+
+def test_threadless_inline_state():
+    records = parse_listing(load("threadless_apollo.html"), "threadless")
+    assert len(records) == 48
+    assert records[0]["product_url"] == "https://www.threadless.com/designs/space-cat-1/mens/pullover-hoody"
+    assert records[0]["artist"] == "cat1"
+    assert records[0]["price"] == "$45.00"
+    # Threadless cards may lack artist and price in the browser too
+    assert records[3]["artist"] == records[3]["price"] == ""
+    assert check_listing(records, "threadless") is None
+
+
+def test_partial_page_needs_the_browser():
+    records = parse_listing(load("redbubble_partial.html"), "redbubble")
+    assert len(records) == 8
+    assert "8 of ~119" in check_listing(records, "redbubble")
+
+
+def test_missing_required_fields_need_the_browser():
+    records = parse_listing(load("society6_missing_price.html"), "society6")
+    assert len(records) == 30
+    assert check_listing(records, "society6").startswith("3 card(s) missing")
+
+
+def test_page_without_data():
+    html = "<html><head><script>var x = 1;</script></head><body>No data</body></html>"
+    assert parse_listing(html, "redbubble") == []
+    assert check_listing([], "redbubble") is not None
+
+
+def test_json_blobs_skips_broken_json():
+    html = (
+        '<script type="application/json">{"broken": </script>'
+        '<script>window.__STATE__ = {"a": 1}; window.__OTHER__ = {"b": [2]};</script>'
+    )
+    assert list(json_blobs(html)) == [{"a": 1}, {"b": [2]}]
+
+
+def card_html(href, n):
+    # Image link and title link to the same product, as listing grids render them
+    return (
+        f'<div class="card"><a href="{href}"><img src="/img/{n}.jpg" alt="Design {n}"></a>'
+        f'<a href="{href}"><h3>Design {n}</h3><span>by maker{n}</span><span>$45.00</span></a></div>'
+    )
+
+
+def test_server_rendered_cards():
+    cards = "".join(card_html(f"/designs/design-{n}", n) for n in range(48))
+    html = f'<html><body><a href="/about">About</a>{cards}</body></html>'
+    records = parse_listing(html, "threadless")
+    assert len(records) == 48
+    assert records[5] == {
+        "title": "Design 5",
+        "artist": "maker5",
+        "price": "$45.00",
+        "product_url": "https://www.threadless.com/designs/design-5",
+        "image_url": "https://www.threadless.com/img/5.jpg",
+    }
+    assert check_listing(records, "threadless") is None
+
+
+def test_cards_fill_in_partial_structured_data():
+    html = load("redbubble_partial.html")
+    cards = "".join(
+        card_html(f"/i/hoodie/Retro-Sunset-{n}-by-artist{n}/{170000000 + n}.BN4XF", n) for n in range(1, 120)
+    )
+    records = parse_listing(html.replace("</body>", cards + "</body>"), "redbubble")
+    assert len(records) == 119
+    # Structured data wins where it has a value
+    assert records[0]["title"] == "Retro Sunset Hoodie 1"
+    assert records[0]["image_url"] == "https://ih1.redbubble.net/image.1.jpg"
+    assert records[100]["artist"] == "maker101"
+    assert records[100]["image_url"] == "https://www.redbubble.com/img/101.jpg"
+    assert check_listing(records, "redbubble") is None
+
+
+def test_cards_read_lazy_images_and_skip_placeholders():
+    html = (
+        '<a href="/products/a"><img src="data:image/gif;base64,R0lGOD" data-src="https://cdn/a.jpg"></a>'
+        '<a href="/products/b"><img srcset="https://cdn/b-1x.jpg 1x, https://cdn/b-2x.jpg 2x"></a>'
+        '<a href="/products/c">No image</a>'
+    )
+    assert [c["image_url"] for c in parse_cards(html, "society6")] == ["https://cdn/a.jpg", "https://cdn/b-1x.jpg"]
+
+
+class FakeResponse:
+    def __init__(self, text, status=200):
+        self.text = text
+        self.status = status
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise RuntimeError(f"HTTP {self.status}")
+
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+
+    def get(self, url, timeout):
+        return self.response
+
+
+@pytest.mark.parametrize("fixture, status, expected", [
+    ("society6_jsonld.html", 200, 30),
+    ("society6_missing_price.html", 200, 0),
+    ("society6_jsonld.html", 503, 0),
+])
+def test_extract_listing_falls_back_with_empty_result(monkeypatch, fixture, status, expected):
+    monkeypatch.setattr(http_extract, "get_session", lambda: FakeSession(FakeResponse(load(fixture), status)))
+    assert len(http_extract.extract_listing("https://society6.com/collections/hoodies", "society6")) == expected
@@ -0,0 +1,64 @@
+import threading
+import time
+
+from PIL import Image
+
+from utils import ocr_filter
+from utils.ocr_filter import filter_no_text
+
+# image_url -> (size, has text)
+IMAGES = {
+    "text": ((400, 400), True),
+    "plain": ((400, 400), False),
+    "tiny": ((64, 64), False),
+}
+
+
+def item(n, kind):
+    return {"product_url": f"p{n}", "image_url": f"{kind}#{n}"}
+
+
+def stub_pipeline(monkeypatch, delay=lambda n: 0.0):
+    fetched = []
+    lock = threading.Lock()
+
+    def fetch(url):
+        kind, n = url.split("#")
+        with lock:
+            fetched.append(int(n))
+        time.sleep(delay(int(n)))
+        if kind == "broken":
+            return None
+        size, text = IMAGES[kind]
+        return Image.new("RGB", size, "red" if text else "white")
+
+    monkeypatch.setattr(ocr_filter, "fetch_image_from_url", fetch)
+    monkeypatch.setattr(ocr_filter, "has_text_in_image", lambda img: img.getpixel((0, 0)) == (255, 0, 0))
+    return fetched
+
+
+def test_verdicts_keep_input_order(monkeypatch):
+    # Earlier items finish last, so verdicts arrive out of order
+    stub_pipeline(monkeypatch, delay=lambda n: (10 - n) * 0.005)
+    kinds = ["plain", "text", "tiny", "plain", "broken", "plain", "text", "plain", "plain", "tiny"]
+    items = [item(n, kind) for n, kind in enumerate(kinds)]
+
+    kept = filter_no_text(items, limit=10, fetch_workers=4, ocr_workers=2)
+    assert [i["product_url"] for i in kept] == ["p0", "p3", "p5", "p7", "p8"]
+
+
+def test_stops_once_limit_leading_items_pass(monkeypatch):
+    fetched = stub_pipeline(monkeypatch, delay=lambda n: 0.02)
+    kinds = ["text", "plain", "tiny", "plain"] + ["plain"] * 30
+    items = [item(n, kind) for n, kind in enumerate(kinds)]
+
+    kept = filter_no_text(items, limit=2, fetch_workers=1, ocr_workers=1)
+    assert [i["product_url"] for i in kept] == ["p1", "p3"]
+    # The remaining downloads were skipped
+    assert len(fetched) < len(items) // 2
+
+
+def test_empty_and_missing_urls(monkeypatch):
+    stub_pipeline(monkeypatch)
+    assert filter_no_text([], limit=3) == []
+    assert filter_no_text([{"product_url": "p"}], limit=3) == []
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from utils.save_data import RecordWriter, iter_records, save_to_jsonl, trim_torn_tail
+
+
+def test_writer_output_is_readable_mid_run_and_renamed_on_finalize(tmp_path):
+    path = str(tmp_path / "items.jsonl")
+    with RecordWriter(path, flush_every=2) as writer:
+        writer.write_all([{"n": 1}, {"n": 2}, {"n": 3}])
+        # The first two were flushed; the target doesn't exist yet
+        assert list(iter_records(path)) == [{"n": 1}, {"n": 2}]
+        assert not (tmp_path / "items.jsonl").exists()
+
+    assert writer.count == 3
+    assert list(iter_records(path)) == [{"n": 1}, {"n": 2}, {"n": 3}]
+    assert not (tmp_path / "items.jsonl.partial").exists()
+
+
+def test_failed_run_leaves_partial_and_keeps_old_target(tmp_path):
+    path = tmp_path / "items.jsonl"
+    path.write_text('{"old": true}\n', encoding="utf-8")
+    with pytest.raises(RuntimeError):
+        with RecordWriter(str(path)) as writer:
+            writer.write({"new": True})
+            raise RuntimeError("scraper died")
+
+    assert list(iter_records(str(path))) == [{"old": True}]
+    assert (tmp_path / "items.jsonl.partial").exists()
+
+
+def test_rewrite_in_place(tmp_path):
+    path = str(tmp_path / "items.jsonl")
+    writer = RecordWriter(path)
+    writer.write_all({"n": n} for n in range(5))
+    writer.finalize()
+
+    with RecordWriter(path) as out:
+        for record in iter_records(path):
+            out.write({**record, "double": record["n"] * 2})
+    assert [r["double"] for r in iter_records(path)] == [0, 2, 4, 6, 8]
+
+
+def test_iter_records_stops_at_torn_line(tmp_path):
+    path = tmp_path / "items.jsonl"
+    # A crash can cut a record inside a multi-byte character
+    torn = '{"title": "Café"}'.encode()[:-4]
+    path.write_bytes(b'{"a": 1}\n\n{"a": 2}\n' + torn)
+    assert list(iter_records(str(path))) == [{"a": 1}, {"a": 2}]
+
+
+def test_append_trims_torn_tail(tmp_path):
+    path = tmp_path / "items.jsonl"
+    path.write_bytes(b'{"a": 1}\n{"a": 2')
+    with RecordWriter(str(path), append=True) as writer:
+        writer.write({"a": 3})
+    assert path.read_bytes() == b'{"a": 1}\n{"a": 3}\n'
+
+    trim_torn_tail(str(path))  # already clean
+    assert path.read_bytes() == b'{"a": 1}\n{"a": 3}\n'
+
+
+def test_save_to_jsonl(raw_dir):
+    assert save_to_jsonl(iter([{"title": "Café"}, {"title": "x"}]), "out.jsonl") == 2
+    lines = (raw_dir / "out.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == [{"title": "Café"}, {"title": "x"}]
+
+    assert save_to_jsonl([], "empty.jsonl") == 0
+    assert (raw_dir / "empty.jsonl").read_text(encoding="utf-8") == ""
@@ -1,44 +1,58 @@
 import sys
 import time
-from utils.driver_setup import stealth_setup_driver
-from utils.save_data import save_to_json
+from utils.card_extract import extract_cards, field
+from utils.driver_setup import get_pool, report_transfer, stealth_setup_driver
+from utils.http_extract import extract_listing
+from utils.save_data import save_to_jsonl
+from utils.scrolling import scroll_until_loaded
 from selenium.common.exceptions import NoSuchWindowException, WebDriverException, TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-
-def _safe_get(driver_factory, url, headless, max_retries=3, page_load_wait=25, backoff=1.25):
+STEALTH_PAGES_PER_DRIVER = 5
+CARD_SELECTOR = 'div.grid-item'
+FALLBACK_CARD_SELECTOR = 'a.pjax-link.media-image.discover-as-product-linkback-mc, a.sf-shop-design-title.pjax-link'
+PRODUCT_LINK_SELECTOR = 'a.pjax-link.media-image.discover-as-product-linkback-mc'
+CARD_FIELDS = {
+    "title": field(
+        'a.sf-shop-design-title.pjax-link',
+        {"selector": PRODUCT_LINK_SELECTOR, "attr": "title"},
+        optional=True,
+    ),
+    "artist": field('a.sf-by-line.pjax-link', optional=True),
+    "price": field('span.active_price', optional=True),
+    "product_url": field({"selector": PRODUCT_LINK_SELECTOR, "attr": "href"}, {"selector": "a", "attr": "href"}),
+    "image_url": field(
+        {"selector": "img.img-responsive, img", "attr": "src"},
+        {"selector": "img.img-responsive, img", "attr": "data-src"},
+    ),
+}
+
+
+def _safe_get(lease, url, max_retries=3, page_load_wait=25, backoff=1.25):
     """
-    Attempt to renavigate to URL if session is lost and recreate drivers
-    Returns (driver, ok_bool).
+    Navigate the leased driver to URL, swapping in a fresh driver if the
+    session is lost. Returns ok_bool; the working driver is `lease.driver`.
     """
-    driver = driver_factory(headless=headless)
     for attempt in range(max_retries):
         try:
-            driver.get(url)
-            WebDriverWait(driver, page_load_wait).until(
+            lease.driver.get(url)
+            WebDriverWait(lease.driver, page_load_wait).until(
                 lambda d: d.execute_script("return document.readyState") in ("interactive", "complete")
             )
-            return driver, True
-        except NoSuchWindowException:
-            try:
-                driver.quit()
-            except Exception:
-                pass
+            return True
+        except (NoSuchWindowException, WebDriverException):
             time.sleep(backoff * (attempt + 1))
-            driver = driver_factory(headless=headless)
-        except WebDriverException:
-            try:
-                driver.quit()
-            except Exception:
-                pass
-            time.sleep(backoff * (attempt + 1))
-            driver = driver_factory(headless=headless)
-    return driver, False
+            lease.renew()
+    return False
 
 
 def _dismiss_cookie_banner(driver):
+    # A reused browser keeps its consent cookie, so only wait for the banner once
+    if getattr(driver, "cookie_banner_dismissed", False):
+        return
+    driver.cookie_banner_dismissed = True
     try:
         btn = WebDriverWait(driver, 5).until(
             EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler"))
@@ -49,13 +63,52 @@ def _dismiss_cookie_banner(driver):
         pass
 
 
-def _progressive_scroll(driver, passes=12, pause=0.9):
-    for _ in range(passes):
-        driver.execute_script("window.scrollBy(0, Math.floor(window.innerHeight*0.9));")
-        time.sleep(pause)
+def _parse_card(card):
+    """Per-card fallback for cards the batch selectors can't fully read."""
+    try:
+        link_elem = card.find_element(By.CSS_SELECTOR, PRODUCT_LINK_SELECTOR)
+    except Exception:
+        link_elem = card.find_element(By.CSS_SELECTOR, 'a')
+
+    product_url = link_elem.get_attribute("href")
+
+    try:
+        title_elem = card.find_element(By.CSS_SELECTOR, 'a.sf-shop-design-title.pjax-link')
+        title = title_elem.text.strip()
+    except Exception:
+        title = (link_elem.get_attribute("title") or "").strip()
 
+    try:
+        artist_elem = card.find_element(By.CSS_SELECTOR, 'a.sf-by-line.pjax-link')
+        artist = artist_elem.text.strip()
+    except Exception:
+        artist = ""
 
-def scrape_threadless(pages=1, limit=None, headless=False, start_page=1):
+    try:
+        price_elem = card.find_element(By.CSS_SELECTOR, 'span.active_price')
+        price = price_elem.text.strip()
+    except Exception:
+        price = ""
+
+    try:
+        img_elem = card.find_element(By.CSS_SELECTOR, 'img.img-responsive, img')
+        image_url = img_elem.get_attribute("src") or img_elem.get_attribute("data-src")
+    except Exception:
+        image_url = ""
+
+    if not product_url or not image_url:
+        return None
+
+    return {
+        "title": title,
+        "artist": artist,
+        "price": price,
+        "product_url": product_url,
+        "image_url": image_url
+    }
+
+
+def scrape_threadless(pages=1, limit=None, headless=False, start_page=1, pool=None, engine="selenium"):
     """
     Scrape Threadless hoodie listings.
 
@@ -64,12 +117,17 @@ def scrape_threadless(pages=1, limit=None, headless=False, start_page=1):
         limit (int|None): maximum number of hoodie data to scrape.
         headless (bool): run browser headless.
         start_page (int): first page number to scrape (defaults to 1).
+        pool (DriverPool|None): browsers to lease from; defaults to the shared pool.
+        engine (str): "selenium", or "http" to read the page's structured data
+            without a browser, using Selenium only for pages that have none.
     """
     base_url = (
         "https://www.threadless.com/search/"
         "?sort=popular&departments=mens&style=pullover-hoody&page={page}"
     )
 
+    # Stealth browsers are recycled more often than the others to stay unnoticed
+    pool = pool or get_pool(stealth_setup_driver, headless=headless, max_pages=STEALTH_PAGES_PER_DRIVER)
     all_results = []
 
     for page in range(start_page, start_page + pages):
@@ -79,101 +137,57 @@ def scrape_threadless(pages=1, limit=None, headless=False, start_page=1):
         url = base_url.format(page=page)
         print(f"Scraping Threadless page {page}: {url}")
 
-        driver, ok = _safe_get(stealth_setup_driver, url, headless=headless, max_retries=3)
-        if not ok:
-            print(f"Failed to open page {page}: {url}")
-            try:
-                driver.quit()
-            except Exception:
-                pass
-            continue
+        if engine == "http":
+            items = extract_listing(url, "threadless")
+            if items:
+                all_results.extend(items[:limit - len(all_results)] if limit else items)
+                continue
+            print(f"No usable structured listing data on page {page}, falling back to Selenium")
 
-        wait = WebDriverWait(driver, 25)
+        with pool.lease() as lease:
+            if not _safe_get(lease, url, max_retries=3):
+                print(f"Failed to open page {page}: {url}")
+                lease.broken = True
+                continue
+            driver = lease.driver
 
-        _dismiss_cookie_banner(driver)
+            wait = WebDriverWait(driver, 25)
 
-        _progressive_scroll(driver, passes=12, pause=0.9)
+            _dismiss_cookie_banner(driver)
 
-        try:
-            wait.until(
-                EC.presence_of_element_located(
-                    (By.CSS_SELECTOR, 'div.results-container-app, div.grid, div#browse-listing, main')
-                )
-            )
-        except TimeoutException as e:
-            print(f"Timeout waiting for products on page {page}: {e}")
-            try:
-                driver.quit()
-            except Exception:
-                pass
-            continue
-
-        product_cards = driver.find_elements(By.CSS_SELECTOR, 'div.grid-item')
-        if not product_cards:
-            product_cards = driver.find_elements(
-                By.CSS_SELECTOR,
-                'a.pjax-link.media-image.discover-as-product-linkback-mc, a.sf-shop-design-title.pjax-link'
-            )
-
-        count_start = len(all_results)
+            # Threadless is bot-sensitive, so linger a little on each screen
+            scroll_until_loaded(driver, CARD_SELECTOR, min_dwell=0.4)
 
-        for card in product_cards:
-            if limit and len(all_results) >= limit:
-                break
             try:
-                try:
-                    link_elem = card.find_element(
-                        By.CSS_SELECTOR, 'a.pjax-link.media-image.discover-as-product-linkback-mc'
+                wait.until(
+                    EC.presence_of_element_located(
+                        (By.CSS_SELECTOR, 'div.results-container-app, div.grid, div#browse-listing, main')
                     )
-                except Exception:
-                    link_elem = card.find_element(By.CSS_SELECTOR, 'a')
-
-                product_url = link_elem.get_attribute("href")
-
-                try:
-                    title_elem = card.find_element(By.CSS_SELECTOR, 'a.sf-shop-design-title.pjax-link')
-                    title = title_elem.text.strip()
-                except Exception:
-                    title = (link_elem.get_attribute("title") or "").strip()
-
-                try:
-                    artist_elem = card.find_element(By.CSS_SELECTOR, 'a.sf-by-line.pjax-link')
-                    artist = artist_elem.text.strip()
-                except Exception:
-                    artist = ""
-
-                try:
-                    price_elem = card.find_element(By.CSS_SELECTOR, 'span.active_price')
-                    price = price_elem.text.strip()
-                except Exception:
-                    price = ""
-
-                try:
-                    img_elem = card.find_element(By.CSS_SELECTOR, 'img.img-responsive, img')
-                    image_url = img_elem.get_attribute("src") or img_elem.get_attribute("data-src")
-                except Exception:
-                    image_url = ""
-
-                if not product_url or not image_url:
-                    continue
-
-                all_results.append({
-                    "title": title,
-                    "artist": artist,
-                    "price": price,
-                    "product_url": product_url,
-                    "image_url": image_url
-                })
-            except Exception as e:
-                print(f"Error parsing product card on page {page}: {e}")
+                )
+            except TimeoutException as e:
+                print(f"Timeout waiting for products on page {page}: {e}")
                 continue
 
-        print(f"Collected {len(all_results) - count_start} items from page {page}")
+            count_start = len(all_results)
 
-        try:
-            driver.quit()
-        except Exception:
-            pass
+            records = extract_cards(driver, CARD_SELECTOR, CARD_FIELDS, _parse_card)
+            if not records:
+                # No grid items: treat the product links themselves as cards
+                for card in driver.find_elements(By.CSS_SELECTOR, FALLBACK_CARD_SELECTOR):
+                    try:
+                        record = _parse_card(card)
+                    except Exception as e:
+                        print(f"Error parsing product card on page {page}: {e}")
+                        continue
+                    if record:
+                        records.append(record)
+
+            if limit:
+                records = records[:max(0, limit - len(all_results))]
+            all_results.extend(records)
+
+            print(f"Collected {len(all_results) - count_start} items from page {page}")
+            report_transfer(driver, f"Threadless page {page}")
 
     return all_results
 
@@ -187,11 +201,11 @@ def main():
 
     if mode == "top10":
         data = scrape_threadless(pages=1, limit=10, start_page=1, headless=False)
-        save_to_json(data, "top10_threadless.json")
+        save_to_jsonl(data, "top10_threadless.jsonl")
         print(f"Saved {len(data)} hoodies (top 10)")
     else:
         data = scrape_threadless(pages=25, start_page=1, headless=False)  # 48/page, 25 ≈ 1200
-        save_to_json(data, "threadless.json")
+        save_to_jsonl(data, "threadless.jsonl")
         print(f"Saved {len(data)} hoodies (all)")
 
 
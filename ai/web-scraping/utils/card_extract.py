@@ -0,0 +1,81 @@
+from selenium.webdriver.common.by import By
+
+# Reads every card on the page in one call. Each field lists alternatives
+# tried in order: the first element matching `selector` (or, with
+# `contains`, the first whose text contains it) gives the value from `attr`
+# ("text" by default; properties like href/src come back absolute, as
+# Selenium's get_attribute does). A card missing a required field comes
+# back as null.
+EXTRACT_SCRIPT = """
+const [cardSelector, fields] = arguments;
+
+function read(el, attr) {
+    if (!attr || attr === 'text') return el.innerText;
+    const value = el[attr];
+    return typeof value === 'string' ? value : el.getAttribute(attr);
+}
+
+function pick(card, alternatives) {
+    for (const alt of alternatives) {
+        const els = alt.contains ? card.querySelectorAll(alt.selector) : [card.querySelector(alt.selector)];
+        for (const el of els) {
+            if (!el) continue;
+            let value = read(el, alt.attr);
+            if (typeof value !== 'string') continue;
+            if (alt.contains && !value.includes(alt.contains)) continue;
+            if (alt.strip) value = value.split(alt.strip).join('');
+            value = value.trim();
+            if (value) return value;
+        }
+    }
+    return null;
+}
+
+return Array.from(document.querySelectorAll(cardSelector), card => {
+    const record = {};
+    for (const [name, spec] of Object.entries(fields)) {
+        const value = pick(card, spec.alternatives);
+        if (value === null && !spec.optional) return null;
+        record[name] = value ?? '';
+    }
+    return record;
+});
+"""
+
+
+def field(*alternatives, optional=False):
+    """
+    Build one entry of a selector map. Each alternative is a CSS selector or
+    a dict with `selector` and optionally `attr`, `contains` and `strip`.
+    """
+    alts = [alt if isinstance(alt, dict) else {"selector": alt} for alt in alternatives]
+    return {"alternatives": alts, "optional": optional}
+
+
+def extract_cards(driver, card_selector, fields, parse_card):
+    """
+    Return the records of every card matching `card_selector`, in page order.
+
+    All cards are read with a single execute_script using the `fields`
+    selector map, instead of several WebDriver round trips per card. Cards
+    the map can't fully read are passed as WebElements to `parse_card`, the
+    scraper's per-card parser, which may return None or raise to skip them.
+    """
+    records = driver.execute_script(EXTRACT_SCRIPT, card_selector, fields) or []
+    cards = None
+    results = []
+    for i, record in enumerate(records):
+        if record is None:
+            if cards is None:
+                cards = driver.find_elements(By.CSS_SELECTOR, card_selector)
+            if i >= len(cards):
+                continue
+            try:
+                record = parse_card(cards[i])
+            except Exception as e:
+                print(f"Error parsing product card: {e}")
+                continue
+            if record is None:
+                continue
+        results.append(record)
+    return results
@@ -0,0 +1,81 @@
+import json
+import os
+
+from utils.save_data import RecordWriter, iter_records, raw_data_path, trim_torn_tail
+
+CHECKPOINT_DIR = "checkpoints"
+
+
+def dedupe(items, seen):
+    """Return items whose product_url isn't in `seen`, adding their URLs to it."""
+    fresh = []
+    for item in items:
+        url = item.get("product_url")
+        if not url or url in seen:
+            continue
+        seen.add(url)
+        fresh.append(item)
+    return fresh
+
+
+class Checkpoint:
+    """
+    On-disk progress of one source's scrape.
+
+    Items are appended to `<name>.jsonl` as each page finishes and the page is
+    then recorded in `<name>.json`, so a crash loses at most the page in
+    progress. With `resume=True` the completed pages and already seen
+    product URLs are loaded back; otherwise any previous checkpoint is
+    discarded. A line left half-written by a crash is cut off on resume, so
+    the next append starts on a fresh line.
+    """
+
+    def __init__(self, name, resume=False):
+        os.makedirs(raw_data_path(CHECKPOINT_DIR), exist_ok=True)
+        self.items_path = raw_data_path(os.path.join(CHECKPOINT_DIR, f"{name}.jsonl"))
+        self.state_path = raw_data_path(os.path.join(CHECKPOINT_DIR, f"{name}.json"))
+        self.completed = set()
+        self.seen = set()
+
+        if resume:
+            self._load()
+        else:
+            self.clear()
+
+    def _load(self):
+        if os.path.exists(self.state_path):
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                self.completed = set(json.load(f).get("completed_pages", []))
+        trim_torn_tail(self.items_path)
+        # Only URLs whose records read back count as seen; anything else is
+        # scraped again when its page is redone
+        for item in self.items():
+            self.seen.add(item.get("product_url"))
+
+    def items(self):
+        """Lazily iterate the checkpointed items."""
+        if not os.path.exists(self.items_path):
+            return iter(())
+        return iter_records(self.items_path)
+
+    def record_page(self, page, items):
+        """Append the page's unseen items and mark it done. Returns the items kept."""
+        fresh = [item for item in dedupe(items, set()) if item["product_url"] not in self.seen]
+        with RecordWriter(self.items_path, append=True) as writer:
+            writer.write_all(fresh)
+        # Seen only once they're safely on disk
+        self.seen.update(item["product_url"] for item in fresh)
+
+        self.completed.add(page)
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"completed_pages": sorted(self.completed)}, f)
+        os.replace(tmp_path, self.state_path)
+        return fresh
+
+    def clear(self):
+        for path in (self.items_path, self.state_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.completed = set()
+        self.seen = set()
@@ -1,10 +1,63 @@
+import atexit
+import json
+import os
+import threading
+from contextlib import contextmanager
+
 from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.options import Options
 import undetected_chromedriver as uc
 
-def setup_driver(headless=False):
+# Lean profile: skip downloading what the scrapers never look at. Images are
+# blocked through prefs, so <img> tags and their src/data-src attributes
+# still land in the DOM, just without the pixels
+LEAN_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.default_content_setting_values.notifications": 2,
+}
+BLOCKED_URL_PATTERNS = [
+    # fonts and media
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3",
+    # analytics, ads and session recorders
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*googleadservices.com*", "*facebook.net*",
+    "*connect.facebook.com*", "*hotjar.com*", "*clarity.ms*", "*segment.io*",
+    "*segment.com*", "*criteo.*", "*tiktok.com*", "*bat.bing.com*",
+    "*nr-data.net*", "*newrelic.com*", "*optimizely.com*", "*quantserve.com*",
+    "*scorecardresearch.com*", "*pinterest.com/ct*", "*snapchat.com*",
+]
+
+
+def lean_enabled():
+    # Read at driver start so `scrape.py --lean` reaches spawned workers
+    return os.getenv("SCRAPE_LEAN_BROWSER") == "1"
+
+
+def transfer_report_enabled():
+    return lean_enabled() or os.getenv("SCRAPE_TRANSFER_REPORT") == "1"
+
+
+def _configure_options(options, lean):
+    if lean:
+        options.add_experimental_option("prefs", LEAN_PREFS)
+    if lean or transfer_report_enabled():
+        # Network events in the performance log are what transfer_stats sums
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+
+def _prepare_driver(driver, lean):
+    if lean:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    driver.transfer_logging = lean or transfer_report_enabled()
+    return driver
+
+
+def setup_driver(headless=False, lean=None):
     options = Options()
     if headless:
         options.add_argument("--headless")
@@ -13,12 +66,14 @@ def setup_driver(headless=False):
     options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/113.0.0.0 Safari/537.36")
     options.add_argument("--disable-gpu")
     options.add_argument("--no-sandbox")
+    lean = lean_enabled() if lean is None else lean
+    _configure_options(options, lean)
 
     service = Service(ChromeDriverManager().install())
     driver = webdriver.Chrome(service=service, options=options)
-    return driver
+    return _prepare_driver(driver, lean)
 
-def stealth_setup_driver(headless=False):
+def stealth_setup_driver(headless=False, lean=None):
     options = uc.ChromeOptions()
     if headless:
         options.add_argument("--headless=new")
@@ -26,6 +81,181 @@ def stealth_setup_driver(headless=False):
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-gpu")
     options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/113.0.0.0 Safari/537.36")
+    lean = lean_enabled() if lean is None else lean
+    _configure_options(options, lean)
 
     driver = uc.Chrome(options=options, headless=headless)
-    return driver
+    return _prepare_driver(driver, lean)
+
+
+def transfer_stats(driver):
+    """
+    Network totals since the last call, from the driver's performance log:
+    {"bytes", "requests", "blocked", "load_seconds"}. None if the driver
+    wasn't started with transfer logging.
+    """
+    if not getattr(driver, "transfer_logging", False):
+        return None
+    stats = {"bytes": 0, "requests": 0, "blocked": 0, "load_seconds": None}
+    try:
+        entries = driver.get_log("performance")
+    except WebDriverException:
+        return None
+    for entry in entries:
+        message = json.loads(entry["message"])["message"]
+        method = message.get("method")
+        if method == "Network.loadingFinished":
+            stats["requests"] += 1
+            stats["bytes"] += int(message["params"].get("encodedDataLength", 0))
+        elif method == "Network.loadingFailed" and message["params"].get("blockedReason"):
+            stats["blocked"] += 1
+    try:
+        duration = driver.execute_script(
+            "const nav = performance.getEntriesByType('navigation')[0];"
+            "return nav ? nav.loadEventEnd - nav.startTime : null;"
+        )
+        if duration:
+            stats["load_seconds"] = duration / 1000
+    except WebDriverException:
+        pass
+    return stats
+
+
+def report_transfer(driver, label):
+    """Print what loading the current page cost, when transfer logging is on."""
+    stats = transfer_stats(driver)
+    if stats is None:
+        return
+    load = f", loaded in {stats['load_seconds']:.1f}s" if stats["load_seconds"] else ""
+    print(
+        f"{label}: {stats['bytes'] / 1024 / 1024:.2f} MB over {stats['requests']} requests"
+        f" ({stats['blocked']} blocked){load}"
+    )
+
+
+def quit_driver(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+def is_alive(driver):
+    """Cheap health check: the session still answers and has a window."""
+    try:
+        return driver.execute_script("return 1") == 1
+    except WebDriverException:
+        return False
+
+
+class Lease:
+    """A driver on loan from a DriverPool; `renew()` swaps in a fresh one."""
+
+    def __init__(self, pool, driver):
+        self.pool = pool
+        self.driver = driver
+        self.broken = False
+
+    def renew(self):
+        quit_driver(self.driver)
+        self.driver = self.pool.create()
+        return self.driver
+
+
+class DriverPool:
+    """
+    Keeps browsers warm between pages and leases them to scrapers.
+
+    A leased driver is health-checked first and replaced if its session has
+    died. It goes back to the pool afterwards unless it failed with a
+    WebDriverException or has served `max_pages` leases, in which case it is
+    quit, so long runs still get a fresh browser now and then.
+    """
+
+    def __init__(self, factory=setup_driver, headless=False, max_pages=20, max_idle=1):
+        self.factory = factory
+        self.headless = headless
+        self.max_pages = max_pages
+        self.max_idle = max_idle
+        self._idle = []
+        self._pages = {}  # id(driver) -> leases served
+        self._lock = threading.Lock()
+
+    def create(self):
+        driver = self.factory(headless=self.headless)
+        self._pages[id(driver)] = 0
+        return driver
+
+    def _acquire(self):
+        while True:
+            with self._lock:
+                driver = self._idle.pop() if self._idle else None
+            if driver is None:
+                return self.create()
+            if is_alive(driver):
+                return driver
+            self._discard(driver)
+
+    def _release(self, driver, broken):
+        pages = self._pages.get(id(driver), 0) + 1
+        self._pages[id(driver)] = pages
+        if broken or pages >= self.max_pages:
+            self._discard(driver)
+            return
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(driver)
+                return
+        self._discard(driver)
+
+    def _discard(self, driver):
+        self._pages.pop(id(driver), None)
+        quit_driver(driver)
+
+    @contextmanager
+    def lease(self):
+        """Lend a driver for one page: `with pool.lease() as lease: lease.driver.get(url)`."""
+        lease = Lease(self, self._acquire())
+        try:
+            yield lease
+        except WebDriverException:
+            lease.broken = True
+            raise
+        finally:
+            self._release(lease.driver, lease.broken)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._discard(driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_pools = {}
+
+
+def get_pool(factory=setup_driver, headless=False, max_pages=20):
+    """
+    Pool shared by every scraper call in this process for (factory, headless).
+
+    Scrapers called once per page (as scrape.py does in top10 mode) reuse the
+    same warm browser. Pools are closed when the process exits.
+    """
+    key = (factory, headless)
+    pool = _pools.get(key)
+    if pool is None:
+        pool = _pools[key] = DriverPool(factory, headless=headless, max_pages=max_pages)
+    return pool
+
+
+@atexit.register
+def close_pools():
+    for pool in _pools.values():
+        pool.close()
+    _pools.clear()
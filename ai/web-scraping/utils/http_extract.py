@@ -0,0 +1,359 @@
+import json
+import re
+import sys
+import threading
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-GB,en;q=0.9",
+}
+HTTP_TIMEOUT = 20
+POOL_SIZE = 4
+
+ALL_FIELDS = ("title", "artist", "price", "product_url", "image_url")
+
+# Where each site's listing data lives: links to product pages contain one
+# of `product_paths`, relative links are resolved against `base`. A full
+# listing page has about `per_page` cards, and `required` are the fields
+# the browser scraper always fills in for that site.
+SITES = {
+    "redbubble": {
+        "base": "https://www.redbubble.com",
+        "product_paths": ("/i/",),
+        "per_page": 119,
+        "required": ALL_FIELDS,
+    },
+    "society6": {
+        "base": "https://society6.com",
+        "product_paths": ("/products/",),
+        "per_page": 30,
+        "required": ALL_FIELDS,
+    },
+    "threadless": {
+        "base": "https://www.threadless.com",
+        "product_paths": ("/designs/", "/design/"),
+        "per_page": 48,
+        "required": ("product_url", "image_url"),
+    },
+}
+# Embedded data covering less of a page than this usually holds just the
+# first few cards (the rest load as you scroll), so the browser reads it
+MIN_PAGE_FILL = 0.5
+
+URL_KEYS = ("url", "productUrl", "product_url", "productURL", "href", "link", "canonicalUrl")
+TITLE_KEYS = ("title", "name", "productTitle", "designTitle")
+IMAGE_KEYS = ("image", "imageUrl", "image_url", "images", "previewImage", "thumbnail",
+              "thumbnailUrl", "featured_image", "featuredImage", "img", "src")
+ARTIST_KEYS = ("artist", "artistName", "artist_name", "creator", "author", "brand", "vendor", "username")
+PRICE_KEYS = ("price", "formattedPrice", "displayPrice", "priceFormatted", "offers", "amount")
+
+# Only script contents matter, and they're raw text in HTML, so a regex scan
+# is enough and far cheaper than tokenizing every tag on the page
+SCRIPT_RE = re.compile(r"<script\b([^>]*)>(.*?)</script\s*>", re.S | re.I)
+ATTR_RE = re.compile(r"""([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""")
+# Card text that reads as a price ("$45.00", "£41", "USD 54") or a byline
+PRICE_RE = re.compile(r"(?:[$£€]|\b(?:USD|GBP|EUR|CAD|AUD)\s?)\s?\d[\d,]*(?:\.\d{1,2})?")
+BYLINE_RE = re.compile(r"^by\s+(.+)$", re.I)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Shared keep-alive session for listing pages."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.headers.update(HEADERS)
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+    return _session
+
+
+def json_blobs(html):
+    """Yield every JSON document embedded in the page's scripts."""
+    decoder = json.JSONDecoder()
+
+    for match in SCRIPT_RE.finditer(html):
+        text = match.group(2).strip()
+        if not text:
+            continue
+        attrs = {
+            m.group(1).lower(): m.group(2) or m.group(3) or m.group(4)
+            for m in ATTR_RE.finditer(match.group(1))
+        }
+        script_type = (attrs.get("type") or "").lower()
+        if script_type.endswith("json"):
+            # JSON-LD, __NEXT_DATA__ and other application/json payloads
+            try:
+                yield json.loads(text)
+            except json.JSONDecodeError:
+                pass
+            continue
+
+        # Inline state like `window.__APOLLO_STATE__ = {...};`
+        start = 0
+        while True:
+            pos = text.find("__", start)
+            if pos < 0:
+                break
+            eq = text.find("=", pos)
+            brace = text.find("{", pos)
+            start = pos + 2
+            if eq < 0 or brace < 0 or brace < eq or text[eq:brace].strip() != "=":
+                continue
+            try:
+                blob, end = decoder.raw_decode(text, brace)
+            except json.JSONDecodeError:
+                continue
+            yield blob
+            start = end
+
+
+def _first(obj, keys):
+    for key in keys:
+        value = obj.get(key)
+        if value not in (None, "", [], {}):
+            return value
+    return None
+
+
+def _text(value, keys=("name", "displayName", "username", "title")):
+    if isinstance(value, dict):
+        value = _first(value, keys)
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, (str, int, float)) and not isinstance(value, bool):
+        return str(value).strip()
+    return ""
+
+
+def _image(value):
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        value = _first(value, ("url", "src", "contentUrl", "originalSrc", "large", "medium"))
+        if isinstance(value, (dict, list)):
+            return _image(value)
+    if isinstance(value, str) and value.strip():
+        return value.strip()
+    return ""
+
+
+def _price(value):
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        formatted = _first(value, ("formatted", "formattedPrice", "display", "displayPrice"))
+        if isinstance(formatted, str):
+            return formatted.strip()
+        amount = _first(value, ("price", "amount", "value", "lowPrice"))
+        if isinstance(amount, (dict, list)):
+            return _price(amount)
+        currency = value.get("priceCurrency") or value.get("currency") or value.get("currencyCode") or ""
+        return f"{currency} {amount}".strip() if amount is not None else ""
+    return _text(value)
+
+
+def _record(obj, site):
+    """Map one JSON object to a listing record, or None if it isn't a product."""
+    url = _first(obj, URL_KEYS)
+    if not isinstance(url, str) or not any(path in url for path in site["product_paths"]):
+        return None
+    title = _text(_first(obj, TITLE_KEYS))
+    image_url = _image(_first(obj, IMAGE_KEYS))
+    if not title or not image_url:
+        return None
+    return {
+        "title": title,
+        "artist": _text(_first(obj, ARTIST_KEYS)),
+        "price": _price(_first(obj, PRICE_KEYS)),
+        "product_url": urljoin(site["base"], url),
+        "image_url": urljoin(site["base"], image_url),
+    }
+
+
+class CardParser(HTMLParser):
+    """
+    Reads server-rendered product cards: every link to a product page and
+    the image, title, byline and price inside it. Links to the same product
+    (usually one around the image, one around the title) make one card.
+    """
+
+    def __init__(self, site):
+        super().__init__(convert_charrefs=True)
+        self.site = site
+        self.cards = {}  # product url -> record, in page order
+        self._card = None  # card whose link is open
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "a":
+            self._close_link()
+            href = attrs.get("href") or ""
+            if not any(path in href for path in self.site["product_paths"]):
+                return
+            url = urljoin(self.site["base"], href)
+            card = self.cards.get(url)
+            if card is None:
+                card = self.cards[url] = {**dict.fromkeys(ALL_FIELDS, ""), "product_url": url}
+            self._fill(card, "title", attrs.get("title") or attrs.get("aria-label"))
+            self._card = card
+        elif tag == "img" and self._card is not None:
+            # Lazy-loaded images keep a placeholder in src until scrolled to
+            srcset = (attrs.get("data-srcset") or attrs.get("srcset") or "").split(",")[0].split()
+            for src in (attrs.get("data-src"), attrs.get("src"), srcset[0] if srcset else None):
+                if src and not src.startswith("data:"):
+                    self._fill(self._card, "image_url", urljoin(self.site["base"], src))
+                    break
+            self._fill(self._card, "title", attrs.get("alt"))
+
+    def handle_endtag(self, tag):
+        if tag == "a":
+            self._close_link()
+
+    def handle_data(self, data):
+        if self._card is not None and data.strip():
+            self._text.append(data.strip())
+
+    def close(self):
+        super().close()
+        self._close_link()
+
+    def _close_link(self):
+        card, text, self._card, self._text = self._card, self._text, None, []
+        if card is None:
+            return
+        for part in text:
+            price, byline = PRICE_RE.search(part), BYLINE_RE.match(part)
+            if price:
+                self._fill(card, "price", price.group(0))
+            elif byline:
+                self._fill(card, "artist", byline.group(1))
+            else:
+                self._fill(card, "title", part)
+
+    @staticmethod
+    def _fill(card, key, value):
+        if value and value.strip() and not card[key]:
+            card[key] = value.strip()
+
+
+def parse_cards(html, site_name):
+    """Return the product cards in the page's HTML that have an image, in page order."""
+    parser = CardParser(SITES[site_name])
+    parser.feed(html)
+    parser.close()
+    return [card for card in parser.cards.values() if card["image_url"]]
+
+
+def parse_listing(html, site_name):
+    """
+    Return the listing records found in the page, in page order and without
+    repeats. An empty list means the page has none.
+
+    Structured data is read first. Only when it fails check_listing is the
+    HTML itself parsed for product cards, which fill in missing fields and
+    add products the data left out; tokenizing the page costs much more
+    than scanning its scripts.
+    """
+    site = SITES[site_name]
+    records = _structured_records(html, site)
+    if check_listing(records, site_name) is None:
+        return records
+
+    by_url = {record["product_url"]: record for record in records}
+    for card in parse_cards(html, site_name):
+        known = by_url.get(card["product_url"])
+        if known is None:
+            records.append(card)
+            by_url[card["product_url"]] = card
+            continue
+        for key, value in card.items():
+            if not known[key]:
+                known[key] = value
+    return records
+
+
+def _structured_records(html, site):
+    records = []
+    seen = set()
+
+    # Iterative walk; product objects aren't descended into, so a product's
+    # nested variants don't show up as extra records
+    for blob in json_blobs(html):
+        stack = [blob]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                stack.extend(reversed(node))
+            elif isinstance(node, dict):
+                record = _record(node, site)
+                if record is None:
+                    stack.extend(reversed(list(node.values())))
+                elif record["product_url"] not in seen:
+                    seen.add(record["product_url"])
+                    records.append(record)
+    return records
+
+
+def check_listing(records, site_name):
+    """
+    Return why `records` can't stand in for the browser's view of the page,
+    or None if they can: too few cards for a full page, or cards missing
+    fields the browser scraper would have read.
+    """
+    site = SITES[site_name]
+    expected = site["per_page"]
+    if len(records) < MIN_PAGE_FILL * expected:
+        return f"only {len(records)} of ~{expected} cards"
+    incomplete = sum(1 for r in records if not all(r.get(f) for f in site["required"]))
+    if incomplete:
+        return f"{incomplete} card(s) missing {'/'.join(site['required'])}"
+    return None
+
+
+def extract_listing(url, site_name):
+    """
+    Fetch a listing page over plain HTTP and parse it. Returns [] when the
+    fetch fails or the page's data fails check_listing, so the caller falls
+    back to the browser.
+    """
+    try:
+        r = get_session().get(url, timeout=HTTP_TIMEOUT)
+        r.raise_for_status()
+    except Exception as e:
+        print(f"HTTP fetch failed for {url}: {e}")
+        return []
+    records = parse_listing(r.text, site_name)
+    problem = check_listing(records, site_name)
+    if problem:
+        print(f"Structured data on {url} is incomplete ({problem})")
+        return []
+    return records
+
+
+if __name__ == "__main__":
+    # Check the parser against a saved page: python http_extract.py redbubble page.html
+    if len(sys.argv) != 3 or sys.argv[1] not in SITES:
+        print(f"Usage: python http_extract.py [{'|'.join(SITES)}] <saved_page.html>")
+        sys.exit(1)
+    with open(sys.argv[2], "r", encoding="utf-8") as f:
+        found = parse_listing(f.read(), sys.argv[1])
+    print(json.dumps(found, ensure_ascii=False, indent=4))
+    problem = check_listing(found, sys.argv[1])
+    print(f"{len(found)} item(s); " + (f"would use the browser: {problem}" if problem else "usable without a browser"),
+          file=sys.stderr)
@@ -0,0 +1,157 @@
+"""
+The top10 OCR filter: keeps listings whose image has no text in it.
+
+Kept apart from scrape.py so it can be used (and tested) without the
+browser-based scrapers.
+"""
+import io
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+from PIL import Image
+from requests.adapters import HTTPAdapter
+
+HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; no-text-scraper/1.0)"}
+HTTP_TIMEOUT = 12
+MIN_SIDE = 128      # skip tiny icons/thumbnails
+MIN_CHARS = 3       # num of char to consider as text
+
+# Image downloads run FETCH_WORKERS at a time over one keep-alive session and
+# feed OCR_WORKERS threads through a queue of at most OCR_QUEUE_SIZE decoded
+# images
+FETCH_WORKERS = 8
+OCR_WORKERS = 2
+OCR_QUEUE_SIZE = 8
+
+_reader = None
+_reader_lock = threading.Lock()
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_reader():
+    """Load the EasyOCR model on first use, so workers that don't OCR never pay for it."""
+    global _reader
+    with _reader_lock:
+        if _reader is None:
+            import easyocr
+            _reader = easyocr.Reader(['en'], gpu=False)
+    return _reader
+
+
+def get_session():
+    """Shared HTTP session, so image downloads reuse pooled keep-alive connections."""
+    global _session
+    # Fetch threads all ask for it at once; one of them builds it
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.headers.update(HEADERS)
+            adapter = HTTPAdapter(pool_connections=FETCH_WORKERS, pool_maxsize=FETCH_WORKERS)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+    return _session
+
+
+def fetch_image_from_url(url: str):
+    """Return PIL.Image (RGB) or None on failure."""
+    try:
+        r = get_session().get(url, timeout=HTTP_TIMEOUT)
+        r.raise_for_status()
+        return Image.open(io.BytesIO(r.content)).convert("RGB")
+    except Exception:
+        return None
+
+
+def too_small(img: Image.Image, min_side=MIN_SIDE) -> bool:
+    w, h = img.size
+    return min(w, h) < min_side
+
+
+def has_text_in_image(img: Image.Image, min_chars=MIN_CHARS) -> bool:
+    """EasyOCR detection for PIL image."""
+    try:
+        arr = np.array(img)
+        results = get_reader().readtext(arr)
+        extracted = " ".join([t[1] for t in results]).strip()
+        return len(extracted) >= min_chars
+    except Exception:
+        # fail-safe: don't over-filter on OCR errors
+        return False
+
+
+def filter_no_text(items, limit, fetch_workers=FETCH_WORKERS, ocr_workers=OCR_WORKERS):
+    """
+    Return the first `limit` items whose image downloads, is big enough and
+    has no text, in their original order.
+
+    Downloads run concurrently and hand decoded images to the OCR threads
+    through a bounded queue, so neither waits on the other per item. Each
+    item's verdict doesn't depend on timing, so the kept set is the same as
+    checking items one by one. Once `limit` leading items have passed, the
+    remaining downloads and OCR are skipped.
+    """
+    verdicts = {}  # index -> keep?
+    settled = threading.Condition()
+    stop = threading.Event()
+    ocr_queue = queue.Queue(maxsize=OCR_QUEUE_SIZE)
+
+    def settle(i, keep):
+        with settled:
+            verdicts[i] = keep
+            settled.notify_all()
+
+    def fetch(i, item):
+        url = item.get("image_url")
+        img = fetch_image_from_url(url) if url and not stop.is_set() else None
+        if img is None or too_small(img):
+            settle(i, False)
+            return
+        # Block while OCR is behind, but give up once enough items are kept
+        while not stop.is_set():
+            try:
+                ocr_queue.put((i, img), timeout=0.5)
+                return
+            except queue.Full:
+                continue
+        settle(i, False)
+
+    def ocr_worker():
+        while True:
+            job = ocr_queue.get()
+            if job is None:
+                return
+            i, img = job
+            settle(i, not stop.is_set() and not has_text_in_image(img))
+
+    ocr_threads = [threading.Thread(target=ocr_worker, daemon=True) for _ in range(max(1, ocr_workers))]
+    for thread in ocr_threads:
+        thread.start()
+
+    kept = []
+    fetch_pool = ThreadPoolExecutor(max_workers=max(1, fetch_workers))
+    try:
+        for i, item in enumerate(items):
+            fetch_pool.submit(fetch, i, item)
+
+        for i, item in enumerate(items):
+            if len(kept) >= limit:
+                break
+            with settled:
+                settled.wait_for(lambda: i in verdicts)
+                keep = verdicts[i]
+            if keep:
+                kept.append(item)
+    finally:
+        stop.set()
+        fetch_pool.shutdown(wait=True, cancel_futures=True)
+        for _ in ocr_threads:
+            ocr_queue.put(None)
+        for thread in ocr_threads:
+            thread.join()
+
+    return kept
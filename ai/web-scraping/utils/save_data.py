@@ -1,16 +1,127 @@
 import os
 import json
 
-def save_to_json(data, fname):
+FLUSH_EVERY = 50  # records between flushes of a RecordWriter
+
+def raw_data_path(fname):
     # Get directory of the current script
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    
+
     # Build path relative to this script
     directory = os.path.join(script_dir, "..", "..", "data", "raw")
     os.makedirs(directory, exist_ok=True)  # Ensure the directory exists
 
-    filename = os.path.join(directory, fname)
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+    return os.path.join(directory, fname)
+
+
+def trim_torn_tail(path):
+    """
+    Cut off a last line left without its newline by a crash mid-write.
+
+    A record only counts once its newline is written (iter_records stops at
+    an unterminated line), so this drops nothing a reader would have seen
+    and the next append starts on a fresh line.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        # Records are small, so the last newline is within the final chunk
+        start = max(0, size - 65536)
+        f.seek(start)
+        tail = f.read()
+        f.truncate(start + tail.rfind(b"\n") + 1)
+
+
+class RecordWriter:
+    """
+    Writes records to `path` as JSON Lines, one record at a time.
+
+    Records go to `<path>.partial` and are flushed every `flush_every`
+    records, so a run's output so far can be read with iter_records while it
+    is still going. `finalize()` (or leaving the `with` block normally)
+    renames it to `path` in one step; after an exception the .partial file
+    is left in place.
+
+    With `append=True` records are added to `path` itself, after trimming a
+    torn last line, and `finalize()` only makes them durable.
+    """
+
+    def __init__(self, path, flush_every=FLUSH_EVERY, append=False):
+        self.path = path
+        self.append = append
+        self.partial_path = None if append else path + ".partial"
+        self.flush_every = flush_every
+        self.count = 0
+        if append:
+            trim_torn_tail(path)
+            self._file = open(path, "a", encoding="utf-8")
+        else:
+            self._file = open(self.partial_path, "w", encoding="utf-8")
+
+    def write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self._file.flush()
+
+    def write_all(self, records):
+        for record in records:
+            self.write(record)
+
+    def finalize(self):
+        if self._file.closed:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        if not self.append:
+            os.replace(self.partial_path, self.path)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.finalize()
+        else:
+            self.close()
+
+
+def iter_records(path):
+    """
+    Lazily yield the records in a JSON Lines file, or in its .partial file
+    while a RecordWriter is still writing it. Reading stops at a line without
+    its newline: the torn tail of a file mid-write or after a crash.
+    """
+    if not os.path.exists(path) and os.path.exists(path + ".partial"):
+        path = path + ".partial"
+    # Binary, so a tail cut inside a multi-byte character isn't decoded
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                return
+            if line.strip():
+                yield json.loads(line)
+
+
+def save_to_jsonl(records, fname):
+    """
+    Stream records (any iterable) to data/raw/<fname> as JSON Lines, the
+    format the processing stages read. Returns the number written.
+    """
+    filename = raw_data_path(fname)
+    with RecordWriter(filename) as writer:
+        writer.write_all(records)
 
-    print(f"Saved {len(data)} items to {filename}")
+    print(f"Saved {writer.count} items to {filename}")
+    return writer.count
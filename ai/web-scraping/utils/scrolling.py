@@ -0,0 +1,63 @@
+import time
+
+# One round trip reports how many cards exist, how many images in the
+# visible cards are still loading, and whether we're at the bottom
+PROBE_SCRIPT = """
+const cards = document.querySelectorAll(arguments[0]);
+const height = window.innerHeight;
+let pending = 0;
+for (const card of cards) {
+    const box = card.getBoundingClientRect();
+    if (box.bottom < 0 || box.top > height) continue;
+    for (const img of card.querySelectorAll('img')) {
+        if (!img.complete || !(img.currentSrc || img.getAttribute('src'))) pending++;
+    }
+}
+const bottom = window.pageYOffset + height >= document.documentElement.scrollHeight - 2;
+return [cards.length, pending, bottom];
+"""
+
+
+def scroll_until_loaded(driver, card_selector, step=0.9, plateau=1.0, max_seconds=40,
+                        step_timeout=2.0, min_poll=0.05, max_poll=0.4, min_dwell=0.0):
+    """
+    Scroll through a lazy-loading listing until no more cards appear.
+
+    Moves down `step` viewports at a time, but only once the images in the
+    visible cards have loaded (or `step_timeout` passes). Polls start at
+    `min_poll` seconds and back off to `max_poll` while nothing changes.
+    Stops when the bottom is reached and the card count has held still for
+    `plateau` seconds, or after `max_seconds`. `min_dwell` is the least
+    time spent on each viewport, for sites that flag fast scrolling.
+
+    Returns the final number of cards matching `card_selector`.
+    """
+    start = time.monotonic()
+    count, pending, at_bottom = driver.execute_script(PROBE_SCRIPT, card_selector)
+    last_change = step_started = start
+    poll = min_poll
+
+    while True:
+        now = time.monotonic()
+        if now - start >= max_seconds:
+            print(f"Stopped scrolling after {max_seconds}s with {count} cards")
+            break
+        if at_bottom and now - last_change >= plateau and (pending == 0 or now - step_started >= step_timeout):
+            break
+
+        settled = pending == 0 or now - step_started >= step_timeout
+        if settled and not at_bottom and now - step_started >= min_dwell:
+            driver.execute_script("window.scrollBy(0, Math.floor(window.innerHeight * arguments[0]));", step)
+            step_started = now
+            poll = min_poll
+
+        time.sleep(poll)
+        new_count, pending, at_bottom = driver.execute_script(PROBE_SCRIPT, card_selector)
+        if new_count != count:
+            count = new_count
+            last_change = time.monotonic()
+            poll = min_poll
+        else:
+            poll = min(poll * 2, max_poll)
+
+    return count
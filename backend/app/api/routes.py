@@ -1,20 +1,417 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Literal
+import base64
+import binascii
+import hmac
 import json
 import os
 
+from app.catalog import CatalogCache
+from app.http_cache import cached_json_response, encode_json, etag_matches, make_etag, negotiate_encoding
+from app.leaderboard import Leaderboard
+from app.live import ALL_CHANNEL, TallyBroadcaster, stream_tallies
+from app.thumbnails import THUMBNAIL_FORMATS, THUMBNAIL_WIDTHS, ThumbnailService
+from app.votes import VoteStore
+
 router = APIRouter()
 
 DB_PATH = "data/hoodies.json"
+# "json" serves an in-memory snapshot of DB_PATH; "sqlite" queries SQLITE_PATH;
+# "snapshot" maps the compiled SNAPSHOT_PATH shared by all workers
+CATALOG_BACKEND = os.getenv("CATALOG_BACKEND", "json")
+SQLITE_PATH = os.getenv("SQLITE_PATH", "data/hoodies.db")
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", "data/hoodies.bin")
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+VOTES_DIR = "data/votes"
+MAX_VOTE_BATCH = 1000
+MAX_SEARCH_RESULTS = 100
+MAX_LEADERBOARD_SIZE = 100
+# Thumbnail sources: IMAGE_DIR/<original|generated>/<file>, else IMAGE_ORIGIN
+# (same layout), else the image URL stored in the catalog
+IMAGE_DIR = os.getenv("IMAGE_DIR", "data/images")
+IMAGE_ORIGIN = os.getenv("IMAGE_ORIGIN")
+THUMBNAIL_CACHE_DIR = "data/.cache/thumbnails"
+THUMBNAIL_CACHE_BYTES = int(os.getenv("THUMBNAIL_CACHE_BYTES", 256 * 1024 * 1024))
+# Image kind in the URL -> (catalog field, folder name on the image host)
+IMAGE_KINDS = {
+    "original": ("original_image_url", "original"),
+    "ai": ("ai_image_url", "generated"),
+}
+
+if CATALOG_BACKEND == "sqlite":
+    from app.sqlite_catalog import SqliteCatalogStore
+    catalog_cache = SqliteCatalogStore(SQLITE_PATH)
+elif CATALOG_BACKEND == "snapshot":
+    from app.catalog_snapshot import SnapshotCatalogCache
+    catalog_cache = SnapshotCatalogCache(SNAPSHOT_PATH)
+else:
+    catalog_cache = CatalogCache(DB_PATH)
+vote_store = VoteStore(VOTES_DIR)
+leaderboard = Leaderboard()
+tallies = TallyBroadcaster(vote_store)
+thumbnails = ThumbnailService(IMAGE_DIR, THUMBNAIL_CACHE_DIR, THUMBNAIL_CACHE_BYTES, origin=IMAGE_ORIGIN)
+
+
+class Vote(BaseModel):
+    hoodie_id: str
+    choice: Literal["original", "ai"]
+
 
+class VoteBatch(BaseModel):
+    votes: list[Vote] = Field(min_length=1, max_length=MAX_VOTE_BATCH)
 
-def load_hoodies():
-    if not os.path.exists(DB_PATH):
+
+async def load_hoodies():
+    try:
+        if catalog_cache.ready:
+            return catalog_cache.get()
+        # The first load parses the whole catalog; keep it off the event loop
+        return await run_in_threadpool(catalog_cache.get)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Hoodies data not found")
 
-    with open(DB_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+
+def encode_cursor(offset):
+    return base64.urlsafe_b64encode(str(offset).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset = int(base64.urlsafe_b64decode(padded).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return offset
+
+
+async def run_catalog(catalog, func, *args, offload=False):
+    """
+    Call func(catalog, *args). Catalogs that query a database (and calls that
+    build something big, with `offload`) run in the threadpool instead of on
+    the event loop.
+    """
+    if catalog.blocking or offload:
+        return await run_in_threadpool(func, catalog, *args)
+    return func(catalog, *args)
+
+
+def check_fields(catalog, fields):
+    try:
+        catalog.projection_key(fields)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"Unknown field(s): {e.args[0]}")
+
+
+def whole_catalog(catalog, fields, encoding):
+    """Return (body, etag, body compressed with `encoding` or None) for an un-paginated list."""
+    body, etag = catalog.full_body(fields)
+    compressed = catalog.compressed_body(fields, encoding) if encoding else None
+    return body, etag, compressed
+
+
+def needs_build(catalog, fields, encoding):
+    try:
+        return not catalog.full_body_ready(fields, encoding)
+    except KeyError:
+        # Unknown fields; list_body reports them
+        return False
+
+
+def parse_fields(fields):
+    if not fields:
+        return None
+    return [f.strip() for f in fields.split(",") if f.strip()]
+
+
+def list_body(catalog, field_list, filters, page, encoding):
+    """(body, etag, compressed body or None) for GET /hoodies; `page` is (start, size) or None."""
+    check_fields(catalog, field_list)
+
+    # None when no filter was given, otherwise matching positions in catalog order
+    matches = catalog.index.query(**filters)
+
+    # Without paging parameters keep the original response: a plain array
+    if page is None:
+        if matches is not None:
+            body = catalog.select(matches, field_list)
+            return body, make_etag(body), None
+        return whole_catalog(catalog, field_list, encoding)
+
+    start, size = page
+    total = len(catalog) if matches is None else len(matches)
+    stop = min(start + size, total)
+    next_cursor = encode_cursor(stop) if stop < total else None
+
+    if matches is None:
+        items = catalog.page(start, stop, field_list)
+    else:
+        items = catalog.select(matches[start:stop], field_list)
+
+    body = (
+        b'{"items":' + items
+        + b',"next_cursor":' + encode_json(next_cursor)
+        + b',"total":' + str(total).encode()
+        + b"}"
+    )
+    return body, make_etag(body), None
 
 
 @router.get("/hoodies")
-async def list_hoodies():
-    return load_hoodies()
+async def list_hoodies(
+    request: Request,
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    offset: int | None = Query(default=None, ge=0),
+    cursor: str | None = None,
+    fields: str | None = None,
+    tag: list[str] | None = Query(default=None),
+    source: str | None = None,
+    min_price: float | None = Query(default=None, ge=0),
+    max_price: float | None = Query(default=None, ge=0),
+):
+    catalog = await load_hoodies()
+    field_list = parse_fields(fields)
+    filters = {"tags": tag, "source": source, "min_price": min_price, "max_price": max_price}
+
+    page = None
+    encoding = None
+    offload = False
+    if limit is not None or offset is not None or cursor is not None:
+        start = decode_cursor(cursor) if cursor is not None else (offset or 0)
+        page = (start, limit or DEFAULT_PAGE_SIZE)
+    elif not (tag or source or min_price is not None or max_price is not None):
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+        # Encoding, hashing and compressing a body the catalog hasn't
+        # cached takes seconds on a large catalog; do it off the event loop
+        offload = not catalog.blocking and needs_build(catalog, field_list, encoding)
+
+    body, etag, compressed = await run_catalog(
+        catalog, list_body, field_list, filters, page, encoding, offload=offload
+    )
+    if compressed is None:
+        return cached_json_response(request, body, etag)
+    # cached_json_response negotiates the same encoding from the same header
+    return cached_json_response(request, body, etag, compressed=lambda _: compressed)
+
+
+def search_body(catalog, q, k, field_list):
+    check_fields(catalog, field_list)
+    positions, scores, total = catalog.search.search(q, k)
+    return (
+        b'{"items":' + catalog.select(positions, field_list)
+        + b',"scores":' + encode_json([round(score, 4) for score in scores])
+        + b',"total":' + str(total).encode()
+        + b"}"
+    )
+
+
+@router.get("/search")
+async def search_hoodies(
+    request: Request,
+    q: str = Query(min_length=1, max_length=200),
+    k: int = Query(default=10, ge=1, le=MAX_SEARCH_RESULTS),
+    fields: str | None = None,
+):
+    catalog = await load_hoodies()
+    body = await run_catalog(catalog, search_body, q, k, parse_fields(fields))
+    return cached_json_response(request, body, make_etag(body))
+
+
+def hoodie_body(catalog, hoodie_id, field_list):
+    pos = catalog.index.position(hoodie_id)
+    if pos is None:
+        raise HTTPException(status_code=404, detail="Hoodie not found")
+
+    try:
+        return catalog.row(pos, field_list)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"Unknown field(s): {e.args[0]}")
+
+
+@router.get("/hoodies/{hoodie_id}")
+async def get_hoodie(request: Request, hoodie_id: str, fields: str | None = None):
+    catalog = await load_hoodies()
+    body = await run_catalog(catalog, hoodie_body, hoodie_id, parse_fields(fields))
+    return cached_json_response(request, body, make_etag(body))
+
+
+def similar_body(catalog, hoodie_id, k, exact, field_list):
+    check_fields(catalog, field_list)
+
+    if catalog.index.position(hoodie_id) is None:
+        raise HTTPException(status_code=404, detail="Hoodie not found")
+    if catalog.embeddings is None:
+        raise HTTPException(status_code=404, detail="Embeddings not available")
+
+    neighbours = catalog.embeddings.similar(hoodie_id, k, exact=exact)
+    if neighbours is None:
+        raise HTTPException(status_code=404, detail="No embedding for this hoodie")
+
+    positions, scores = [], []
+    for neighbour_id, score in neighbours:
+        pos = catalog.index.position(neighbour_id)
+        if pos is not None:
+            positions.append(pos)
+            scores.append(round(score, 4))
+
+    return (
+        b'{"items":' + catalog.select(positions, field_list)
+        + b',"scores":' + encode_json(scores)
+        + b"}"
+    )
+
+
+@router.get("/hoodies/{hoodie_id}/similar")
+async def similar_hoodies(
+    request: Request,
+    hoodie_id: str,
+    k: int = Query(default=10, ge=1, le=MAX_SEARCH_RESULTS),
+    exact: bool = False,
+    fields: str | None = None,
+):
+    catalog = await load_hoodies()
+    body = await run_catalog(catalog, similar_body, hoodie_id, k, exact, parse_fields(fields))
+    return cached_json_response(request, body, make_etag(body))
+
+
+def image_source(catalog, hoodie_id, field):
+    """Return the URL of one of a hoodie's images."""
+    pos = catalog.index.position(hoodie_id)
+    if pos is None:
+        raise HTTPException(status_code=404, detail="Hoodie not found")
+    url = json.loads(catalog.row(pos, [field])).get(field)
+    if not url:
+        raise HTTPException(status_code=404, detail="Image not available")
+    return url
+
+
+@router.get("/images/{kind}/{hoodie_id}")
+async def hoodie_thumbnail(
+    request: Request,
+    kind: Literal["original", "ai"],
+    hoodie_id: str,
+    w: int = 320,
+    format: Literal["webp", "jpeg"] = "webp",
+):
+    if w not in THUMBNAIL_WIDTHS:
+        widths = ", ".join(str(width) for width in THUMBNAIL_WIDTHS)
+        raise HTTPException(status_code=400, detail=f"Width must be one of: {widths}")
+
+    catalog = await load_hoodies()
+    field, folder = IMAGE_KINDS[kind]
+    url = await run_catalog(catalog, image_source, hoodie_id, field)
+
+    try:
+        key = await thumbnails.key_for(folder, url, w, format)
+        etag = f'"{key}"'
+        headers = {"ETag": etag, "Cache-Control": "public, max-age=86400"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        body = await thumbnails.get(key, folder, url, w, format)
+    except OSError as e:
+        print(f"Could not generate {kind} thumbnail for hoodie {hoodie_id}: {e}")
+        raise HTTPException(status_code=502, detail="Could not load source image")
+    return Response(content=body, media_type=THUMBNAIL_FORMATS[format][1], headers=headers)
+
+
+def sample_pair(catalog, vote_counts):
+    if not len(catalog.pairs):
+        raise HTTPException(status_code=404, detail="No hoodie pairs available")
+    return catalog.pairs.sample(vote_counts)
+
+
+@router.get("/pairs/next")
+async def next_pair(balanced: bool = False):
+    catalog = await load_hoodies()
+    body = await run_catalog(catalog, sample_pair, vote_store.counts if balanced else None)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+def unknown_ids(catalog, hoodie_ids):
+    return sorted(i for i in set(hoodie_ids) if catalog.index.position(i) is None)
+
+
+@router.post("/votes")
+async def submit_votes(payload: Vote | VoteBatch):
+    votes = payload.votes if isinstance(payload, VoteBatch) else [payload]
+
+    catalog = await load_hoodies()
+    unknown = await run_catalog(catalog, unknown_ids, [v.hoodie_id for v in votes])
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown hoodie id(s): {', '.join(unknown)}")
+
+    await vote_store.submit([(v.hoodie_id, v.choice) for v in votes])
+    # Before its first rebuild the leaderboard picks these up from the totals
+    if leaderboard.loaded:
+        for v in votes:
+            leaderboard.record(v.hoodie_id, v.choice)
+    tallies.publish(v.hoodie_id for v in votes)
+    return {"accepted": len(votes)}
+
+
+@router.get("/votes")
+async def list_votes():
+    vote_store.load()
+    return vote_store.totals()
+
+
+@router.get("/votes/stream")
+async def stream_votes(hoodie_id: str | None = None):
+    initial = None
+    if hoodie_id is not None:
+        if await run_catalog(await load_hoodies(), unknown_ids, [hoodie_id]):
+            raise HTTPException(status_code=404, detail="Hoodie not found")
+        vote_store.load()
+        initial = {hoodie_id: vote_store.counts.get(hoodie_id, [0, 0])}
+
+    return StreamingResponse(
+        stream_tallies(tallies, hoodie_id or ALL_CHANNEL, initial),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/leaderboard")
+async def get_leaderboard(
+    request: Request,
+    k: int = Query(default=10, ge=1, le=MAX_LEADERBOARD_SIZE),
+    offset: int = Query(default=0, ge=0),
+    choice: Literal["original", "ai"] | None = None,
+):
+    if not leaderboard.loaded:
+        vote_store.load()
+        leaderboard.rebuild(vote_store.counts)
+
+    items, total = leaderboard.top(k, offset, choice)
+    body = encode_json({"items": items, "total": total, "updated_at": leaderboard.updated_at})
+    return cached_json_response(request, body, make_etag(body))
+
+
+@router.post("/admin/reload")
+async def reload_hoodies(x_admin_token: str | None = Header(default=None)):
+    # Without a configured token the endpoint doesn't exist
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+    try:
+        # The old catalog keeps serving until the new one is swapped in
+        catalog = await run_in_threadpool(catalog_cache.reload)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Hoodies data not found")
+    except ValueError as e:
+        # The last good catalog is still being served
+        raise HTTPException(status_code=409, detail=f"Hoodies data is invalid: {e}")
+    return {"count": len(catalog), "loaded_at": catalog.loaded_at}
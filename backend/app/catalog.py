@@ -0,0 +1,268 @@
+import json
+import os
+import threading
+import time
+
+from app.http_cache import SUPPORTED_ENCODINGS, compress, encode_json, make_etag
+from app.indexes import CatalogIndex
+from app.metrics import metrics
+from app.pairs import PairSampler
+from app.search import SearchIndex
+from app.similarity import EmbeddingIndex
+
+# Projections built eagerly at load; anything else is built on first use
+PRESET_PROJECTIONS = (
+    None,
+    ("id", "original_image_url", "ai_image_url"),
+)
+MAX_CACHED_PROJECTIONS = 16
+
+
+class Catalog:
+    """
+    Immutable snapshot of the hoodie catalog.
+
+    Everything derived from the file is computed once here, so requests only
+    read from a fully built snapshot and never see a half-loaded catalog.
+    """
+
+    # Requests read from memory, so routes call the catalog on the event loop
+    blocking = False
+
+    def __init__(self, items, file_id=None, cache_dir=None, embeddings=None):
+        self.items = items
+        self.file_id = file_id
+        self.loaded_at = time.time()
+        self.fields = frozenset(key for item in items for key in item)
+        self._projections = {}
+        self._bodies = {}
+        self._compressed = {}
+        self.index = CatalogIndex(items)
+        self.pairs = PairSampler(items)
+        self.embeddings = embeddings
+        for fields in PRESET_PROJECTIONS:
+            if fields is None or self.fields.issuperset(fields):
+                self.rows(fields)
+                # Compressing a large body takes seconds; do it here, on the
+                # loading thread, rather than in the first request for it
+                for encoding in SUPPORTED_ENCODINGS:
+                    self.compressed_body(fields, encoding)
+        self.body, self.etag = self.full_body()
+        self.version = self.etag.strip('"')
+
+        # Derived indexes are persisted per catalog version so other workers
+        # (and restarts) load them instead of rebuilding
+        search_path = None
+        if cache_dir:
+            search_path = os.path.join(cache_dir, f"search-{self.version}.npz")
+        self.search = SearchIndex.load_or_build(items, search_path)
+
+    def __len__(self):
+        return len(self.items)
+
+    def projection_key(self, fields):
+        """Normalise a field list to the key its encoded rows are cached under."""
+        if not fields:
+            return None
+        unknown = set(fields) - self.fields
+        if unknown:
+            raise KeyError(", ".join(sorted(unknown)))
+        return tuple(sorted(set(fields) | {"id"}))
+
+    def rows(self, fields=None):
+        """Return every item pre-encoded as JSON bytes, projected to `fields`."""
+        key = self.projection_key(fields)
+        rows = self._projections.get(key)
+        if rows is None:
+            rows = [self._encode(item, key) for item in self.items]
+            if len(self._projections) < MAX_CACHED_PROJECTIONS:
+                self._projections[key] = rows
+        return rows
+
+    def page(self, start, stop, fields=None):
+        """Encode items[start:stop] as a JSON array without re-serialising them."""
+        key = self.projection_key(fields)
+        rows = self._projections.get(key)
+        if rows is not None or len(self._projections) < MAX_CACHED_PROJECTIONS:
+            rows = self.rows(fields)[start:stop]
+        else:
+            # Cache is full of other projections: encode just this page
+            rows = [self._encode(item, key) for item in self.items[start:stop]]
+        return b"[" + b",".join(rows) + b"]"
+
+    def select(self, positions, fields=None):
+        """Encode the items at `positions` as a JSON array."""
+        key = self.projection_key(fields)
+        rows = self._projections.get(key)
+        if rows is not None:
+            selected = [rows[pos] for pos in positions]
+        else:
+            selected = [self._encode(self.items[pos], key) for pos in positions]
+        return b"[" + b",".join(selected) + b"]"
+
+    def row(self, pos, fields=None):
+        """Encode a single item, reusing its pre-encoded row when available."""
+        key = self.projection_key(fields)
+        rows = self._projections.get(key)
+        if rows is not None:
+            return rows[pos]
+        return self._encode(self.items[pos], key)
+
+    def full_body(self, fields=None):
+        """Return (body, etag) for the whole catalog, cached per projection."""
+        key = self.projection_key(fields)
+        cached = self._bodies.get(key)
+        if cached is None:
+            body = self.page(0, len(self.items), fields)
+            cached = (body, make_etag(body))
+            if len(self._bodies) < MAX_CACHED_PROJECTIONS:
+                self._bodies[key] = cached
+        return cached
+
+    def full_body_ready(self, fields, encoding=None):
+        """
+        Whether full_body (and compressed_body for `encoding`) would return a
+        cached copy; building one takes seconds on a large catalog.
+        """
+        key = self.projection_key(fields)
+        if key not in self._bodies:
+            return False
+        return encoding is None or (key, encoding) in self._compressed
+
+    def compressed_body(self, fields, encoding):
+        """
+        Return the whole-catalog body compressed with `encoding`.
+
+        Preset projections are compressed at load; other variants are
+        compressed on first request. Either way they are reused until the
+        catalog is reloaded.
+        """
+        key = (self.projection_key(fields), encoding)
+        data = self._compressed.get(key)
+        if data is None:
+            data = compress(self.full_body(fields)[0], encoding)
+            if len(self._compressed) < 2 * MAX_CACHED_PROJECTIONS:
+                self._compressed[key] = data
+        return data
+
+    @staticmethod
+    def _encode(item, key):
+        if key is None:
+            return encode_json(item)
+        return encode_json({k: v for k, v in item.items() if k in key})
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, "rb") as f:
+            file_id = file_identity(os.fstat(f.fileno()))
+            items = json.loads(f.read())
+        data_dir = os.path.dirname(path)
+        try:
+            embeddings = EmbeddingIndex.open(data_dir)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable embeddings in {data_dir}: {e}")
+            embeddings = None
+        return cls(
+            items,
+            file_id=file_id,
+            cache_dir=os.path.join(data_dir, ".cache"),
+            embeddings=embeddings,
+        )
+
+
+def file_identity(st):
+    """What identifies a version of a catalog file, from its os.stat() result."""
+    # inode catches atomic rename-over replacements that keep size and mtime
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class CatalogCache:
+    """
+    Parses the catalog file once and keeps it in memory.
+
+    The file is re-stat'ed at most every `check_interval` seconds and only
+    re-parsed when its mtime/size/inode changes, or when `reload()` is called.
+    Re-parsing a changed file happens on a background thread while the old
+    catalog keeps being served; only the very first load blocks the caller.
+    """
+
+    catalog_class = Catalog
+
+    def __init__(self, path, check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._catalog = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()  # held while a catalog is built
+        self._reloading_lock = threading.Lock()  # guards _reloading only, never held for long
+        self._reloading = False
+
+    @property
+    def ready(self):
+        """True once a catalog is loaded, i.e. get() will not block on parsing."""
+        return self._catalog is not None
+
+    def get(self):
+        """Return the current catalog, starting a reload if the file changed."""
+        catalog = self._catalog
+        now = time.monotonic()
+        if catalog is not None and now < self._next_check:
+            return catalog
+
+        try:
+            file_id = file_identity(os.stat(self.path))
+        except FileNotFoundError:
+            if catalog is None:
+                raise
+            # Keep serving the last good catalog while the file is being replaced
+            return catalog
+
+        self._next_check = now + self.check_interval
+        if catalog is None:
+            return self._load(stale=None)
+        if catalog.file_id != file_id:
+            self._reload_in_background(catalog)
+        return catalog
+
+    def reload(self):
+        """
+        Force a re-parse of the catalog file (admin hook). Raises ValueError
+        if the file is invalid; the last good catalog keeps being served.
+        """
+        return self._load(stale=self._catalog, force=True)
+
+    def _reload_in_background(self, stale):
+        with self._reloading_lock:
+            if self._reloading:
+                return
+            self._reloading = True
+        threading.Thread(target=self._background_load, args=(stale,), daemon=True).start()
+
+    def _background_load(self, stale):
+        try:
+            self._load(stale)
+        except Exception as e:
+            print(f"Failed to reload catalog from {self.path}: {e}")
+        finally:
+            with self._reloading_lock:
+                self._reloading = False
+
+    def _load(self, stale, force=False):
+        with self._lock:
+            # Another thread may have swapped in a fresh catalog while we waited
+            current = self._catalog
+            if not force and current is not stale:
+                return current
+            started = time.perf_counter()
+            try:
+                catalog = self.catalog_class.from_file(self.path)
+            except ValueError as e:
+                if current is None or force:
+                    raise
+                # Half-written file: keep the last good catalog and retry later
+                print(f"Failed to reload catalog from {self.path}: {e}")
+                return current
+            metrics.record_catalog_load(time.perf_counter() - started, len(catalog))
+            self._catalog = catalog
+            self._next_check = time.monotonic() + self.check_interval
+            return catalog
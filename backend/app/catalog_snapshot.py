@@ -0,0 +1,417 @@
+"""
+Compiled, memory-mapped catalog snapshots.
+
+`compile_snapshot` turns a catalog into one binary file holding its
+pre-encoded rows, lookup indexes and search postings as fixed-width offset
+arrays plus byte blobs. Every worker maps the same file read-only, so the
+catalog sits once in the page cache however many workers there are, and
+opening it only parses a small JSON header.
+
+Layout: MAGIC, the header length as a little-endian uint64, the JSON header,
+then 64-byte aligned sections listed in the header as
+name -> [offset, dtype, length].
+"""
+import json
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+from app.catalog import MAX_CACHED_PROJECTIONS, PRESET_PROJECTIONS, Catalog, CatalogCache, file_identity
+from app.http_cache import SUPPORTED_ENCODINGS, compress, encode_json, make_etag
+from app.pairs import PairSampler
+from app.search import SearchIndex
+from app.similarity import EmbeddingIndex
+
+MAGIC = b"HOODCAT1"
+ALIGN = 64
+
+
+class BlobArray:
+    """Sequence of byte strings stored as a blob plus an (n + 1) offset array."""
+
+    def __init__(self, blob, offsets, base=0, encoding=None):
+        self.blob = blob
+        self.offsets = offsets
+        self.base = base
+        self.encoding = encoding
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        value = self.blob[self.base + int(self.offsets[i]):self.base + int(self.offsets[i + 1])]
+        return value.decode(self.encoding) if self.encoding else value
+
+
+class SortedLookup:
+    """
+    Binary search for a string key in a BlobArray.
+
+    `order` lists the array's indexes in key order; without it the keys are
+    already sorted. `get` returns the index of the first matching key.
+    """
+
+    def __init__(self, keys, order=None):
+        self.keys = keys
+        self.order = order
+
+    def _at(self, i):
+        return int(self.order[i]) if self.order is not None else i
+
+    def get(self, key, default=None):
+        target = key.encode("utf-8")
+        lo, hi = 0, len(self.keys)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.keys[self._at(mid)] < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self.keys) and self.keys[self._at(lo)] == target:
+            return self._at(lo)
+        return default
+
+
+class SnapshotIndex:
+    """CatalogIndex over the snapshot's postings, answered with numpy views."""
+
+    def __init__(self, ids, tags, sources, prices, price_positions):
+        self.ids = ids
+        self.tags = tags
+        self.sources = sources
+        self.prices = prices
+        self.price_positions = price_positions
+
+    def position(self, hoodie_id):
+        return self.ids.get(hoodie_id)
+
+    def query(self, tags=None, source=None, min_price=None, max_price=None):
+        candidates = []
+        for tag in tags or []:
+            candidates.append(self.tags.get(tag.lower(), _EMPTY))
+        if source:
+            candidates.append(self.sources.get(source.lower(), _EMPTY))
+        if min_price is not None or max_price is not None:
+            lo = 0 if min_price is None else np.searchsorted(self.prices, min_price, "left")
+            hi = len(self.prices) if max_price is None else np.searchsorted(self.prices, max_price, "right")
+            candidates.append(np.sort(self.price_positions[lo:hi]))
+
+        if not candidates:
+            return None
+
+        candidates.sort(key=len)
+        result = candidates[0]
+        for other in candidates[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, other, assume_unique=True)
+        return result.tolist()
+
+
+_EMPTY = np.empty(0, dtype=np.int32)
+
+
+class SnapshotCatalog:
+    """
+    Catalog served from a compiled snapshot file.
+
+    Exposes the same interface as Catalog. Rows for the preset projections
+    and the compressed full body are slices of the mapping; other projections
+    are re-encoded per request, except whole-catalog bodies, which are kept
+    like Catalog keeps them.
+    """
+
+    blocking = False
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.file_id = file_identity(os.fstat(f.fileno()))
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a catalog snapshot")
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._open(self._read_header())
+        except (struct.error, KeyError, IndexError, TypeError, UnicodeDecodeError) as e:
+            # Raised as ValueError so CatalogCache keeps the last good catalog
+            raise ValueError(f"corrupt snapshot {path}: {e!r}")
+
+        data_dir = os.path.dirname(path)
+        try:
+            self.embeddings = EmbeddingIndex.open(data_dir)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable embeddings in {data_dir}: {e}")
+            self.embeddings = None
+
+    def _read_header(self):
+        (header_len,) = struct.unpack_from("<Q", self.mm, len(MAGIC))
+        start = len(MAGIC) + 8
+        return json.loads(self.mm[start:start + header_len])
+
+    def _open(self, header):
+        self.sections = header["sections"]
+        self._bodies = {}
+        self._compressed = {}
+
+        self.loaded_at = time.time()
+        self.count = header["count"]
+        self.fields = frozenset(header["fields"])
+        self.etag = header["etag"]
+        self.version = self.etag.strip('"')
+        self.encodings = header["encodings"]
+        # Projection key -> (row blob offset, row offsets)
+        self.projections = {
+            None if key is None else tuple(key): (self.sections[name][0], self._array(f"{name}_offsets"))
+            for key, name in header["projections"]
+        }
+
+        self.index = SnapshotIndex(
+            SortedLookup(self._blob_array("ids"), self._array("id_order")),
+            self._postings("tag", header["tags"]),
+            self._postings("source", header["sources"]),
+            self._array("prices"),
+            self._array("price_positions"),
+        )
+        self.pairs = PairSampler.from_encoded(
+            self._blob_array("pair_ids", encoding="utf-8"),
+            _PairBodies(self._blob_array("pair_bodies")),
+        )
+        self.search = SearchIndex.from_lookup(
+            SortedLookup(self._blob_array("terms")),
+            self._array("search_offsets"),
+            self._array("search_positions"),
+            self._array("search_scores"),
+            header["search_size"],
+        )
+
+    @classmethod
+    def from_file(cls, path):
+        return cls(path)
+
+    def _array(self, name):
+        offset, dtype, length = self.sections[name]
+        return np.frombuffer(self.mm, dtype=dtype, count=length, offset=offset)
+
+    def _blob_array(self, name, encoding=None):
+        return BlobArray(self.mm, self._array(f"{name}_offsets"), self.sections[name][0], encoding)
+
+    def _postings(self, name, keys):
+        positions = self._array(f"{name}_positions")
+        offsets = self._array(f"{name}_offsets")
+        return {key: positions[offsets[i]:offsets[i + 1]] for i, key in enumerate(keys)}
+
+    def __len__(self):
+        return self.count
+
+    def projection_key(self, fields):
+        if not fields:
+            return None
+        unknown = set(fields) - self.fields
+        if unknown:
+            raise KeyError(", ".join(sorted(unknown)))
+        return tuple(sorted(set(fields) | {"id"}))
+
+    def _row(self, pos, key):
+        stored = self.projections.get(key)
+        if stored is not None:
+            base, offsets = stored
+            return self.mm[base + int(offsets[pos]):base + int(offsets[pos + 1]) - 1]
+        item = json.loads(self._row(pos, None))
+        return encode_json({k: v for k, v in item.items() if k in key})
+
+    def page(self, start, stop, fields=None):
+        key = self.projection_key(fields)
+        stored = self.projections.get(key)
+        if stored is None:
+            return b"[" + b",".join(self._row(pos, key) for pos in range(start, stop)) + b"]"
+        if stop <= start:
+            return b"[]"
+        # Rows are stored comma-separated, so a page is one contiguous slice
+        base, offsets = stored
+        return b"[" + self.mm[base + int(offsets[start]):base + int(offsets[stop]) - 1] + b"]"
+
+    def select(self, positions, fields=None):
+        key = self.projection_key(fields)
+        return b"[" + b",".join(self._row(pos, key) for pos in positions) + b"]"
+
+    def row(self, pos, fields=None):
+        return self._row(pos, self.projection_key(fields))
+
+    def full_body(self, fields=None):
+        key = self.projection_key(fields)
+        if key is None:
+            offset, _, length = self.sections["rows"]
+            return self.mm[offset:offset + length], self.etag
+        cached = self._bodies.get(key)
+        if cached is None:
+            body = self.page(0, self.count, fields)
+            cached = (body, make_etag(body))
+            if len(self._bodies) < MAX_CACHED_PROJECTIONS:
+                self._bodies[key] = cached
+        return cached
+
+    def full_body_ready(self, fields, encoding=None):
+        key = self.projection_key(fields)
+        if key is not None and key not in self._bodies:
+            return False
+        if encoding is None or (key is None and encoding in self.encodings):
+            return True
+        return (key, encoding) in self._compressed
+
+    def compressed_body(self, fields, encoding):
+        key = self.projection_key(fields)
+        if key is None and encoding in self.encodings:
+            offset, _, length = self.sections[f"body.{encoding}"]
+            return self.mm[offset:offset + length]
+        data = self._compressed.get((key, encoding))
+        if data is None:
+            data = compress(self.full_body(fields)[0], encoding)
+            if len(self._compressed) < 2 * MAX_CACHED_PROJECTIONS:
+                self._compressed[key, encoding] = data
+        return data
+
+
+class _PairBodies:
+    """Adapts the flat pair blob (two arrangements per item) to PairSampler."""
+
+    def __init__(self, bodies):
+        self.bodies = bodies
+
+    def __getitem__(self, i):
+        return (self.bodies[2 * i], self.bodies[2 * i + 1])
+
+
+class SnapshotCatalogCache(CatalogCache):
+    """CatalogCache that maps a compiled snapshot instead of parsing JSON."""
+
+    catalog_class = SnapshotCatalog
+
+
+# --- compiling ---
+
+def compile_snapshot(items, path):
+    """Write a snapshot of `items` to `path`, atomically replacing any old one."""
+    catalog = Catalog(items)
+    sections = {}
+
+    def add_blob(name, values):
+        offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum([len(v) for v in values], out=offsets[1:])
+        sections[name] = b"".join(values)
+        sections[f"{name}_offsets"] = offsets
+
+    def add_rows(name, rows):
+        # Stored as the JSON array itself: row i is blob[off[i]:off[i + 1] - 1]
+        offsets = np.ones(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(r) + 1 for r in rows], out=offsets[1:])
+        offsets[1:] += 1
+        sections[name] = b"[" + b",".join(rows) + b"]"
+        sections[f"{name}_offsets"] = offsets
+
+    projections = []
+    for i, fields in enumerate(PRESET_PROJECTIONS):
+        if fields is None or catalog.fields.issuperset(fields):
+            name = "rows" if fields is None else f"rows.{i}"
+            add_rows(name, catalog.rows(fields))
+            projections.append([catalog.projection_key(fields), name])
+
+    encodings = []
+    for encoding in SUPPORTED_ENCODINGS:
+        sections[f"body.{encoding}"] = catalog.compressed_body(None, encoding)
+        encodings.append(encoding)
+
+    ids = [str(item.get("id")).encode("utf-8") for item in items]
+    add_blob("ids", ids)
+    sections["id_order"] = np.asarray(sorted(range(len(ids)), key=lambda i: (ids[i], i)), dtype=np.int32)
+
+    index = catalog.index
+    tags = sorted(index.by_tag)
+    sources = sorted(index.by_source)
+    for name, postings, keys in (("tag", index.by_tag, tags), ("source", index.by_source, sources)):
+        lists = [postings[key] for key in keys]
+        offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+        np.cumsum([len(p) for p in lists], out=offsets[1:])
+        sections[f"{name}_positions"] = np.asarray([p for ps in lists for p in ps], dtype=np.int32)
+        sections[f"{name}_offsets"] = offsets
+    sections["prices"] = np.asarray(index.prices, dtype=np.float64)
+    sections["price_positions"] = np.asarray(index.price_positions, dtype=np.int32)
+
+    add_blob("pair_ids", [i.encode("utf-8") for i in catalog.pairs.ids])
+    add_blob("pair_bodies", [body for pair in catalog.pairs.bodies for body in pair])
+
+    search = catalog.search
+    add_blob("terms", [t.encode("utf-8") for t in sorted(search.terms, key=search.terms.get)])
+    sections["search_offsets"] = np.asarray(search.offsets, dtype=np.int64)
+    sections["search_positions"] = np.asarray(search.positions, dtype=np.int32)
+    sections["search_scores"] = np.asarray(search.scores, dtype=np.float32)
+
+    header = {
+        "count": len(items),
+        "fields": sorted(catalog.fields),
+        "etag": catalog.etag,
+        "encodings": encodings,
+        "projections": projections,
+        "tags": tags,
+        "sources": sources,
+        "search_size": search.size,
+        "sections": {},
+    }
+    _write(path, header, sections)
+
+
+def _write(path, header, sections):
+    # Section offsets depend on the header length, which depends on the
+    # offsets; lay out with a generous guess and pad the header to it
+    buffers = {}
+    for name, value in sections.items():
+        if isinstance(value, np.ndarray):
+            buffers[name] = (value.tobytes(), value.dtype.str, len(value))
+        else:
+            buffers[name] = (value, "|u1", len(value))
+
+    reserved = _align(len(json.dumps(header)) + 96 * len(buffers) + 1024)
+    offset = _align(len(MAGIC) + 8 + reserved)
+    for name, (data, dtype, length) in buffers.items():
+        header["sections"][name] = [offset, dtype, length]
+        offset = _align(offset + len(data))
+
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    if len(header_bytes) > reserved:
+        raise ValueError("snapshot header larger than reserved space")
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + struct.pack("<Q", len(header_bytes)) + header_bytes)
+        for name, (data, _, _) in buffers.items():
+            f.seek(header["sections"][name][0])
+            f.write(data)
+        f.truncate(offset)
+        f.flush()
+        os.fsync(f.fileno())
+    # Workers that still map the old file keep reading it until they reopen
+    os.replace(tmp_path, path)
+
+
+def _align(n):
+    return -(-n // ALIGN) * ALIGN
+
+
+def compile_file(json_path, snapshot_path):
+    with open(json_path, "r", encoding="utf-8") as f:
+        items = json.load(f)
+    compile_snapshot(items, snapshot_path)
+    return len(items)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3:
+        print("Usage: python -m app.catalog_snapshot <hoodies.json> <hoodies.bin>")
+        sys.exit(1)
+
+    count = compile_file(sys.argv[1], sys.argv[2])
+    print(f"Compiled {count} hoodies into {sys.argv[2]}")
@@ -0,0 +1,110 @@
+import gzip
+import hashlib
+import json
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+# Preferred first when the client accepts several encodings equally
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+
+# Below this size compression overhead outweighs the savings
+MIN_COMPRESS_SIZE = 512
+
+
+def encode_json(value):
+    # Same encoding FastAPI's JSONResponse would produce
+    return json.dumps(
+        value, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def make_etag(body):
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=9)
+    if encoding == "gzip":
+        # mtime=0 keeps the output (and so caches downstream) deterministic
+        return gzip.compress(body, compresslevel=9, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def etag_matches(if_none_match, etag):
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def negotiate_encoding(accept_encoding):
+    """Pick the best supported encoding from an Accept-Encoding header, or None."""
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def encoded_etag(etag, encoding):
+    """ETag of the `encoding`-compressed copy of the body tagged `etag`."""
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def cached_json_response(request: Request, body, etag, compressed=None):
+    """
+    Build a JSON response that honours If-None-Match and Accept-Encoding.
+
+    `compressed(encoding)` should return a pre-compressed copy of `body`; when
+    it is omitted the body is sent uncompressed. A compressed response is a
+    different representation, so it carries its own ETag (`"<hash>-br"`).
+    """
+    encoding = None
+    if compressed is not None and len(body) >= MIN_COMPRESS_SIZE:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if encoding:
+        etag = encoded_etag(etag, encoding)
+
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        body = compressed(encoding)
+
+    return Response(content=body, media_type="application/json", headers=headers)
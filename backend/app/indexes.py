@@ -0,0 +1,104 @@
+import re
+from bisect import bisect_left, bisect_right
+from urllib.parse import urlparse
+
+PRICE_PATTERN = re.compile(r"\d[\d,]*(?:\.\d+)?")
+# Prices are filtered in GBP; the AI pipeline converts everything it can to
+# it. Anything marked as another currency is left out of price filters.
+CURRENCY_PATTERN = re.compile(r"[$€¥]|\b(?:USD|EUR|CAD|AUD|NZD|JPY|CHF)\b")
+
+
+def parse_price(price):
+    """
+    Parse a display price such as "£43.91" into a float in GBP. Returns None
+    if the price is absent or in another currency ("$45", "USD 54"). Bare
+    numbers are taken to be GBP.
+    """
+    if isinstance(price, (int, float)):
+        return float(price)
+    if not price or CURRENCY_PATTERN.search(price):
+        return None
+    match = PRICE_PATTERN.search(price)
+    if not match:
+        return None
+    return float(match.group(0).replace(",", ""))
+
+
+def item_source(item):
+    """Marketplace an item came from, falling back to its product URL's host."""
+    source = item.get("source")
+    if source:
+        return source.lower()
+    host = urlparse(item.get("product_url") or "").hostname or ""
+    parts = host.split(".")
+    if len(parts) >= 2:
+        # www.redbubble.com -> redbubble
+        return parts[-2]
+    return host or None
+
+
+class CatalogIndex:
+    """
+    Lookup structures over a catalog's items, built once per catalog load.
+
+    Every index stores item positions, so results can be fed straight into
+    the catalog's pre-encoded rows.
+    """
+
+    def __init__(self, items):
+        self.by_id = {}
+        self.by_tag = {}
+        self.by_source = {}
+        priced = []
+
+        for pos, item in enumerate(items):
+            self.by_id.setdefault(str(item.get("id")), pos)
+
+            for tag in {t.lower() for t in item.get("tags") or []}:
+                self.by_tag.setdefault(tag, []).append(pos)
+
+            source = item_source(item)
+            if source:
+                self.by_source.setdefault(source, []).append(pos)
+
+            price = parse_price(item.get("price"))
+            if price is not None:
+                priced.append((price, pos))
+
+        priced.sort()
+        self.prices = [price for price, _ in priced]
+        self.price_positions = [pos for _, pos in priced]
+
+    def position(self, hoodie_id):
+        return self.by_id.get(hoodie_id)
+
+    def price_range(self, min_price=None, max_price=None):
+        lo = 0 if min_price is None else bisect_left(self.prices, min_price)
+        hi = len(self.prices) if max_price is None else bisect_right(self.prices, max_price)
+        return self.price_positions[lo:hi]
+
+    def query(self, tags=None, source=None, min_price=None, max_price=None):
+        """
+        Return positions of items matching every given filter, in catalog order.
+
+        Each filter is answered from its own index, then the candidate lists
+        are intersected starting from the smallest one.
+        """
+        candidates = []
+        for tag in tags or []:
+            candidates.append(self.by_tag.get(tag.lower(), []))
+        if source:
+            candidates.append(self.by_source.get(source.lower(), []))
+        if min_price is not None or max_price is not None:
+            candidates.append(self.price_range(min_price, max_price))
+
+        if not candidates:
+            return None
+
+        candidates.sort(key=len)
+        result = set(candidates[0])
+        for other in candidates[1:]:
+            if not result:
+                break
+            result.intersection_update(other)
+        return sorted(result)
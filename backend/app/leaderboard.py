@@ -0,0 +1,173 @@
+import asyncio
+import time
+
+import numpy as np
+
+from app.votes import CHOICES
+
+BASE_RATING = 1500.0
+# Virtual votes for each side of the fit, so a design with no losses gets a
+# finite rating
+PRIOR_VOTES = 1.0
+INITIAL_CAPACITY = 1024
+
+
+class Leaderboard:
+    """
+    Ratings for every design, i.e. each hoodie's original and AI image.
+
+    A vote is a match between one hoodie's two designs, and ratings are the
+    Bradley-Terry fit of the win counts on the Elo scale. Each hoodie's
+    designs only ever meet each other, so the fit has a closed form per
+    hoodie: `rebuild` computes it for every hoodie in a few array operations
+    and `record` recomputes it for one hoodie in O(1), giving exactly the
+    ratings a rebuild from the same totals would. Reads come from
+    a sorted snapshot refreshed every `refresh_interval` seconds in a
+    background thread, so serving the top k is O(k).
+
+    Ratings live in a growable (n, 2) array indexed by `CHOICES`, so the
+    snapshot is a cheap copy taken on the event loop thread.
+    """
+
+    def __init__(self, refresh_interval=5.0):
+        self.refresh_interval = refresh_interval
+        self.loaded = False
+
+        self.rows = {}  # hoodie_id -> row
+        self.ids = []
+        self.ratings = np.full((INITIAL_CAPACITY, 2), BASE_RATING)
+        self.wins = np.zeros((INITIAL_CAPACITY, 2), dtype=np.int64)
+
+        self._snapshot = Snapshot([], np.empty((0, 2)), np.empty((0, 2), dtype=np.int64))
+        self._dirty = False
+        self._task = None
+
+    # --- lifecycle ---
+
+    async def start(self, vote_store):
+        vote_store.load()
+        if not self.loaded:
+            self.rebuild(vote_store.counts)
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def rebuild(self, counts):
+        """Fit ratings from `counts` (hoodie_id -> [votes_original, votes_ai])."""
+        ids = list(counts)
+        wins = np.array([counts[i] for i in ids], dtype=np.int64).reshape(-1, 2)
+
+        capacity = max(INITIAL_CAPACITY, 2 * len(ids))
+        self.ratings = np.full((capacity, 2), BASE_RATING)
+        self.ratings[: len(ids)] = fit_ratings(wins)
+        self.wins = np.zeros((capacity, 2), dtype=np.int64)
+        self.wins[: len(ids)] = wins
+        self.ids = ids
+        self.rows = {hoodie_id: row for row, hoodie_id in enumerate(ids)}
+
+        self.loaded = True
+        self._snapshot = self._take_snapshot().sorted()
+        self._dirty = False
+
+    # --- hot path ---
+
+    def record(self, hoodie_id, choice):
+        row = self.rows.get(hoodie_id)
+        if row is None:
+            row = self._add(hoodie_id)
+
+        self.wins[row, CHOICES.index(choice)] += 1
+        self.ratings[row] = fit_ratings(self.wins[row])
+        self._dirty = True
+
+    def _add(self, hoodie_id):
+        row = len(self.ids)
+        if row == len(self.ratings):
+            self.ratings = np.concatenate([self.ratings, np.full_like(self.ratings, BASE_RATING)])
+            self.wins = np.concatenate([self.wins, np.zeros_like(self.wins)])
+        self.ids.append(hoodie_id)
+        self.rows[hoodie_id] = row
+        return row
+
+    # --- background refresh ---
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            if self._dirty:
+                self._dirty = False
+                snapshot = self._take_snapshot()
+                self._snapshot = await asyncio.to_thread(snapshot.sorted)
+
+    def _take_snapshot(self):
+        n = len(self.ids)
+        return Snapshot(list(self.ids), self.ratings[:n].copy(), self.wins[:n].copy())
+
+    # --- reads ---
+
+    @property
+    def updated_at(self):
+        return self._snapshot.updated_at
+
+    def top(self, k, offset=0, choice=None):
+        return self._snapshot.top(k, offset, choice)
+
+
+def fit_ratings(wins):
+    """
+    Bradley-Terry ratings for [votes_original, votes_ai] pairs (or one pair).
+
+    The maximum-likelihood gap between a hoodie's two designs is
+    400 * log10(ai_wins / original_wins), with PRIOR_VOTES added to each
+    side; the designs sit symmetrically around BASE_RATING.
+    """
+    wins = np.asarray(wins, dtype=np.float64)
+    half_gap = 200.0 * np.log10((wins[..., 1] + PRIOR_VOTES) / (wins[..., 0] + PRIOR_VOTES))
+    return np.stack([BASE_RATING - half_gap, BASE_RATING + half_gap], axis=-1)
+
+
+class Snapshot:
+    """Point-in-time copy of the ratings, with rankings computed by `sorted`."""
+
+    def __init__(self, ids, ratings, wins):
+        self.ids = ids
+        self.ratings = ratings
+        self.wins = wins
+        self.updated_at = time.time()
+        self.order = {}
+
+    def sorted(self):
+        flat = self.ratings.ravel()
+        # Flat index i is design (i // 2, CHOICES[i % 2]); ties keep first-voted order
+        self.order[None] = np.argsort(-flat, kind="stable")
+        for column, choice in enumerate(CHOICES):
+            self.order[choice] = np.argsort(-self.ratings[:, column], kind="stable") * 2 + column
+        return self
+
+    def top(self, k, offset=0, choice=None):
+        """Return ({entries}, total) for the designs ranked offset..offset+k."""
+        order = self.order.get(choice)
+        if order is None:
+            return [], 0
+        entries = []
+        flat_ratings = self.ratings.ravel()
+        flat_wins = self.wins.ravel()
+        for rank, i in enumerate(order[offset:offset + k], start=offset + 1):
+            i = int(i)
+            entries.append({
+                "rank": rank,
+                "hoodie_id": self.ids[i // 2],
+                "choice": CHOICES[i % 2],
+                "rating": round(float(flat_ratings[i]), 1),
+                "wins": int(flat_wins[i]),
+                "losses": int(flat_wins[i ^ 1]),
+            })
+        return entries, len(order)
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import time
+
+COALESCE_INTERVAL = 0.25
+KEEPALIVE_INTERVAL = 15.0
+# Channel carrying every changed hoodie; other channels are hoodie ids
+ALL_CHANNEL = "*"
+
+
+class TallyBroadcaster:
+    """
+    Pushes coalesced vote tallies to live subscribers.
+
+    Accepted votes only mark their hoodies dirty. At most every `interval`
+    seconds one flush reads the current counts of the dirty hoodies and
+    hands each subscriber of an affected channel the latest state, so the
+    cost of a vote doesn't grow with the number of listeners.
+
+    Every subscriber has a one-slot queue. If a client hasn't taken the
+    previous update yet, the new one is merged into it, so slow consumers
+    skip intermediate tallies but never miss a hoodie. Idle subscribers are
+    just parked coroutines; nothing polls.
+
+    Tallies are per worker, like the vote counts they come from.
+    """
+
+    def __init__(self, vote_store, interval=COALESCE_INTERVAL):
+        self.vote_store = vote_store
+        self.interval = interval
+        self.channels = {}  # channel -> set of queues
+        self._dirty = set()
+        self._handle = None
+        self._last_flush = 0.0
+
+    def subscribe(self, channel=ALL_CHANNEL):
+        queue = asyncio.Queue(maxsize=1)
+        self.channels.setdefault(channel, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, channel, queue):
+        queues = self.channels.get(channel)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self.channels[channel]
+
+    def publish(self, hoodie_ids):
+        if not self.channels:
+            return
+        self._dirty.update(hoodie_ids)
+        if self._handle is None:
+            loop = asyncio.get_running_loop()
+            delay = max(0.0, self._last_flush + self.interval - loop.time())
+            self._handle = loop.call_later(delay, self._flush)
+
+    def _flush(self):
+        self._handle = None
+        self._last_flush = asyncio.get_running_loop().time()
+        dirty, self._dirty = self._dirty, set()
+
+        counts = self.vote_store.counts
+        tallies = {hoodie_id: list(counts.get(hoodie_id, (0, 0))) for hoodie_id in dirty}
+        # One update object per channel, shared by its subscribers so the
+        # event is encoded once however many clients receive it
+        if ALL_CHANNEL in self.channels:
+            update = TallyUpdate(tallies)
+            for queue in self.channels[ALL_CHANNEL]:
+                _offer(queue, update)
+        for hoodie_id, tally in tallies.items():
+            queues = self.channels.get(hoodie_id)
+            if queues:
+                update = TallyUpdate({hoodie_id: tally})
+                for queue in queues:
+                    _offer(queue, update)
+
+    def close(self):
+        """Stop pending flushes and end every open stream."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        for queues in self.channels.values():
+            for queue in queues:
+                _offer(queue, None)
+
+
+class TallyUpdate:
+    """Latest tallies for some hoodies, encoded as an SSE event on first use."""
+
+    def __init__(self, tallies):
+        self.tallies = tallies
+        self._event = None
+
+    @property
+    def event(self):
+        if self._event is None:
+            data = [
+                {"hoodie_id": hoodie_id, "votes_original": counts[0], "votes_ai": counts[1]}
+                for hoodie_id, counts in self.tallies.items()
+            ]
+            self._event = f"event: tally\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+        return self._event
+
+
+def _offer(queue, update):
+    if queue.full():
+        pending = queue.get_nowait()
+        if update is not None and pending is not None:
+            update = TallyUpdate({**pending.tallies, **update.tallies})
+    queue.put_nowait(update)
+
+
+async def stream_tallies(broadcaster, channel, initial=None):
+    """Yield server-sent events for `channel` until the client goes away."""
+    queue = broadcaster.subscribe(channel)
+    try:
+        # Tell EventSource how long to wait before reconnecting
+        yield "retry: 2000\n\n"
+        if initial:
+            yield TallyUpdate(initial).event
+        while True:
+            try:
+                update = await asyncio.wait_for(queue.get(), KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                # Comment line keeps proxies from closing an idle stream
+                yield f": keepalive {int(time.time())}\n\n"
+                continue
+            if update is None:
+                return
+            yield update.event
+    finally:
+        broadcaster.unsubscribe(channel, queue)
@@ -1,8 +1,23 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import router
+from fastapi.responses import PlainTextResponse
+from app.api.routes import leaderboard, router, tallies, vote_store
+from app.metrics import MetricsMiddleware, metrics
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await vote_store.start()
+    await leaderboard.start(vote_store)
+    yield
+    tallies.close()
+    await leaderboard.close()
+    # Flush and fsync buffered votes before the worker exits
+    await vote_store.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -15,8 +30,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so timings include the other middleware
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(router)
 
 @app.get("/")
 async def root():
     return {"message": "AI Hoodie Backend"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
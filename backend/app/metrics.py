@@ -0,0 +1,165 @@
+import time
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+LOAD_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+# Label used for requests that matched no route, so scanners probing random
+# paths can't blow up the number of series
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram.
+
+    Updates are plain list/float operations with no locking: handlers run on
+    the event loop thread, and the GIL keeps the occasional threadpool update
+    from corrupting anything beyond a rare lost increment.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        cumulative += self.counts[-1]
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+class RouteStats:
+    def __init__(self):
+        self.statuses = {}
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+
+
+class Metrics:
+    """In-process metrics for one worker, rendered in Prometheus text format."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.routes = {}
+        self.catalog_loads = Histogram(LOAD_BUCKETS)
+        self.catalog_items = 0
+
+    def record_request(self, method, route, status, duration, size):
+        key = (method, route)
+        stats = self.routes.get(key)
+        if stats is None:
+            stats = self.routes[key] = RouteStats()
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+        stats.latency.observe(duration)
+        stats.size.observe(size)
+
+    def record_catalog_load(self, duration, items):
+        self.catalog_loads.observe(duration)
+        self.catalog_items = items
+
+    def render(self):
+        lines = [
+            "# HELP http_requests_total Requests handled, by route and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        routes = sorted(self.routes.items())
+        for (method, route), stats in routes:
+            for status, count in sorted(stats.statuses.items()):
+                lines.append(
+                    f'http_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {count}'
+                )
+
+        lines += [
+            "# HELP http_request_duration_seconds Time from request start to the last response byte.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), stats in routes:
+            lines += stats.latency.render(
+                "http_request_duration_seconds", f'method="{method}",route="{_escape(route)}"'
+            )
+
+        lines += [
+            "# HELP http_response_size_bytes Response body size.",
+            "# TYPE http_response_size_bytes histogram",
+        ]
+        for (method, route), stats in routes:
+            lines += stats.size.render(
+                "http_response_size_bytes", f'method="{method}",route="{_escape(route)}"'
+            )
+
+        lines += [
+            "# HELP catalog_load_duration_seconds Time to load the catalog and build its indexes.",
+            "# TYPE catalog_load_duration_seconds histogram",
+        ]
+        lines += self.catalog_loads.render("catalog_load_duration_seconds", 'catalog="hoodies"')
+        lines += [
+            "# HELP catalog_items Items in the currently loaded catalog.",
+            "# TYPE catalog_items gauge",
+            f'catalog_items{{catalog="hoodies"}} {self.catalog_items}',
+            "# HELP process_start_time_seconds Start time of the worker since the epoch.",
+            "# TYPE process_start_time_seconds gauge",
+            f"process_start_time_seconds {self.started_at}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing every HTTP request.
+
+    Requests are labelled by route template (e.g. `/hoodies/{hoodie_id}`), not
+    the raw path, which FastAPI puts in the scope once routing has matched.
+    """
+
+    def __init__(self, app, registry=metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            self.registry.record_request(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status,
+                time.perf_counter() - start,
+                size,
+            )
@@ -0,0 +1,63 @@
+import random
+
+from app.http_cache import encode_json
+
+
+class PairSampler:
+    """
+    Samples original-vs-AI voting pairs in constant time.
+
+    For every votable item both left/right arrangements are encoded up front,
+    so a sample is two random draws and a list lookup.
+    """
+
+    def __init__(self, items):
+        self.ids = []
+        self.bodies = []
+        for item in items:
+            original = item.get("original_image_url")
+            ai = item.get("ai_image_url")
+            if not original or not ai:
+                continue
+            sides = {
+                "original": {"choice": "original", "image_url": original},
+                "ai": {"choice": "ai", "image_url": ai},
+            }
+            head = {"id": str(item.get("id")), "name": item.get("name", "")}
+            self.ids.append(head["id"])
+            self.bodies.append((
+                encode_json({**head, "left": sides["original"], "right": sides["ai"]}),
+                encode_json({**head, "left": sides["ai"], "right": sides["original"]}),
+            ))
+
+    @classmethod
+    def from_encoded(cls, ids, bodies):
+        """Wrap pairs encoded elsewhere, e.g. read from a compiled snapshot."""
+        sampler = cls([])
+        sampler.ids = ids
+        sampler.bodies = bodies
+        return sampler
+
+    def __len__(self):
+        return len(self.ids)
+
+    def sample(self, vote_counts=None):
+        """
+        Return a pre-encoded pair with randomised sides.
+
+        With `vote_counts` (hoodie_id -> [original, ai]) two candidates are
+        drawn and the one with fewer votes wins, which steers traffic toward
+        under-voted designs without maintaining a weight table.
+        """
+        n = len(self.ids)
+        i = int(random.random() * n)
+        if vote_counts:
+            j = int(random.random() * n)
+            if _total(vote_counts, self.ids[j]) < _total(vote_counts, self.ids[i]):
+                i = j
+        return self.bodies[i][random.getrandbits(1)]
+
+
+def _total(vote_counts, hoodie_id):
+    counts = vote_counts.get(hoodie_id)
+    return counts[0] + counts[1] if counts else 0
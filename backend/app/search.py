@@ -0,0 +1,189 @@
+import glob
+import math
+import os
+import re
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset({
+    "a", "an", "and", "by", "for", "from", "in", "of", "on", "the", "to", "with",
+    # Boilerplate from the description templates, present in every item
+    "hoodie", "design", "featuring", "style",
+})
+
+# Text fields that get indexed, with how many times each is repeated so
+# title and tag matches outrank a passing mention in the description
+SEARCH_FIELDS = {
+    "name": 2,
+    "artist": 1,
+    "caption": 1,
+    "description": 1,
+    "tags": 2,
+}
+
+K1 = 1.2
+B = 0.75
+INDEX_VERSION = 1
+
+
+def tokenize(text):
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def item_tokens(item):
+    tokens = []
+    for field, weight in SEARCH_FIELDS.items():
+        value = item.get(field)
+        if not value:
+            continue
+        if isinstance(value, list):
+            value = " ".join(str(v) for v in value)
+        tokens.extend(tokenize(str(value)) * weight)
+    return tokens
+
+
+class SearchIndex:
+    """
+    BM25 inverted index over the catalog's text fields.
+
+    Each term's postings store the final BM25 contribution per document, so a
+    query only gathers and sums precomputed scores. Postings for all terms are
+    kept in three flat arrays (offsets, positions, scores) which is also the
+    on-disk format.
+    """
+
+    def __init__(self, terms, offsets, positions, scores, size):
+        self.terms = {term: i for i, term in enumerate(terms)}
+        self.offsets = offsets
+        self.positions = positions
+        self.scores = scores
+        self.size = size
+
+    @classmethod
+    def from_lookup(cls, terms, offsets, positions, scores, size):
+        """Wrap postings whose term -> row mapping is any object with `get`."""
+        index = cls([], offsets, positions, scores, size)
+        index.terms = terms
+        return index
+
+    @classmethod
+    def build(cls, items):
+        postings = {}
+        lengths = []
+        for pos, item in enumerate(items):
+            tokens = item_tokens(item)
+            lengths.append(len(tokens))
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                postings.setdefault(token, []).append((pos, tf))
+
+        n = len(items)
+        avg_len = (sum(lengths) / n) if n else 0.0
+        terms = sorted(postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        all_positions = []
+        all_scores = []
+        for i, term in enumerate(terms):
+            docs = postings[term]
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for pos, tf in docs:
+                norm = K1 * (1 - B + B * lengths[pos] / avg_len) if avg_len else K1
+                all_positions.append(pos)
+                all_scores.append(idf * tf * (K1 + 1) / (tf + norm))
+            offsets[i + 1] = len(all_positions)
+
+        return cls(
+            terms,
+            offsets,
+            np.asarray(all_positions, dtype=np.int32),
+            np.asarray(all_scores, dtype=np.float32),
+            n,
+        )
+
+    @classmethod
+    def load_or_build(cls, items, cache_path=None):
+        """Load a persisted index from `cache_path`, building and saving it if missing."""
+        if cache_path and os.path.exists(cache_path):
+            try:
+                return cls.load(cache_path)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Ignoring unreadable search index {cache_path}: {e}")
+
+        index = cls.build(items)
+        if cache_path:
+            try:
+                index.save(cache_path)
+            except OSError as e:
+                print(f"Failed to persist search index to {cache_path}: {e}")
+        return index
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != INDEX_VERSION:
+                raise ValueError("index version mismatch")
+            return cls(
+                data["terms"].tolist(),
+                data["offsets"],
+                data["positions"],
+                data["scores"],
+                int(data["size"]),
+            )
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        terms = sorted(self.terms, key=self.terms.get)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                version=INDEX_VERSION,
+                terms=np.asarray(terms, dtype=str),
+                offsets=self.offsets,
+                positions=self.positions,
+                scores=self.scores,
+                size=self.size,
+            )
+        os.replace(tmp_path, path)
+
+        # Indexes for older catalog versions are never read again
+        prefix = os.path.basename(path).split("-", 1)[0]
+        for stale in glob.glob(os.path.join(os.path.dirname(path), f"{prefix}-*.npz")):
+            if stale != path:
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+
+    def search(self, query, k=10):
+        """Return (positions, scores, hit_count) for the top `k` matches."""
+        slices = []
+        for token in set(tokenize(query)):
+            i = self.terms.get(token)
+            if i is not None:
+                slices.append((self.offsets[i], self.offsets[i + 1]))
+        if not slices:
+            return [], [], 0
+
+        if len(slices) == 1:
+            start, stop = slices[0]
+            positions = self.positions[start:stop]
+            scores = self.scores[start:stop]
+        else:
+            acc = np.zeros(self.size, dtype=np.float32)
+            for start, stop in slices:
+                # Positions are unique within a term, so fancy-index add is safe
+                acc[self.positions[start:stop]] += self.scores[start:stop]
+            positions = np.flatnonzero(acc)
+            scores = acc[positions]
+
+        hits = len(positions)
+        if hits > k:
+            top = np.argpartition(scores, -k)[-k:]
+            positions, scores = positions[top], scores[top]
+        # Highest score first, ties broken by catalog order
+        order = np.lexsort((positions, -scores))
+        return positions[order].tolist(), scores[order].tolist(), hits
@@ -0,0 +1,135 @@
+import json
+import os
+
+import numpy as np
+
+EMBEDDINGS_FILE = "embeddings.npy"
+EMBEDDING_IDS_FILE = "embedding_ids.json"
+
+# Rows scored per matrix product, bounding the float32 scratch space
+BLOCK_ROWS = 8192
+
+# Catalogs at least this large get an IVF index for approximate search
+APPROX_MIN_ITEMS = 50_000
+IVF_TRAIN_SAMPLE = 20_000
+IVF_ITERATIONS = 10
+IVF_NPROBE = 8
+
+
+class EmbeddingIndex:
+    """
+    Nearest-neighbour search over the CLIP image embeddings of the catalog.
+
+    The float16 matrix is memory-mapped read-only, so workers share the
+    page cache instead of each holding a copy. Rows are L2-normalised, so the
+    dot product is the cosine similarity.
+    """
+
+    def __init__(self, matrix, ids):
+        if len(ids) != matrix.shape[0]:
+            raise ValueError(f"{len(ids)} ids for {matrix.shape[0]} embeddings")
+        self.matrix = matrix
+        self.ids = ids
+        self.rows = {hoodie_id: row for row, hoodie_id in enumerate(ids)}
+        self.ivf = None
+        if len(ids) >= APPROX_MIN_ITEMS:
+            self.ivf = IVFIndex.build(matrix)
+
+    @classmethod
+    def open(cls, directory):
+        """Load the embeddings stored next to the catalog, or None if there are none."""
+        matrix_path = os.path.join(directory, EMBEDDINGS_FILE)
+        ids_path = os.path.join(directory, EMBEDDING_IDS_FILE)
+        if not (os.path.exists(matrix_path) and os.path.exists(ids_path)):
+            return None
+
+        with open(ids_path, "r", encoding="utf-8") as f:
+            ids = [str(i) for i in json.load(f)]
+        matrix = np.load(matrix_path, mmap_mode="r")
+        return cls(matrix, ids)
+
+    def similar(self, hoodie_id, k=10, exact=False):
+        """Return [(hoodie_id, score), ...] for the `k` designs closest to `hoodie_id`."""
+        row = self.rows.get(hoodie_id)
+        if row is None:
+            return None
+        query = np.asarray(self.matrix[row], dtype=np.float32)
+
+        if self.ivf is not None and not exact:
+            rows, scores = self.ivf.search(self.matrix, query, k + 1)
+        else:
+            rows, scores = exact_search(self.matrix, query, k + 1)
+
+        return [
+            (self.ids[r], float(s)) for r, s in zip(rows, scores) if r != row
+        ][:k]
+
+
+def top_k(rows, scores, k):
+    if len(scores) > k:
+        keep = np.argpartition(scores, -k)[-k:]
+        rows, scores = rows[keep], scores[keep]
+    order = np.argsort(-scores, kind="stable")
+    return rows[order], scores[order]
+
+
+def exact_search(matrix, query, k):
+    """Score every row block by block and keep a running top k."""
+    best_rows = np.empty(0, dtype=np.int64)
+    best_scores = np.empty(0, dtype=np.float32)
+    for start in range(0, matrix.shape[0], BLOCK_ROWS):
+        block = np.asarray(matrix[start:start + BLOCK_ROWS], dtype=np.float32)
+        scores = block @ query
+        rows, scores = top_k(np.arange(start, start + len(block)), scores, k)
+        best_rows = np.concatenate([best_rows, rows])
+        best_scores = np.concatenate([best_scores, scores])
+        best_rows, best_scores = top_k(best_rows, best_scores, k)
+    return best_rows.tolist(), best_scores.tolist()
+
+
+class IVFIndex:
+    """
+    Inverted-file index: rows are bucketed by their nearest k-means centroid
+    and a query only scores the `IVF_NPROBE` buckets closest to it.
+    """
+
+    def __init__(self, centroids, order, offsets):
+        self.centroids = centroids
+        self.order = order
+        self.offsets = offsets
+
+    @classmethod
+    def build(cls, matrix, seed=0):
+        n = matrix.shape[0]
+        n_lists = max(1, int(np.sqrt(n)))
+        rng = np.random.default_rng(seed)
+
+        sample_rows = np.sort(rng.choice(n, size=min(n, IVF_TRAIN_SAMPLE), replace=False))
+        sample = np.asarray(matrix[sample_rows], dtype=np.float32)
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)]
+
+        # Spherical k-means: assign by dot product, re-normalise the means
+        for _ in range(IVF_ITERATIONS):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            centroids = np.where(empty[:, None], centroids, sums / np.maximum(norms, 1e-12))
+
+        assign = np.empty(n, dtype=np.int32)
+        for start in range(0, n, BLOCK_ROWS):
+            block = np.asarray(matrix[start:start + BLOCK_ROWS], dtype=np.float32)
+            assign[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+        order = np.argsort(assign, kind="stable")
+        offsets = np.searchsorted(assign[order], np.arange(n_lists + 1))
+        return cls(centroids, order, offsets)
+
+    def search(self, matrix, query, k):
+        probes = np.argsort(-(self.centroids @ query))[:IVF_NPROBE]
+        rows = np.concatenate([self.order[self.offsets[p]:self.offsets[p + 1]] for p in probes])
+        rows.sort()  # sequential access into the memory map
+        scores = np.asarray(matrix[rows], dtype=np.float32) @ query
+        rows, scores = top_k(rows, scores, k)
+        return rows.tolist(), scores.tolist()
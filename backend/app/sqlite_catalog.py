@@ -0,0 +1,277 @@
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from app.catalog import MAX_CACHED_PROJECTIONS
+from app.http_cache import compress, encode_json, make_etag
+from app.search import tokenize
+from app.similarity import EmbeddingIndex
+from app.sqlite_store import connect, data_version
+
+# Keeps IN (...) lists under SQLite's bound-parameter limit
+SELECT_CHUNK = 500
+
+# Column weights for bm25(): name, artist, caption, description, tags
+FTS_WEIGHTS = (2.0, 1.0, 1.0, 1.0, 2.0)
+
+
+class SqliteCatalog:
+    """
+    Catalog served straight from SQLite.
+
+    Exposes the same interface as app.catalog.Catalog, but every call is an
+    indexed query instead of a lookup in a parsed in-memory copy, so worker
+    memory doesn't grow with the catalog and imports are visible without a
+    reload. Only whole-catalog bodies are kept, per data version, since
+    building one reads the entire table.
+
+    Routes run calls in the threadpool (`blocking`); the connection is
+    shared, which SQLite's serialized threading mode allows.
+    """
+
+    blocking = True
+
+    def __init__(self, conn, embeddings=None):
+        self.conn = conn
+        self.embeddings = embeddings
+        self.loaded_at = time.time()
+        self.index = SqliteIndex(conn)
+        self.pairs = SqlitePairs(self)
+        self.search = SqliteSearch(conn)
+        self._lock = threading.Lock()
+        self._cache_version = None
+        self._bodies = {}  # projection key -> (body, etag)
+        self._compressed = {}  # (projection key, encoding) -> body
+
+    def __len__(self):
+        # Positions are dense, so this is an index seek rather than a count
+        return self.conn.execute("SELECT COALESCE(MAX(pos) + 1, 0) FROM hoodies").fetchone()[0]
+
+    @property
+    def version(self):
+        """Import counter; changes whenever the rows do."""
+        return str(data_version(self.conn))
+
+    @property
+    def fields(self):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'fields'").fetchone()
+        return frozenset(json.loads(row[0])) if row else frozenset()
+
+    def projection_key(self, fields):
+        if not fields:
+            return None
+        unknown = set(fields) - self.fields
+        if unknown:
+            raise KeyError(", ".join(sorted(unknown)))
+        return tuple(sorted(set(fields) | {"id"}))
+
+    @staticmethod
+    def _encode(data, key):
+        if key is None:
+            return data.encode("utf-8")
+        item = json.loads(data)
+        return encode_json({k: v for k, v in item.items() if k in key})
+
+    def page(self, start, stop, fields=None):
+        key = self.projection_key(fields)
+        rows = self.conn.execute(
+            "SELECT data FROM hoodies WHERE pos >= ? AND pos < ? ORDER BY pos", (start, stop)
+        )
+        return b"[" + b",".join(self._encode(data, key) for (data,) in rows) + b"]"
+
+    def select(self, positions, fields=None):
+        key = self.projection_key(fields)
+        found = {}
+        for i in range(0, len(positions), SELECT_CHUNK):
+            chunk = positions[i:i + SELECT_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            for pos, data in self.conn.execute(
+                f"SELECT pos, data FROM hoodies WHERE pos IN ({placeholders})", chunk
+            ):
+                found[pos] = data
+        return b"[" + b",".join(self._encode(found[p], key) for p in positions if p in found) + b"]"
+
+    def row(self, pos, fields=None):
+        key = self.projection_key(fields)
+        (data,) = self.conn.execute("SELECT data FROM hoodies WHERE pos = ?", (pos,)).fetchone()
+        return self._encode(data, key)
+
+    def _cached(self, cache, key, version):
+        with self._lock:
+            if self._cache_version != version:
+                self._cache_version = version
+                self._bodies = {}
+                self._compressed = {}
+            return getattr(self, cache).get(key)
+
+    def _store(self, cache, key, value, version, limit):
+        # Kept only if no import landed while it was built: the rows were
+        # read between two reads of the same version
+        if self.version != version:
+            return
+        with self._lock:
+            entries = getattr(self, cache)
+            if self._cache_version == version and len(entries) < limit:
+                entries[key] = value
+
+    def full_body(self, fields=None):
+        key = self.projection_key(fields)
+        version = self.version
+        cached = self._cached("_bodies", key, version)
+        if cached is None:
+            body = self.page(0, len(self), fields)
+            cached = (body, make_etag(body))
+            self._store("_bodies", key, cached, version, MAX_CACHED_PROJECTIONS)
+        return cached
+
+    def full_body_ready(self, fields, encoding=None):
+        # Checking means reading the data version; routes call this catalog
+        # in the threadpool anyway, where a cache hit is cheap
+        return False
+
+    def compressed_body(self, fields, encoding):
+        key = (self.projection_key(fields), encoding)
+        version = self.version
+        data = self._cached("_compressed", key, version)
+        if data is None:
+            data = compress(self.full_body(fields)[0], encoding)
+            self._store("_compressed", key, data, version, 2 * MAX_CACHED_PROJECTIONS)
+        return data
+
+
+class SqliteIndex:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def position(self, hoodie_id):
+        row = self.conn.execute("SELECT pos FROM hoodies WHERE id = ?", (hoodie_id,)).fetchone()
+        return row[0] if row else None
+
+    def query(self, tags=None, source=None, min_price=None, max_price=None):
+        clauses = []
+        params = []
+        for tag in tags or []:
+            clauses.append("pos IN (SELECT pos FROM hoodie_tags WHERE tag = ?)")
+            params.append(tag.lower())
+        if source:
+            clauses.append("source = ?")
+            params.append(source.lower())
+        if min_price is not None:
+            clauses.append("price >= ?")
+            params.append(min_price)
+        if max_price is not None:
+            clauses.append("price <= ?")
+            params.append(max_price)
+
+        if not clauses:
+            return None
+        sql = f"SELECT pos FROM hoodies WHERE {' AND '.join(clauses)} ORDER BY pos"
+        return [pos for (pos,) in self.conn.execute(sql, params)]
+
+
+class SqlitePairs:
+    def __init__(self, catalog):
+        self.catalog = catalog
+
+    def __len__(self):
+        return len(self.catalog)
+
+    def sample(self, vote_counts=None):
+        n = len(self.catalog)
+        conn = self.catalog.conn
+        pos = int(random.random() * n)
+        if vote_counts:
+            other = int(random.random() * n)
+            ids = dict(conn.execute("SELECT pos, id FROM hoodies WHERE pos IN (?, ?)", (pos, other)))
+            if _total(vote_counts, ids.get(other)) < _total(vote_counts, ids.get(pos)):
+                pos = other
+
+        (data,) = conn.execute("SELECT data FROM hoodies WHERE pos = ?", (pos,)).fetchone()
+        item = json.loads(data)
+        sides = [
+            {"choice": "original", "image_url": item.get("original_image_url")},
+            {"choice": "ai", "image_url": item.get("ai_image_url")},
+        ]
+        if random.getrandbits(1):
+            sides.reverse()
+        return encode_json({
+            "id": str(item.get("id")),
+            "name": item.get("name", ""),
+            "left": sides[0],
+            "right": sides[1],
+        })
+
+
+def _total(vote_counts, hoodie_id):
+    counts = vote_counts.get(hoodie_id)
+    return counts[0] + counts[1] if counts else 0
+
+
+class SqliteSearch:
+    """BM25 ranking from SQLite's FTS5 index."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def search(self, query, k=10):
+        tokens = sorted(set(tokenize(query)))
+        if not tokens:
+            return [], [], 0
+        match = " OR ".join(f'"{t}"' for t in tokens)
+        weights = ", ".join(str(w) for w in FTS_WEIGHTS)
+
+        rows = self.conn.execute(
+            f"SELECT rowid, bm25(hoodies_fts, {weights}) AS rank FROM hoodies_fts "
+            f"WHERE hoodies_fts MATCH ? ORDER BY rank, rowid LIMIT ?",
+            (match, k),
+        ).fetchall()
+        (total,) = self.conn.execute(
+            "SELECT COUNT(*) FROM hoodies_fts WHERE hoodies_fts MATCH ?", (match,)
+        ).fetchone()
+        # bm25() is negated so that lower is better; flip it back
+        return [r[0] for r in rows], [-r[1] for r in rows], total
+
+
+class SqliteCatalogStore:
+    """Drop-in for CatalogCache that serves from a SQLite database."""
+
+    def __init__(self, path):
+        self.path = path
+        self._catalog = None
+
+    @property
+    def ready(self):
+        return self._catalog is not None
+
+    def get(self):
+        if self._catalog is None:
+            self._catalog = self._open()
+        return self._catalog
+
+    def reload(self):
+        """
+        Reopen the database and embeddings; catalog rows are always live.
+        Raises ValueError if the file isn't a database.
+        """
+        # Swap in the new connection before dropping the old one, so requests
+        # never see a closed connection; the old one closes once unreferenced
+        self._catalog = self._open()
+        return self._catalog
+
+    def _open(self):
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(self.path)
+        try:
+            conn = connect(self.path, readonly=True)
+        except sqlite3.DatabaseError as e:
+            # Same contract as a corrupt JSON file or snapshot
+            raise ValueError(f"{self.path}: {e}") from e
+        try:
+            embeddings = EmbeddingIndex.open(os.path.dirname(self.path))
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable embeddings next to {self.path}: {e}")
+            embeddings = None
+        return SqliteCatalog(conn, embeddings=embeddings)
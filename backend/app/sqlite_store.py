@@ -0,0 +1,196 @@
+"""
+SQLite storage for the hoodie catalog.
+
+This module only depends on the standard library (and app.indexes, which
+does too) so the AI pipeline can import it to write into the database.
+Serving from the database lives in app.sqlite_catalog.
+"""
+import json
+import sqlite3
+
+from app.indexes import item_source, parse_price
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hoodies (
+    pos INTEGER PRIMARY KEY,        -- catalog order, dense from 0
+    id TEXT NOT NULL UNIQUE,
+    source TEXT,
+    price REAL,
+    data TEXT NOT NULL              -- the item as compact JSON, served as-is
+);
+CREATE INDEX IF NOT EXISTS hoodies_source ON hoodies (source, pos);
+CREATE INDEX IF NOT EXISTS hoodies_price ON hoodies (price, pos);
+
+CREATE TABLE IF NOT EXISTS hoodie_tags (
+    tag TEXT NOT NULL,
+    pos INTEGER NOT NULL REFERENCES hoodies (pos),
+    PRIMARY KEY (tag, pos)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS hoodie_tags_pos ON hoodie_tags (pos);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS hoodies_fts USING fts5 (
+    name, artist, caption, description, tags
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def connect(path, readonly=False):
+    """Open the catalog database in WAL mode, creating the schema if needed."""
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    if readonly:
+        conn.execute("PRAGMA query_only=ON")
+    else:
+        conn.executescript(SCHEMA)
+    return conn
+
+
+def data_version(conn):
+    """Counter bumped by every import that changes a row, so readers can tell the data changed."""
+    row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+    return int(row[0]) if row else 0
+
+
+def upsert_hoodies(conn, items, prune=False):
+    """
+    Insert or update `items` in one transaction and return how many rows
+    were written or deleted.
+
+    Existing ids keep their position; new ids are appended to the end of the
+    catalog. Items whose stored JSON is already identical are skipped, along
+    with their tags and search rows, so re-syncing an unchanged catalog
+    writes nothing and leaves the data version alone. With `prune`, `items`
+    is the whole catalog: ids missing from it are deleted in the same
+    transaction and the remaining rows are renumbered to stay dense.
+    """
+    with conn:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'fields'").fetchone()
+        old_fields = set(json.loads(row[0])) if row else set()
+        fields = set() if prune else set(old_fields)
+        existing = _stored_rows(conn)
+
+        changed = 0
+        if prune:
+            keep = {str(item["id"]) for item in items}
+            stale = [pos for hoodie_id, (pos, _) in existing.items() if hoodie_id not in keep]
+            if stale:
+                _delete_positions(conn, stale)
+                changed += len(stale)
+                existing = _stored_rows(conn)
+
+        next_pos = conn.execute("SELECT COALESCE(MAX(pos) + 1, 0) FROM hoodies").fetchone()[0]
+        for item in items:
+            fields.update(item)
+            hoodie_id = str(item["id"])
+            data = json.dumps(item, ensure_ascii=False, separators=(",", ":"))
+            current = existing.get(hoodie_id)
+            if current and current[1] == data:
+                continue
+            source = item_source(item)
+            price = parse_price(item.get("price"))
+
+            if current:
+                pos = current[0]
+                conn.execute(
+                    "UPDATE hoodies SET source = ?, price = ?, data = ? WHERE pos = ?",
+                    (source, price, data, pos),
+                )
+                conn.execute("DELETE FROM hoodie_tags WHERE pos = ?", (pos,))
+                conn.execute("DELETE FROM hoodies_fts WHERE rowid = ?", (pos,))
+            else:
+                pos = next_pos
+                next_pos += 1
+                conn.execute(
+                    "INSERT INTO hoodies (pos, id, source, price, data) VALUES (?, ?, ?, ?, ?)",
+                    (pos, hoodie_id, source, price, data),
+                )
+            existing[hoodie_id] = (pos, data)
+            changed += 1
+
+            tags = item.get("tags") or []
+            conn.executemany(
+                "INSERT OR IGNORE INTO hoodie_tags (tag, pos) VALUES (?, ?)",
+                [(tag.lower(), pos) for tag in tags],
+            )
+            conn.execute(
+                "INSERT INTO hoodies_fts (rowid, name, artist, caption, description, tags) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    pos,
+                    item.get("name", ""),
+                    item.get("artist", ""),
+                    item.get("caption", ""),
+                    item.get("description", ""),
+                    " ".join(tags),
+                ),
+            )
+
+        if fields != old_fields:
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('fields', ?)",
+                (json.dumps(sorted(fields)),),
+            )
+        # Readers drop their cached bodies when the version moves, so only
+        # move it when something was written
+        if changed or fields != old_fields:
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('version', '1') "
+                "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+            )
+    return changed
+
+
+def _stored_rows(conn):
+    """Map each stored id to its (pos, data)."""
+    return {hoodie_id: (pos, data) for pos, hoodie_id, data in conn.execute("SELECT pos, id, data FROM hoodies")}
+
+
+def _delete_positions(conn, stale):
+    """Delete the rows at positions `stale`, then close the gaps in `pos`."""
+    for pos in stale:
+        conn.execute("DELETE FROM hoodies WHERE pos = ?", (pos,))
+        conn.execute("DELETE FROM hoodie_tags WHERE pos = ?", (pos,))
+        conn.execute("DELETE FROM hoodies_fts WHERE rowid = ?", (pos,))
+
+    # Moving rows down in order never lands on a position still in use
+    remaining = [pos for (pos,) in conn.execute("SELECT pos FROM hoodies ORDER BY pos")]
+    for new_pos, old_pos in enumerate(remaining):
+        if new_pos == old_pos:
+            continue
+        conn.execute("UPDATE hoodies SET pos = ? WHERE pos = ?", (new_pos, old_pos))
+        conn.execute("UPDATE hoodie_tags SET pos = ? WHERE pos = ?", (new_pos, old_pos))
+        conn.execute(
+            "INSERT INTO hoodies_fts (rowid, name, artist, caption, description, tags) "
+            "SELECT ?, name, artist, caption, description, tags FROM hoodies_fts WHERE rowid = ?",
+            (new_pos, old_pos),
+        )
+        conn.execute("DELETE FROM hoodies_fts WHERE rowid = ?", (old_pos,))
+
+
+def import_json(db_path, json_path):
+    """Make the database at `db_path` hold exactly the hoodies in a hoodies.json file."""
+    with open(json_path, "r", encoding="utf-8") as f:
+        items = json.load(f)
+    conn = connect(db_path)
+    try:
+        upsert_hoodies(conn, items, prune=True)
+    finally:
+        conn.close()
+    return len(items)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 3:
+        print("Usage: python -m app.sqlite_store <hoodies.json> <hoodies.db>")
+        sys.exit(1)
+
+    count = import_json(sys.argv[2], sys.argv[1])
+    print(f"Imported {count} hoodies into {sys.argv[2]}")
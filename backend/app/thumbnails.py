@@ -0,0 +1,212 @@
+import asyncio
+import hashlib
+import io
+import os
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+
+from PIL import Image
+
+# Widths a thumbnail can be requested at; a fixed set keeps the cache bounded
+THUMBNAIL_WIDTHS = (160, 320, 640)
+# Format name -> (Pillow format, media type, save options)
+THUMBNAIL_FORMATS = {
+    "webp": ("WEBP", "image/webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", "image/jpeg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+FETCH_TIMEOUT = 10.0
+# Seconds a remote image's ETag/Last-Modified is trusted before asking again
+SOURCE_CHECK_INTERVAL = 60.0
+
+
+class ThumbnailCache:
+    """
+    Size-bounded LRU of encoded thumbnails on disk.
+
+    Recency is kept in the files' mtimes, so the order survives restarts and
+    is shared (loosely) between workers using the same directory. Each worker
+    tracks its own view of the total size; a file another worker evicted is
+    just a miss.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        files = []
+        for entry in os.scandir(directory):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(files):
+            self.entries[name] = size
+            self.size += size
+        with self._lock:
+            self._evict()
+
+    def get(self, key):
+        path = os.path.join(self.directory, key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.size -= self.entries.pop(key, 0)
+            return None
+        with self._lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+            else:
+                self.entries[key] = len(data)
+                self.size += len(data)
+        return data
+
+    def put(self, key, data):
+        path = os.path.join(self.directory, key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.size += len(data) - self.entries.pop(key, 0)
+            self.entries[key] = len(data)
+            self._evict()
+
+    def _evict(self):
+        while self.size > self.max_bytes and len(self.entries) > 1:
+            key, size = self.entries.popitem(last=False)
+            self.size -= size
+            try:
+                os.remove(os.path.join(self.directory, key))
+            except FileNotFoundError:
+                pass
+
+
+def make_thumbnail(source, width, fmt):
+    """Encode `source` (bytes or a path) as a `fmt` thumbnail at most `width` wide."""
+    pil_format, _, options = THUMBNAIL_FORMATS[fmt]
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    with Image.open(source) as img:
+        width = min(width, img.width)
+        size = (width, max(1, round(img.height * width / img.width)))
+        # JPEGs decode straight at a reduced scale (1/2, 1/4, 1/8) in draft
+        # mode; other formats ignore it and are shrunk with reduce() below
+        img.draft("RGB", size)
+        img = img.convert("RGBA" if fmt == "webp" and _has_alpha(img) else "RGB")
+        img.thumbnail(size, Image.LANCZOS, reducing_gap=2.0)
+        out = io.BytesIO()
+        img.save(out, pil_format, **options)
+    return out.getvalue()
+
+
+def _has_alpha(img):
+    return img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info)
+
+
+class ThumbnailService:
+    """
+    Serves thumbnails of catalog images, generating each variant once.
+
+    Source images are read from `image_dir` (laid out as <kind>/<file name>)
+    when present, otherwise fetched from `origin` (same layout) or, without an
+    origin, from the URL recorded in the catalog.
+
+    Variants are keyed on the source image itself: a local file's mtime and
+    size, or a remote image's ETag/Last-Modified, rechecked with a HEAD
+    request at most every `check_interval` seconds. Image URLs stay the same
+    when an image is regenerated, so this is what tells the versions apart.
+    """
+
+    def __init__(self, image_dir, cache_dir, max_bytes, origin=None, check_interval=SOURCE_CHECK_INTERVAL):
+        self.image_dir = image_dir
+        self.origin = origin.rstrip("/") if origin else None
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.check_interval = check_interval
+        self._cache = None
+        self._pending = {}
+        self._validators = {}  # remote url -> (recheck at, validator)
+
+    @property
+    def cache(self):
+        # Created on first use so importing the app doesn't touch the disk
+        if self._cache is None:
+            self._cache = ThumbnailCache(self.cache_dir, self.max_bytes)
+        return self._cache
+
+    def _locate(self, kind, url):
+        """Return (local path or None, remote URL) for a catalog image URL."""
+        name = os.path.basename(url.split("?", 1)[0])
+        local_path = os.path.join(self.image_dir, kind, name)
+        if os.path.isfile(local_path):
+            return local_path, None
+        return None, f"{self.origin}/{kind}/{name}" if self.origin else url
+
+    def source_identity(self, kind, url):
+        """A string that changes whenever the source image does; blocks on disk or network."""
+        local_path, remote_url = self._locate(kind, url)
+        if local_path:
+            st = os.stat(local_path)
+            return f"file\0{local_path}\0{st.st_mtime_ns}\0{st.st_size}"
+
+        now = time.monotonic()
+        known = self._validators.get(remote_url)
+        if known is None or now >= known[0]:
+            request = urllib.request.Request(remote_url, method="HEAD")
+            try:
+                with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as response:
+                    validator = response.headers.get("ETag") or response.headers.get("Last-Modified") or ""
+            except OSError:
+                # Keep serving what we have; the image fetch reports real failures
+                validator = known[1] if known else ""
+            known = self._validators[remote_url] = (now + self.check_interval, validator)
+        return f"url\0{remote_url}\0{known[1]}"
+
+    def variant_key(self, identity, width, fmt):
+        digest = hashlib.blake2b(identity.encode(), digest_size=16).hexdigest()
+        return f"{digest}-{width}.{fmt}"
+
+    async def key_for(self, kind, url, width, fmt):
+        """variant_key for the current version of a source image, worked out off the event loop."""
+        loop = asyncio.get_running_loop()
+        identity = await loop.run_in_executor(None, self.source_identity, kind, url)
+        return self.variant_key(identity, width, fmt)
+
+    def read_source(self, kind, url):
+        local_path, remote_url = self._locate(kind, url)
+        if local_path:
+            return local_path
+        with urllib.request.urlopen(remote_url, timeout=FETCH_TIMEOUT) as response:
+            return response.read()
+
+    def _generate(self, key, kind, url, width, fmt):
+        data = make_thumbnail(self.read_source(kind, url), width, fmt)
+        self.cache.put(key, data)
+        return data
+
+    async def get(self, key, kind, url, width, fmt):
+        """
+        Return the encoded thumbnail cached under `key` (from key_for),
+        generating it if needed; raises OSError if the source can't be read.
+        """
+        loop = asyncio.get_running_loop()
+        # Even a hit reads the file and bumps its mtime
+        data = await loop.run_in_executor(None, self.cache.get, key)
+        if data is not None:
+            return data
+
+        # Concurrent requests for the same variant share one generation
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = loop.run_in_executor(None, self._generate, key, kind, url, width, fmt)
+            self._pending[key] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(key, None))
+        return await asyncio.shield(pending)
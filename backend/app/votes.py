@@ -0,0 +1,303 @@
+import asyncio
+import contextlib
+import json
+import os
+import time
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, run a single worker
+    fcntl = None
+
+CHOICES = ("original", "ai")
+
+SEGMENT_PREFIX = "votes-"
+SEGMENT_SUFFIX = ".log"
+
+
+class VoteStore:
+    """
+    Write-behind vote storage backed by append-only logs.
+
+    Votes submitted in the same event-loop tick are coalesced into one
+    `write()` on the log and acknowledged once it returns, so an acknowledged
+    vote is in the OS page cache and survives a process restart. Durability
+    against power loss comes from a background `fsync` every
+    `fsync_interval` seconds, which never runs on the request path.
+
+    Several workers can share `directory`: each appends to its own segment
+    (`votes-<id>.log`), holding an exclusive lock on it for as long as it is
+    open. Counts from retired segments live in `snapshot.json`, together with
+    the names of the segments they came from, so a segment is never counted
+    twice. On load, segments whose lock can be taken belong to workers that
+    have exited and are folded into the snapshot and deleted; segments of
+    running workers are only replayed into this worker's counts. Once
+    `compact_every` votes have been logged a worker starts a new segment and
+    folds the old one in the same way. Snapshot updates are serialised with
+    a lock on `votes.lock`.
+
+    Counts are per worker: they include every vote on disk when the worker
+    loaded, plus the votes it has taken since. Without `fcntl` (Windows)
+    segments can't be locked, so every segment found on load is taken to be
+    left by an exited worker and folded; run a single worker there.
+    """
+
+    def __init__(self, directory, fsync_interval=1.0, compact_every=50_000):
+        self.directory = directory
+        self.snapshot_path = os.path.join(directory, "snapshot.json")
+        self.lock_path = os.path.join(directory, "votes.lock")
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+
+        self.counts = {}  # hoodie_id -> [votes_original, votes_ai]
+        self.segment = None
+        self._fd = None
+        self._pending = []
+        self._flush_scheduled = False
+        self._dirty = False
+        self._since_compact = 0
+        self._task = None
+
+    # --- lifecycle ---
+
+    def load(self):
+        """Rebuild counts from the snapshot and logs, then open a new segment for appending."""
+        if self._fd is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+
+        with self._directory_lock():
+            snapshot = self._read_snapshot()
+            folded = set(snapshot["folded"])
+            counts = snapshot["counts"]
+
+            retired, live = [], []
+            for name in sorted(os.listdir(self.directory)):
+                if not (name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)):
+                    continue
+                if name in folded:
+                    continue
+                fd = os.open(os.path.join(self.directory, name), os.O_RDONLY)
+                if _try_lock(fd):
+                    retired.append((name, fd))
+                else:
+                    os.close(fd)
+                    live.append(name)
+
+            if retired:
+                for name, _ in retired:
+                    for record in read_log(os.path.join(self.directory, name)):
+                        add_vote(counts, record)
+                # Names of deleted segments can go; the new ones stay listed
+                # until they are deleted, in case we crash before that
+                snapshot["folded"] = self._on_disk(folded) + [name for name, _ in retired]
+                self._write_snapshot(snapshot)
+                # Closed before removal, which Windows refuses on open files;
+                # the directory lock keeps other workers out meanwhile
+                for name, fd in retired:
+                    os.close(fd)
+                    os.remove(os.path.join(self.directory, name))
+            # Segments the snapshot already counts, left by a crash mid-fold
+            for name in self._on_disk(folded):
+                os.remove(os.path.join(self.directory, name))
+
+            self.counts = {k: list(v) for k, v in counts.items()}
+            for name in live:
+                for record in read_log(os.path.join(self.directory, name)):
+                    add_vote(self.counts, record)
+            self._open_segment()
+
+    async def start(self):
+        self.load()
+        if self._task is None:
+            self._task = asyncio.create_task(self._sync_loop())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._pending:
+            self._flush()
+        if self._fd is not None:
+            await asyncio.to_thread(os.fsync, self._fd)
+            # Releases the segment's lock; the next worker to load folds it
+            os.close(self._fd)
+            self._fd = None
+
+    def _open_segment(self):
+        self.segment = f"{SEGMENT_PREFIX}{uuid.uuid4().hex}{SEGMENT_SUFFIX}"
+        path = os.path.join(self.directory, self.segment)
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_EXCL, 0o644)
+        _try_lock(self._fd)
+
+    # --- hot path ---
+
+    async def submit(self, votes):
+        """
+        Record `votes` (a list of (hoodie_id, choice) pairs).
+
+        Returns once the votes are in the log; the caller can acknowledge them.
+        """
+        if self._task is None:
+            await self.start()
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((votes, future))
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush)
+        await future
+
+    def _flush(self):
+        self._flush_scheduled = False
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        now = round(time.time(), 3)
+        records = [
+            {"hoodie_id": hoodie_id, "choice": choice, "ts": now}
+            for votes, _ in batch
+            for hoodie_id, choice in votes
+        ]
+
+        data = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records)
+        try:
+            write_all(self._fd, data.encode("utf-8"))
+        except OSError as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for record in records:
+            add_vote(self.counts, record)
+        self._dirty = True
+        self._since_compact += len(records)
+
+        for _, future in batch:
+            if not future.done():
+                future.set_result(None)
+
+    # --- background durability ---
+
+    async def _sync_loop(self):
+        while True:
+            await asyncio.sleep(self.fsync_interval)
+            try:
+                if self._since_compact >= self.compact_every:
+                    await self._compact()
+                elif self._dirty:
+                    self._dirty = False
+                    await asyncio.to_thread(os.fsync, self._fd)
+            except OSError as e:
+                print(f"Vote log sync failed: {e}")
+
+    async def _compact(self):
+        # Switch segments on the loop thread so every later write lands in
+        # the new one and the old one is complete once it is fsynced
+        old_fd, old_segment = self._fd, self.segment
+        self._open_segment()
+        self._since_compact = 0
+        self._dirty = False
+
+        await asyncio.to_thread(self._fold_segment, old_fd, old_segment)
+
+    def _fold_segment(self, fd, name):
+        """Add a finished segment of ours to the snapshot and delete it."""
+        os.fsync(fd)
+        path = os.path.join(self.directory, name)
+        with self._directory_lock():
+            snapshot = self._read_snapshot()
+            for record in read_log(path):
+                add_vote(snapshot["counts"], record)
+            snapshot["folded"] = self._on_disk(snapshot["folded"]) + [name]
+            self._write_snapshot(snapshot)
+            # Closing drops the segment lock, but loading workers wait for
+            # the directory lock and then find the segment listed as folded
+            os.close(fd)
+            os.remove(path)
+
+    def _read_snapshot(self):
+        if not os.path.exists(self.snapshot_path):
+            return {"counts": {}, "folded": []}
+        with open(self.snapshot_path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+        snapshot.setdefault("folded", [])
+        return snapshot
+
+    def _write_snapshot(self, snapshot):
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+    def _on_disk(self, names):
+        return sorted(name for name in names if os.path.exists(os.path.join(self.directory, name)))
+
+    @contextlib.contextmanager
+    def _directory_lock(self):
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    # --- reads ---
+
+    def totals(self):
+        return [
+            {"hoodie_id": hoodie_id, "votes_original": counts[0], "votes_ai": counts[1]}
+            for hoodie_id, counts in self.counts.items()
+        ]
+
+
+def write_all(fd, data):
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+def add_vote(counts, record):
+    tally = counts.get(record["hoodie_id"])
+    if tally is None:
+        tally = counts[record["hoodie_id"]] = [0, 0]
+    tally[CHOICES.index(record["choice"])] += 1
+
+
+def _try_lock(fd):
+    """
+    Take an exclusive lock on `fd` without waiting; False if another holder
+    has it. Always True without fcntl, where only one worker may run.
+    """
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def read_log(path):
+    """Yield vote records from a log file, skipping a torn final line."""
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("choice") in CHOICES:
+                yield record
@@ -0,0 +1,370 @@
+"""
+Throughput and latency benchmark for the backend API.
+
+Generates synthetic catalogs, then drives the app either in-process through
+its ASGI interface ("asgi") or over HTTP against a local uvicorn worker
+("uvicorn"), with concurrent keep-alive clients. Results are printed and,
+with --output, written as JSON so runs can be compared between versions.
+
+Run from the backend folder:
+
+    python -m benchmarks.load_test --sizes 30 10000 100000 --modes asgi uvicorn
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic_catalog import NOUNS, TAGS, write_catalog
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENDPOINTS = {
+    "list": ("GET", "/hoodies", None),
+    "list_gzip": ("GET", "/hoodies", None),
+    "page": ("GET", "/hoodies?limit=50&fields=original_image_url,ai_image_url&offset={offset}", None),
+    "by_id": ("GET", "/hoodies/{id}", None),
+    "filter_tag": ("GET", "/hoodies?tag={tag}&limit=50", None),
+    "search": ("GET", "/search?q={noun}", None),
+    "pair": ("GET", "/pairs/next?balanced=true", None),
+    "vote": ("POST", "/votes", '{{"hoodie_id":"{id}","choice":"ai"}}'),
+}
+DEFAULT_ENDPOINTS = ["page", "by_id", "filter_tag", "search", "pair", "vote"]
+
+
+def render_request(name, catalog_size, rng):
+    method, path, body = ENDPOINTS[name]
+    values = {
+        "id": rng.randint(1, catalog_size),
+        "offset": rng.randrange(0, max(1, catalog_size - 50)),
+        "tag": TAGS[rng.randrange(len(TAGS))].replace(" ", "+"),
+        "noun": NOUNS[rng.randrange(len(NOUNS))],
+    }
+    headers = {"accept-encoding": "gzip"} if name == "list_gzip" else {}
+    rendered_body = body.format(**values).encode() if body else b""
+    return method, path.format(**values), headers, rendered_body
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarise(name, mode, catalog_size, latencies, errors, elapsed):
+    latencies.sort()
+    ms = [v * 1000 for v in latencies]
+    return {
+        "endpoint": name,
+        "mode": mode,
+        "backend": os.environ.get("CATALOG_BACKEND", "json"),
+        "catalog_size": catalog_size,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(ms) / len(ms), 3) if ms else 0.0,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "max_ms": round(ms[-1], 3) if ms else 0.0,
+    }
+
+
+async def run_clients(send_request, name, catalog_size, total, concurrency, seed):
+    """Fire `total` requests from `concurrency` clients; return (latencies, errors, elapsed)."""
+    latencies = []
+    errors = 0
+    remaining = total
+
+    async def client(client_id):
+        nonlocal remaining, errors
+        rng = random.Random(seed * 1000 + client_id)
+        while remaining > 0:
+            remaining -= 1
+            request = render_request(name, catalog_size, rng)
+            start = time.perf_counter()
+            try:
+                status = await send_request(client_id, *request)
+            except (OSError, asyncio.IncompleteReadError, ValueError):
+                status = 0
+            latencies.append(time.perf_counter() - start)
+            if not 200 <= status < 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+# --- in-process ASGI driver ---
+
+def asgi_sender(app):
+    async def send_request(client_id, method, path, headers, body):
+        path, _, query = path.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [(k.encode(), v.encode()) for k, v in headers.items()]
+            + [(b"host", b"bench"), (b"content-type", b"application/json")],
+            "client": ("127.0.0.1", 10000 + client_id),
+            "server": ("bench", 80),
+        }
+        received = False
+        status = 0
+
+        async def receive():
+            nonlocal received
+            if received:
+                await asyncio.sleep(3600)
+            received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        await app(scope, receive, send)
+        return status
+
+    return send_request
+
+
+async def bench_asgi(workdir, catalog_size, endpoints, total, concurrency, seed):
+    # The app resolves data/ relative to the working directory
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)
+    sys.path.insert(0, BACKEND_DIR)
+    try:
+        for module in [m for m in sys.modules if m == "app" or m.startswith("app.")]:
+            del sys.modules[module]
+        from app.main import app
+
+        results = []
+        async with app.router.lifespan_context(app):
+            send_request = asgi_sender(app)
+            await run_clients(send_request, "by_id", catalog_size, concurrency, concurrency, seed)
+            for name in endpoints:
+                latencies, errors, elapsed = await run_clients(
+                    send_request, name, catalog_size, total, concurrency, seed
+                )
+                results.append(summarise(name, "asgi", catalog_size, latencies, errors, elapsed))
+        return results
+    finally:
+        sys.path.remove(BACKEND_DIR)
+        os.chdir(previous_cwd)
+
+
+# --- uvicorn driver ---
+
+class HTTPConnection:
+    """Minimal HTTP/1.1 keep-alive client; enough for Content-Length responses."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, headers, body):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+        try:
+            lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+            lines += [f"{k}: {v}" for k, v in headers.items()]
+            if body:
+                lines += ["Content-Type: application/json", f"Content-Length: {len(body)}"]
+            self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+
+            status_line = await self.reader.readuntil(b"\r\n")
+            status = int(status_line.split()[1])
+            length = 0
+            close = False
+            while True:
+                line = await self.reader.readuntil(b"\r\n")
+                if line == b"\r\n":
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                name = name.strip().lower()
+                if name == "content-length":
+                    length = int(value)
+                elif name == "connection" and value.strip().lower() == "close":
+                    close = True
+            await self.reader.readexactly(length)
+            if close:
+                await self.close()
+            return status
+        except Exception:
+            # The stream may be mid-response; never reuse it for the next request
+            await self.close()
+            raise
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            with contextlib.suppress(OSError):
+                await self.writer.wait_closed()
+            self.reader = self.writer = None
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_for_port(port, process, timeout=120.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("uvicorn did not start in time")
+
+
+async def bench_uvicorn(workdir, catalog_size, endpoints, total, concurrency, seed):
+    port = free_port()
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--app-dir", BACKEND_DIR,
+            "--host", "127.0.0.1", "--port", str(port),
+            "--log-level", "warning", "--no-access-log",
+        ],
+        cwd=workdir,
+    )
+    connections = [HTTPConnection("127.0.0.1", port) for _ in range(concurrency)]
+    try:
+        await wait_for_port(port, process)
+
+        async def send_request(client_id, method, path, headers, body):
+            return await connections[client_id].request(method, path, headers, body)
+
+        results = []
+        # Warm-up loads the catalog and opens the connections
+        await run_clients(send_request, "by_id", catalog_size, concurrency, concurrency, seed)
+        for name in endpoints:
+            latencies, errors, elapsed = await run_clients(
+                send_request, name, catalog_size, total, concurrency, seed
+            )
+            results.append(summarise(name, "uvicorn", catalog_size, latencies, errors, elapsed))
+        return results
+    finally:
+        for connection in connections:
+            await connection.close()
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+MODES = {"asgi": bench_asgi, "uvicorn": bench_uvicorn}
+BACKENDS = ("json", "sqlite", "snapshot")
+
+
+def prepare_backend(workdir, backend):
+    """Build the storage `backend` reads from the synthetic hoodies.json."""
+    json_path = os.path.join(workdir, "data", "hoodies.json")
+    if backend == "sqlite":
+        from app.sqlite_store import import_json
+        import_json(os.path.join(workdir, "data", "hoodies.db"), json_path)
+    elif backend == "snapshot":
+        from app.catalog_snapshot import compile_file
+        compile_file(json_path, os.path.join(workdir, "data", "hoodies.bin"))
+    # Read by the app at import time, and inherited by the uvicorn worker
+    os.environ["CATALOG_BACKEND"] = backend
+
+
+async def run(args):
+    results = []
+    for size in args.sizes:
+        workdir = tempfile.mkdtemp(prefix=f"hoodie-bench-{size}-")
+        try:
+            write_catalog(workdir, size, seed=args.seed)
+            prepare_backend(workdir, args.backend)
+            for mode in args.modes:
+                print(f"Benchmarking {mode} ({args.backend} catalog) with {size} hoodies...")
+                mode_results = await MODES[mode](
+                    workdir, size, args.endpoints, args.requests, args.concurrency, args.seed
+                )
+                for r in mode_results:
+                    print(
+                        f"  {r['endpoint']:<12} {r['rps']:>9.1f} req/s  "
+                        f"p50 {r['p50_ms']:.2f} ms  p95 {r['p95_ms']:.2f} ms  "
+                        f"p99 {r['p99_ms']:.2f} ms  errors {r['errors']}"
+                    )
+                results.extend(mode_results)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the hoodie backend API")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[30, 10_000])
+    parser.add_argument("--modes", nargs="+", choices=sorted(MODES), default=["asgi"])
+    parser.add_argument("--backend", choices=BACKENDS, default="json", help="catalog storage to serve from")
+    parser.add_argument("--endpoints", nargs="+", choices=sorted(ENDPOINTS), default=DEFAULT_ENDPOINTS)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    if args.output:
+        report = {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "git_revision": git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "requests_per_endpoint": args.requests,
+                "concurrency": args.concurrency,
+                "seed": args.seed,
+                "backend": args.backend,
+            },
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import json
+import os
+import random
+
+SOURCES = {
+    "redbubble": "https://www.redbubble.com/i/hoodie/{slug}/{n}.BN4XF",
+    "society6": "https://society6.com/products/{slug}-hoodie-{n}",
+    "threadless": "https://www.threadless.com/shop/@artist/design/{slug}/mens/pullover-hoody",
+}
+HF_BASE_URL = "https://huggingface.co/datasets/AndyXIP/generated-hoodies/resolve/main"
+
+TAGS = [
+    "black", "white", "red", "blue", "purple", "pastel pink", "neon green", "vibrant",
+    "monochrome", "graphic design", "illustration", "vector art", "hand-drawn", "bold colors",
+    "geometric shapes", "abstract", "minimalistic", "line art", "cartoon", "anime style",
+    "pop art", "street art", "retro", "vintage", "psychedelic", "surreal", "fantasy", "sci-fi",
+    "floral", "nature", "animals", "mascot", "silhouette", "watercolor", "halftone",
+    "pixel art", "music", "sports", "gaming", "space", "horror", "pop culture",
+]
+NOUNS = [
+    "cat", "bunny", "shark", "astronaut", "skull", "mushroom", "wave", "sun", "moon", "tiger",
+    "dragon", "robot", "flower", "mountain", "forest", "ghost", "frog", "planet", "wolf", "bee",
+]
+ADJECTIVES = [
+    "cosmic", "sleepy", "retro", "neon", "tiny", "wild", "dreamy", "angry", "golden", "lonely",
+    "psychedelic", "vintage", "happy", "haunted", "electric", "minimal", "pastel", "giant",
+]
+STYLES = ["Pullover Hoodie", "Zipped Hoodie", "Lightweight Hoodie", "Pullover Sweatshirt"]
+
+
+def generate_catalog(size, seed=0):
+    """Generate `size` hoodies in the backend's hoodies.json schema."""
+    rng = random.Random(seed)
+    items = []
+    for i in range(1, size + 1):
+        noun = rng.choice(NOUNS)
+        adjective = rng.choice(ADJECTIVES)
+        source = rng.choice(list(SOURCES))
+        tags = rng.sample(TAGS, 7)
+        caption = f"{adjective} {noun} with {rng.choice(NOUNS)}s in {tags[0]} colours"
+        slug = f"{adjective}-{noun}-{i}"
+        items.append({
+            "id": str(i),
+            "name": f"{adjective.title()} {noun.title()} {rng.choice(STYLES)}",
+            "artist": f"artist{rng.randrange(size // 10 + 1)}",
+            "source": source,
+            "price": f"£{rng.uniform(25, 60):.2f}",
+            "product_url": SOURCES[source].format(slug=slug, n=100000 + i),
+            "original_image_url": f"{HF_BASE_URL}/original/{i}.jpg",
+            "ai_image_url": f"{HF_BASE_URL}/generated/{i}.png",
+            "caption": caption,
+            "tags": tags,
+            "description": f"A hoodie design of {caption}. Style: {', '.join(tags[:3])}",
+        })
+    return items
+
+
+def write_catalog(directory, size, seed=0):
+    """Write a synthetic catalog to `directory`/data/hoodies.json and return its path."""
+    data_dir = os.path.join(directory, "data")
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, "hoodies.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(generate_catalog(size, seed), f, ensure_ascii=False)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic hoodies.json")
+    parser.add_argument("size", type=int, help="number of hoodies")
+    parser.add_argument("directory", help="directory to create data/hoodies.json in")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    path = write_catalog(args.directory, args.size, args.seed)
+    print(f"Saved {args.size} hoodies to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.catalog import CatalogCache
+from app.leaderboard import Leaderboard
+from app.main import app
+from app.votes import VoteStore
+
+
+def make_items(n, **extra):
+    return [
+        {
+            "id": str(i),
+            "name": f"Hoodie {i}",
+            "artist": f"Artist {i % 3}",
+            "price": f"£{20 + i}.00",
+            "source": "redbubble" if i % 2 else "threadless",
+            "tags": ["animals"] if i % 3 == 0 else ["abstract"],
+            "caption": f"design number {i}",
+            "original_image_url": f"https://example.com/original/{i}.jpg",
+            "ai_image_url": f"https://example.com/generated/{i}.png",
+            **extra,
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def write_catalog(path, items):
+    path.write_text(json.dumps(items), encoding="utf-8")
+
+
+@pytest.fixture
+def catalog_path(tmp_path):
+    path = tmp_path / "hoodies.json"
+    write_catalog(path, make_items(30))
+    return path
+
+
+@pytest.fixture
+def client(tmp_path, catalog_path, monkeypatch):
+    """A client whose routes read the temporary catalog and vote directory."""
+    monkeypatch.setattr(routes, "catalog_cache", CatalogCache(str(catalog_path), check_interval=0))
+    monkeypatch.setattr(routes, "vote_store", VoteStore(str(tmp_path / "votes")))
+    monkeypatch.setattr(routes, "leaderboard", Leaderboard())
+    return TestClient(app)
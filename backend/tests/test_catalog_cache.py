@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+
+import pytest
+
+from app.api import routes
+from app.catalog import CatalogCache
+from tests.conftest import make_items, write_catalog
+
+
+def touch_later(path, items):
+    # Make sure the file id changes even on coarse-mtime filesystems
+    write_catalog(path, items)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+def test_first_get_loads_synchronously(catalog_path):
+    cache = CatalogCache(str(catalog_path))
+    assert not cache.ready
+    assert len(cache.get()) == 30
+    assert cache.ready
+
+
+def test_missing_file_raises_until_loaded(tmp_path):
+    cache = CatalogCache(str(tmp_path / "missing.json"))
+    with pytest.raises(FileNotFoundError):
+        cache.get()
+
+
+def test_changed_file_reloads_in_background(catalog_path):
+    cache = CatalogCache(str(catalog_path), check_interval=0)
+    old = cache.get()
+    touch_later(catalog_path, make_items(40))
+
+    # The old catalog keeps serving while the new one is built
+    assert cache.get() is old
+    wait_for(lambda: len(cache.get()) == 40)
+    assert cache.get() is not old
+
+
+def test_unchanged_file_is_not_reparsed(catalog_path):
+    cache = CatalogCache(str(catalog_path), check_interval=0)
+    first = cache.get()
+    assert cache.get() is first
+
+
+def test_half_written_file_keeps_last_good_catalog(catalog_path):
+    cache = CatalogCache(str(catalog_path), check_interval=0)
+    old = cache.get()
+    catalog_path.write_text('[{"id": "1"', encoding="utf-8")
+    st = os.stat(catalog_path)
+    os.utime(catalog_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    cache.get()
+    wait_for(lambda: not cache._reloading)
+    assert cache.get() is old
+
+
+def test_reload_forces_reparse(catalog_path):
+    cache = CatalogCache(str(catalog_path))
+    old = cache.get()
+    assert cache.reload() is not old
+
+
+def test_forced_reload_of_corrupt_file_raises(catalog_path):
+    cache = CatalogCache(str(catalog_path))
+    old = cache.get()
+    catalog_path.write_text('[{"id": "1"', encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        cache.reload()
+    assert cache.get() is old
+
+
+def test_only_one_background_reload_starts(catalog_path, monkeypatch):
+    cache = CatalogCache(str(catalog_path))
+    stale = cache.get()
+    started = []
+    monkeypatch.setattr(cache, "_background_load", lambda stale: started.append(stale))
+
+    threads = [threading.Thread(target=cache._reload_in_background, args=(stale,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wait_for(lambda: started)
+    time.sleep(0.05)
+    assert started == [stale]
+
+
+def test_admin_reload_is_disabled_without_token(client, monkeypatch):
+    monkeypatch.setattr(routes, "ADMIN_TOKEN", None)
+    assert client.post("/admin/reload").status_code == 404
+    assert client.post("/admin/reload", headers={"X-Admin-Token": ""}).status_code == 404
+
+
+def test_admin_reload_checks_token(client, catalog_path, monkeypatch):
+    monkeypatch.setattr(routes, "ADMIN_TOKEN", "secret")
+    assert client.post("/admin/reload").status_code == 403
+    assert client.post("/admin/reload", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+    write_catalog(catalog_path, make_items(12))
+    response = client.post("/admin/reload", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert response.json()["count"] == 12
+    assert len(client.get("/hoodies").json()) == 12
+
+    catalog_path.write_text('[{"id": "1"', encoding="utf-8")
+    response = client.post("/admin/reload", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 409
+    assert len(client.get("/hoodies").json()) == 12
+
+
+def test_missing_catalog_is_404(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(routes, "catalog_cache", CatalogCache(str(tmp_path / "missing.json")))
+    assert client.get("/hoodies").status_code == 404
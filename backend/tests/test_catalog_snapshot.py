@@ -0,0 +1,77 @@
+import json
+import os
+import struct
+
+import pytest
+
+from app.catalog import Catalog
+from app.catalog_snapshot import MAGIC, SnapshotCatalog, SnapshotCatalogCache, compile_snapshot
+from tests.conftest import make_items
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    path = tmp_path / "hoodies.bin"
+    compile_snapshot(make_items(20), str(path))
+    return path
+
+
+def bump_mtime(path):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_snapshot_matches_catalog(snapshot_path):
+    catalog, snapshot = Catalog(make_items(20)), SnapshotCatalog(str(snapshot_path))
+    assert len(snapshot) == 20
+    assert snapshot.etag == catalog.etag
+    assert snapshot.full_body() == catalog.full_body()
+    fields = ["id", "original_image_url", "ai_image_url"]
+    for projection in (None, fields, ["name"]):
+        assert snapshot.page(3, 9, projection) == catalog.page(3, 9, projection)
+        assert snapshot.select([5, 1], projection) == catalog.select([5, 1], projection)
+    assert snapshot.compressed_body(None, "gzip") == catalog.compressed_body(None, "gzip")
+    assert list(snapshot.index.query(tags=["animals"])) == catalog.index.query(tags=["animals"])
+    assert snapshot.index.position("7") == 6
+    assert snapshot.search.search("design number 4", 3)[0][0] == catalog.search.search("design number 4", 3)[0][0]
+
+
+@pytest.mark.parametrize("damage", ["truncated", "bad_length", "not_json", "missing_key"])
+def test_corrupt_snapshot_raises_value_error(snapshot_path, damage):
+    data = snapshot_path.read_bytes()
+    if damage == "truncated":
+        data = data[:len(MAGIC) + 3]
+    elif damage == "bad_length":
+        data = MAGIC + struct.pack("<Q", 1 << 40) + data[len(MAGIC) + 8:]
+    elif damage == "not_json":
+        data = data[:len(MAGIC) + 8] + b"\xff" * 16 + data[len(MAGIC) + 24:]
+    else:
+        header = json.dumps({"count": 1}).encode()
+        data = MAGIC + struct.pack("<Q", len(header)) + header
+    snapshot_path.write_bytes(data)
+
+    with pytest.raises(ValueError):
+        SnapshotCatalog(str(snapshot_path))
+
+
+def test_cache_keeps_last_good_snapshot(snapshot_path):
+    cache = SnapshotCatalogCache(str(snapshot_path), check_interval=0)
+    good = cache.get()
+    snapshot_path.write_bytes(MAGIC + b"\x01\x02")
+    bump_mtime(snapshot_path)
+
+    with pytest.raises(ValueError):
+        cache.reload()
+    assert cache._load(stale=good) is good
+    assert cache.get() is good
+
+
+def test_snapshot_caches_other_projections(snapshot_path):
+    snapshot = SnapshotCatalog(str(snapshot_path))
+    assert snapshot.full_body_ready(None, "gzip")
+    assert not snapshot.full_body_ready(["name"], "gzip")
+    body, etag = snapshot.full_body(["name"])
+    zipped = snapshot.compressed_body(["name"], "gzip")
+    assert snapshot.full_body_ready(["name"], "gzip")
+    assert snapshot.full_body(["name"]) == (body, etag)
+    assert snapshot.compressed_body(["name"], "gzip") is zipped
@@ -0,0 +1,97 @@
+import gzip
+
+from app.http_cache import SUPPORTED_ENCODINGS, encoded_etag, etag_matches, negotiate_encoding
+
+
+def test_etag_matches():
+    assert etag_matches('"a"', '"a"')
+    assert etag_matches('W/"a"', '"a"')
+    assert etag_matches('"b", "a"', '"a"')
+    assert etag_matches("*", '"a"')
+    assert not etag_matches('"b"', '"a"')
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("gzip") == "gzip"
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("*") == SUPPORTED_ENCODINGS[0]
+
+
+def test_full_catalog_etag_and_304(client):
+    response = client.get("/hoodies", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.headers["vary"] == "Accept-Encoding"
+
+    again = client.get("/hoodies", headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+
+
+def test_each_encoding_has_its_own_etag(client):
+    plain = client.get("/hoodies", headers={"Accept-Encoding": "identity"})
+    zipped = client.get("/hoodies", headers={"Accept-Encoding": "gzip"})
+    assert zipped.headers["content-encoding"] == "gzip"
+    assert zipped.headers["etag"] == encoded_etag(plain.headers["etag"], "gzip")
+    assert zipped.json() == plain.json()
+
+    # The identity ETag must not validate the gzip representation, and vice versa
+    response = client.get(
+        "/hoodies", headers={"Accept-Encoding": "gzip", "If-None-Match": plain.headers["etag"]}
+    )
+    assert response.status_code == 200
+    response = client.get(
+        "/hoodies", headers={"Accept-Encoding": "gzip", "If-None-Match": zipped.headers["etag"]}
+    )
+    assert response.status_code == 304
+    response = client.get(
+        "/hoodies", headers={"Accept-Encoding": "identity", "If-None-Match": zipped.headers["etag"]}
+    )
+    assert response.status_code == 200
+
+
+def test_preset_bodies_are_compressed_at_load(catalog_path):
+    from app.catalog import Catalog
+
+    catalog = Catalog.from_file(str(catalog_path))
+    for encoding in SUPPORTED_ENCODINGS:
+        assert (None, encoding) in catalog._compressed
+    assert gzip.decompress(catalog.compressed_body(None, "gzip")) == catalog.body
+
+
+def test_new_projection_is_built_off_the_event_loop(client, monkeypatch):
+    from app.api import routes
+
+    calls = []
+    real = routes.run_in_threadpool
+
+    async def recording(func, *args):
+        calls.append(func.__name__)
+        return await real(func, *args)
+
+    monkeypatch.setattr(routes, "run_in_threadpool", recording)
+    headers = {"Accept-Encoding": "gzip"}
+    first = client.get("/hoodies", params={"fields": "name,price"}, headers=headers)
+    assert "list_body" in calls
+    assert first.headers["content-encoding"] == "gzip"
+
+    calls.clear()
+    again = client.get("/hoodies", params={"fields": "price,name"}, headers=headers)
+    assert calls == []
+    assert again.content == first.content
+    assert again.headers["etag"] == first.headers["etag"]
+
+
+def test_full_body_ready(catalog_path):
+    from app.catalog import Catalog
+
+    catalog = Catalog.from_file(str(catalog_path))
+    assert catalog.full_body_ready(None, "gzip")
+    assert not catalog.full_body_ready(["name"])
+    catalog.full_body(["name"])
+    assert catalog.full_body_ready(["name"])
+    assert not catalog.full_body_ready(["name"], "gzip")
+    catalog.compressed_body(["name"], "gzip")
+    assert catalog.full_body_ready(["name"], "gzip")
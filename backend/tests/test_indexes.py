@@ -0,0 +1,86 @@
+import random
+
+from app.indexes import CatalogIndex, item_source, parse_price
+from tests.conftest import make_items
+
+
+def test_parse_price():
+    assert parse_price("£43.91") == 43.91
+    assert parse_price("£1,299.00") == 1299.0
+    assert parse_price("GBP 41") == 41.0
+    assert parse_price("41.50") == 41.5
+    # Other currencies can't be compared with GBP filters
+    assert parse_price("$45.00") is None
+    assert parse_price("USD 54.00") is None
+    assert parse_price("€30") is None
+    assert parse_price(12) == 12.0
+    assert parse_price("") is None
+    assert parse_price(None) is None
+
+
+def test_item_source_falls_back_to_product_host():
+    assert item_source({"source": "Redbubble"}) == "redbubble"
+    assert item_source({"product_url": "https://www.threadless.com/shop/x"}) == "threadless"
+    assert item_source({}) is None
+
+
+def test_query_matches_linear_scan():
+    rng = random.Random(3)
+    items = [
+        {
+            "id": str(i),
+            "tags": rng.sample(["Cats", "dogs", "space", "retro"], rng.randrange(3)),
+            "source": rng.choice(["redbubble", "threadless", "society6"]),
+            "price": rng.choice([f"£{rng.randrange(10, 60)}.00", ""]),
+        }
+        for i in range(300)
+    ]
+    index = CatalogIndex(items)
+
+    def scan(tags=(), source=None, min_price=None, max_price=None):
+        matches = []
+        for pos, item in enumerate(items):
+            item_tags = {t.lower() for t in item["tags"]}
+            price = parse_price(item["price"])
+            if any(tag.lower() not in item_tags for tag in tags):
+                continue
+            if source and item["source"] != source.lower():
+                continue
+            if (min_price is not None or max_price is not None) and price is None:
+                continue
+            if min_price is not None and price < min_price:
+                continue
+            if max_price is not None and price > max_price:
+                continue
+            matches.append(pos)
+        return matches
+
+    for _ in range(200):
+        filters = {
+            "tags": rng.sample(["cats", "DOGS", "space", "retro", "missing"], rng.randrange(3)),
+            "source": rng.choice([None, "redbubble", "Threadless"]),
+            "min_price": rng.choice([None, 20.0, 35.0]),
+            "max_price": rng.choice([None, 30.0, 50.0]),
+        }
+        expected = scan(**filters)
+        result = index.query(**filters)
+        if not filters["tags"] and not filters["source"] and filters["min_price"] is None and filters["max_price"] is None:
+            assert result is None
+        else:
+            assert result == expected
+
+
+def test_filtered_list_and_lookup(client):
+    body = client.get("/hoodies", params={"source": "redbubble", "max_price": 26}).json()
+    assert [item["id"] for item in body] == ["1", "3", "5"]
+
+    assert client.get("/hoodies/7").json()["id"] == "7"
+    assert client.get("/hoodies/7", params={"fields": "name"}).json() == {"id": "7", "name": "Hoodie 7"}
+    assert client.get("/hoodies/999").status_code == 404
+
+
+def test_index_positions_follow_catalog_order():
+    index = CatalogIndex(make_items(9))
+    assert index.position("4") == 3
+    assert index.by_tag["animals"] == [2, 5, 8]
+    assert index.price_range(22, 24) == [1, 2, 3]
@@ -0,0 +1,67 @@
+import random
+
+import numpy as np
+
+from app.leaderboard import BASE_RATING, Leaderboard
+
+
+def ratings(board):
+    return {
+        (entry["hoodie_id"], entry["choice"]): entry["rating"]
+        for entry in board._take_snapshot().sorted().top(10_000)[0]
+    }
+
+
+def test_rebuild_equals_incremental():
+    rng = random.Random(7)
+    votes = [(str(rng.randrange(40)), rng.choice(("original", "ai"))) for _ in range(2000)]
+    # Uneven records like 20 ai / 5 original are where the models used to disagree
+    votes += [("lopsided", "ai")] * 20 + [("lopsided", "original")] * 5
+
+    incremental = Leaderboard()
+    incremental.rebuild({})
+    counts = {}
+    for hoodie_id, choice in votes:
+        incremental.record(hoodie_id, choice)
+        tally = counts.setdefault(hoodie_id, [0, 0])
+        tally[0 if choice == "original" else 1] += 1
+
+    rebuilt = Leaderboard()
+    rebuilt.rebuild(counts)
+
+    assert ratings(incremental) == ratings(rebuilt)
+    n = len(rebuilt.ids)
+    row = incremental.rows["lopsided"]
+    np.testing.assert_allclose(incremental.ratings[row], rebuilt.ratings[rebuilt.rows["lopsided"]])
+    assert np.allclose(rebuilt.ratings[:n].mean(axis=1), BASE_RATING)
+
+
+def test_ratings_follow_win_counts():
+    board = Leaderboard()
+    board.rebuild({"1": [0, 0], "2": [5, 20], "3": [20, 5]})
+    original, ai = board.ratings[board.rows["1"]]
+    assert original == ai == BASE_RATING
+    original, ai = board.ratings[board.rows["2"]]
+    assert ai > BASE_RATING > original
+    assert round(ai - original, 1) == round(400 * np.log10(21 / 6), 1)
+
+
+def test_top_ranks_and_filters():
+    board = Leaderboard()
+    board.rebuild({"1": [3, 0], "2": [0, 6]})
+    board._snapshot = board._take_snapshot().sorted()
+
+    items, total = board.top(2)
+    assert total == 4
+    assert [(e["hoodie_id"], e["choice"]) for e in items] == [("2", "ai"), ("1", "original")]
+    assert items[0]["wins"] == 6 and items[0]["losses"] == 0
+
+    items, total = board.top(5, choice="original")
+    assert total == 2 and [e["hoodie_id"] for e in items] == ["1", "2"]
+
+
+def test_leaderboard_endpoint(client):
+    assert client.post("/votes", json={"votes": [{"hoodie_id": "1", "choice": "ai"}] * 3}).status_code == 200
+    body = client.get("/leaderboard?k=1").json()
+    assert body["items"][0]["hoodie_id"] == "1"
+    assert body["items"][0]["choice"] == "ai"
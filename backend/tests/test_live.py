@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+from app.live import ALL_CHANNEL, TallyBroadcaster, stream_tallies
+
+
+class FakeVotes:
+    def __init__(self):
+        self.counts = {}
+
+    def vote(self, hoodie_id, choice):
+        tally = self.counts.setdefault(hoodie_id, [0, 0])
+        tally[choice == "ai"] += 1
+
+
+def tallies_in(event):
+    assert event.startswith("event: tally\n")
+    data = json.loads(event.split("data: ", 1)[1])
+    return {row["hoodie_id"]: [row["votes_original"], row["votes_ai"]] for row in data}
+
+
+def test_slow_subscriber_gets_merged_latest_tallies():
+    async def run():
+        votes = FakeVotes()
+        broadcaster = TallyBroadcaster(votes, interval=0.01)
+        stream = stream_tallies(broadcaster, ALL_CHANNEL)
+        assert await stream.__anext__() == "retry: 2000\n\n"
+
+        seen, events = {}, 0
+        for burst in range(20):
+            for n in range(10):
+                hoodie_id = str((burst * 3 + n) % 25)
+                votes.vote(hoodie_id, "ai" if n % 2 else "original")
+                broadcaster.publish([hoodie_id])
+            await asyncio.sleep(0.015)
+            # Reads less often than the broadcaster flushes
+            if burst % 4 == 3:
+                seen.update(tallies_in(await stream.__anext__()))
+                events += 1
+
+        while seen != votes.counts:
+            seen.update(tallies_in(await asyncio.wait_for(stream.__anext__(), 1.0)))
+            events += 1
+        await stream.aclose()
+        return events
+
+    events = asyncio.run(run())
+    # 200 votes, far fewer events, and the final tally of every hoodie arrived
+    assert events < 20
+
+
+def test_hoodie_channel_only_gets_its_hoodie():
+    async def run():
+        votes = FakeVotes()
+        broadcaster = TallyBroadcaster(votes, interval=0.0)
+        stream = stream_tallies(broadcaster, "7", initial={"7": [0, 0]})
+        await stream.__anext__()
+        assert tallies_in(await stream.__anext__()) == {"7": [0, 0]}
+
+        votes.vote("3", "ai")
+        votes.vote("7", "original")
+        broadcaster.publish(["3", "7"])
+        assert tallies_in(await asyncio.wait_for(stream.__anext__(), 1.0)) == {"7": [1, 0]}
+        await stream.aclose()
+
+    asyncio.run(run())
+
+
+def test_disconnect_and_close_remove_subscribers():
+    async def run():
+        broadcaster = TallyBroadcaster(FakeVotes(), interval=0.0)
+        gone = stream_tallies(broadcaster, "1")
+        stays = stream_tallies(broadcaster, ALL_CHANNEL)
+        await gone.__anext__()
+        await stays.__anext__()
+        assert set(broadcaster.channels) == {"1", ALL_CHANNEL}
+
+        # A client going away closes its generator
+        await gone.aclose()
+        assert set(broadcaster.channels) == {ALL_CHANNEL}
+
+        # Shutdown ends the remaining stream, which unsubscribes itself
+        reader = asyncio.ensure_future(stays.__anext__())
+        await asyncio.sleep(0)
+        broadcaster.close()
+        try:
+            await asyncio.wait_for(reader, 1.0)
+        except StopAsyncIteration:
+            pass
+        assert broadcaster.channels == {}
+
+        # Nobody listening: publishing schedules nothing
+        broadcaster.publish(["1"])
+        assert broadcaster._handle is None
+
+    asyncio.run(run())
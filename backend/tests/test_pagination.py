@@ -0,0 +1,51 @@
+from tests.conftest import make_items
+
+
+def walk(client, **params):
+    """Follow next_cursor from the first page and return every page body."""
+    pages = [client.get("/hoodies", params=params).json()]
+    while pages[-1]["next_cursor"] is not None:
+        pages.append(client.get("/hoodies", params={**params, "cursor": pages[-1]["next_cursor"]}).json())
+    return pages
+
+
+def test_unpaginated_response_is_a_plain_array(client):
+    body = client.get("/hoodies").json()
+    assert isinstance(body, list)
+    assert [item["id"] for item in body] == [item["id"] for item in make_items(30)]
+
+
+def test_cursor_walk_covers_catalog_once(client):
+    pages = walk(client, limit=7)
+    assert [len(page["items"]) for page in pages] == [7, 7, 7, 7, 2]
+    assert all(page["total"] == 30 for page in pages)
+    ids = [item["id"] for page in pages for item in page["items"]]
+    assert ids == [str(i) for i in range(1, 31)]
+
+
+def test_offset_and_exact_last_page(client):
+    body = client.get("/hoodies", params={"offset": 25, "limit": 5}).json()
+    assert [item["id"] for item in body["items"]] == ["26", "27", "28", "29", "30"]
+    assert body["next_cursor"] is None
+
+    past_end = client.get("/hoodies", params={"offset": 40, "limit": 5}).json()
+    assert past_end["items"] == []
+    assert past_end["next_cursor"] is None
+
+
+def test_cursor_walk_with_filter(client):
+    pages = walk(client, limit=4, tag="animals")
+    ids = [item["id"] for page in pages for item in page["items"]]
+    assert ids == [str(i) for i in range(3, 31, 3)]
+    assert pages[0]["total"] == 10
+
+
+def test_field_projection(client):
+    body = client.get("/hoodies", params={"limit": 2, "fields": "id,name"}).json()
+    assert body["items"] == [{"id": "1", "name": "Hoodie 1"}, {"id": "2", "name": "Hoodie 2"}]
+
+
+def test_bad_cursor_and_unknown_field(client):
+    assert client.get("/hoodies", params={"cursor": "!!not-base64"}).status_code == 400
+    assert client.get("/hoodies", params={"cursor": "LTE"}).status_code == 400  # "-1"
+    assert client.get("/hoodies", params={"limit": 2, "fields": "id,nope"}).status_code == 400
@@ -0,0 +1,42 @@
+import json
+import random
+from collections import Counter
+
+from app.pairs import PairSampler
+from tests.conftest import make_items
+
+
+def test_skips_items_without_both_images():
+    items = make_items(3)
+    items[1]["ai_image_url"] = ""
+    sampler = PairSampler(items)
+    assert sampler.ids == ["1", "3"]
+
+
+def test_sample_has_both_sides_in_either_order():
+    random.seed(5)
+    sampler = PairSampler(make_items(5))
+    seen = Counter()
+    for _ in range(500):
+        pair = json.loads(sampler.sample())
+        assert {pair["left"]["choice"], pair["right"]["choice"]} == {"original", "ai"}
+        assert pair["left"]["image_url"] != pair["right"]["image_url"]
+        seen[pair["id"], pair["left"]["choice"]] += 1
+    # Every hoodie turns up with each arrangement
+    assert len(seen) == 10
+
+
+def test_balanced_sampling_prefers_under_voted():
+    random.seed(11)
+    sampler = PairSampler(make_items(10))
+    counts = {str(i): [50, 50] for i in range(2, 11)}
+    draws = Counter(json.loads(sampler.sample(counts))["id"] for _ in range(2000))
+    # Uniform would give ~10%; the power of two choices gives ~19%
+    assert draws["1"] > 300
+
+
+def test_next_pair_endpoint(client):
+    response = client.get("/pairs/next", params={"balanced": True})
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-store"
+    assert response.json()["id"] in {str(i) for i in range(1, 31)}
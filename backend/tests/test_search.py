@@ -0,0 +1,87 @@
+import math
+import random
+
+import pytest
+
+from app.search import B, K1, SearchIndex, item_tokens, tokenize
+
+WORDS = ["cat", "dog", "space", "retro", "neon", "wave", "forest", "skull", "moon", "pizza"]
+
+
+def random_items(n, seed=1):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": str(i),
+            "name": " ".join(rng.choices(WORDS, k=rng.randrange(1, 4))),
+            "artist": rng.choice(["Ann", "Bo"]),
+            "tags": rng.sample(WORDS, rng.randrange(3)),
+            "description": "A hoodie design of " + " ".join(rng.choices(WORDS, k=rng.randrange(6))),
+        }
+        for i in range(n)
+    ]
+
+
+def brute_force(items, query):
+    docs = [item_tokens(item) for item in items]
+    avg_len = sum(map(len, docs)) / len(docs)
+    scores = {}
+    for token in set(tokenize(query)):
+        df = sum(token in doc for doc in docs)
+        if not df:
+            continue
+        idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+        for pos, doc in enumerate(docs):
+            tf = doc.count(token)
+            if tf:
+                norm = K1 * (1 - B + B * len(doc) / avg_len)
+                scores[pos] = scores.get(pos, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+    return scores
+
+
+def test_tokenize_drops_stopwords():
+    assert tokenize("The Cat-in-a Hoodie, 2024!") == ["cat", "2024"]
+
+
+@pytest.mark.parametrize("query", ["cat", "space moon", "neon wave skull", "ann pizza", "nothing here"])
+def test_scores_match_bm25(query):
+    items = random_items(200)
+    index = SearchIndex.build(items)
+    expected = brute_force(items, query)
+
+    positions, scores, hits = index.search(query, k=10)
+    assert hits == len(expected)
+    for pos, score in zip(positions, scores):
+        assert score == pytest.approx(expected[pos], rel=1e-5)
+    ranked = sorted(expected.values(), reverse=True)[:10]
+    assert scores == pytest.approx(ranked, rel=1e-5)
+
+
+def test_save_load_round_trip_and_stale_cleanup(tmp_path):
+    items = random_items(50)
+    old = tmp_path / "search-old.npz"
+    SearchIndex.build(items[:10]).save(str(old))
+
+    path = tmp_path / "search-new.npz"
+    built = SearchIndex.load_or_build(items, str(path))
+    assert path.exists()
+    assert not old.exists()
+
+    loaded = SearchIndex.load_or_build([], str(path))
+    assert loaded.search("space moon") == built.search("space moon")
+
+
+def test_unreadable_index_is_rebuilt(tmp_path):
+    path = tmp_path / "search-x.npz"
+    path.write_bytes(b"not an npz")
+    index = SearchIndex.load_or_build(random_items(20), str(path))
+    assert index.size == 20
+    assert SearchIndex.load(str(path)).size == 20
+
+
+def test_search_endpoint(client):
+    body = client.get("/search", params={"q": "animals", "k": 3, "fields": "id,tags"}).json()
+    assert body["total"] == 10
+    assert len(body["items"]) == len(body["scores"]) == 3
+    assert all(item["tags"] == ["animals"] for item in body["items"])
+    assert client.get("/search", params={"q": ""}).status_code == 422
@@ -0,0 +1,88 @@
+import json
+
+import numpy as np
+import pytest
+
+from app import similarity
+from app.api import routes
+from app.similarity import EmbeddingIndex, IVFIndex, exact_search
+
+
+def normalised(rng, n, dim=32, centers=None):
+    if centers is None:
+        vectors = rng.standard_normal((n, dim))
+    else:
+        vectors = centers[rng.integers(len(centers), size=n)] + 0.1 * rng.standard_normal((n, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float16)
+
+
+def test_exact_search_across_blocks(monkeypatch):
+    monkeypatch.setattr(similarity, "BLOCK_ROWS", 64)
+    rng = np.random.default_rng(0)
+    matrix = normalised(rng, 1000)
+    query = matrix[17].astype(np.float32)
+
+    rows, scores = exact_search(matrix, query, 10)
+    expected = np.argsort(-(matrix.astype(np.float32) @ query), kind="stable")[:10]
+    assert rows == expected.tolist()
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_ivf_buckets_every_row_and_finds_neighbours():
+    rng = np.random.default_rng(1)
+    centers = rng.standard_normal((20, 32))
+    matrix = normalised(rng, 4000, centers=centers)
+    ivf = IVFIndex.build(matrix)
+    assert sorted(ivf.order.tolist()) == list(range(len(matrix)))
+    assert ivf.offsets[-1] == len(matrix)
+
+    recall = []
+    for row in rng.choice(len(matrix), size=50, replace=False):
+        query = matrix[row].astype(np.float32)
+        approx, _ = ivf.search(matrix, query, 10)
+        exact, _ = exact_search(matrix, query, 10)
+        recall.append(len(set(approx) & set(exact)) / 10)
+    assert np.mean(recall) >= 0.9
+
+
+def test_similar_excludes_the_query(monkeypatch):
+    monkeypatch.setattr(similarity, "APPROX_MIN_ITEMS", 100)
+    rng = np.random.default_rng(2)
+    matrix = normalised(rng, 400)
+    index = EmbeddingIndex(matrix, [str(i) for i in range(400)])
+    assert index.ivf is not None
+
+    for exact in (False, True):
+        neighbours = index.similar("5", k=5, exact=exact)
+        assert len(neighbours) == 5
+        assert "5" not in [hoodie_id for hoodie_id, _ in neighbours]
+    assert index.similar("missing") is None
+
+
+def test_open(tmp_path):
+    assert EmbeddingIndex.open(str(tmp_path)) is None
+
+    np.save(tmp_path / similarity.EMBEDDINGS_FILE, np.eye(3, dtype=np.float16))
+    (tmp_path / similarity.EMBEDDING_IDS_FILE).write_text(json.dumps([1, 2, 3]))
+    index = EmbeddingIndex.open(str(tmp_path))
+    assert index.ids == ["1", "2", "3"]
+
+    (tmp_path / similarity.EMBEDDING_IDS_FILE).write_text(json.dumps([1, 2]))
+    with pytest.raises(ValueError):
+        EmbeddingIndex.open(str(tmp_path))
+
+
+def test_similar_endpoint(client, catalog_path):
+    assert client.get("/hoodies/1/similar").status_code == 404
+
+    rng = np.random.default_rng(3)
+    np.save(catalog_path.parent / similarity.EMBEDDINGS_FILE, normalised(rng, 29))
+    # Hoodie 30 has no embedding
+    (catalog_path.parent / similarity.EMBEDDING_IDS_FILE).write_text(json.dumps(list(range(1, 30))))
+    routes.catalog_cache.reload()
+
+    body = client.get("/hoodies/1/similar", params={"k": 4, "fields": "id"}).json()
+    assert len(body["items"]) == len(body["scores"]) == 4
+    assert {"id": "1"} not in body["items"]
+    assert client.get("/hoodies/30/similar").status_code == 404
+    assert client.get("/hoodies/999/similar").status_code == 404
@@ -0,0 +1,204 @@
+import gzip
+import json
+
+import pytest
+
+from app.catalog import Catalog
+from app.sqlite_catalog import SqliteCatalog
+from app.sqlite_store import connect, data_version, import_json, upsert_hoodies
+from tests.conftest import make_items, write_catalog
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = connect(str(tmp_path / "hoodies.db"))
+    yield conn
+    conn.close()
+
+
+def ids(catalog):
+    return [item["id"] for item in json.loads(catalog.full_body()[0])]
+
+
+def test_sqlite_matches_json_catalog(conn):
+    items = make_items(25)
+    upsert_hoodies(conn, items)
+    json_catalog, sqlite_catalog = Catalog(items), SqliteCatalog(conn)
+
+    assert len(sqlite_catalog) == len(json_catalog)
+    assert sqlite_catalog.fields == json_catalog.fields
+    fields = ["id", "original_image_url", "ai_image_url"]
+    for projection in (None, fields, ["name"]):
+        assert json.loads(sqlite_catalog.full_body(projection)[0]) == json.loads(json_catalog.full_body(projection)[0])
+        assert json.loads(sqlite_catalog.page(5, 15, projection)) == json.loads(json_catalog.page(5, 15, projection))
+        assert json.loads(sqlite_catalog.select([7, 2, 20], projection)) == json.loads(json_catalog.select([7, 2, 20], projection))
+        assert json.loads(sqlite_catalog.row(3, projection)) == json.loads(json_catalog.row(3, projection))
+
+    for query in ({"tags": ["animals"]}, {"source": "redbubble"}, {"min_price": 30, "max_price": 40}):
+        assert sqlite_catalog.index.query(**query) == json_catalog.index.query(**query)
+    assert sqlite_catalog.index.position("10") == json_catalog.index.position("10") == 9
+    assert sqlite_catalog.index.position("missing") is None
+
+
+def test_upsert_keeps_positions_and_appends(conn):
+    upsert_hoodies(conn, make_items(5))
+    changed = make_items(7)
+    changed[0]["name"] = "Renamed"
+    upsert_hoodies(conn, [changed[6], changed[0], changed[5]])
+
+    catalog = SqliteCatalog(conn)
+    assert ids(catalog) == ["1", "2", "3", "4", "5", "7", "6"]
+    assert json.loads(catalog.row(0))["name"] == "Renamed"
+
+
+def test_prune_deletes_missing_ids_and_repacks(conn):
+    upsert_hoodies(conn, make_items(6))
+    kept = [item for item in make_items(6) if item["id"] not in ("2", "5")]
+    upsert_hoodies(conn, kept, prune=True)
+
+    catalog = SqliteCatalog(conn)
+    assert ids(catalog) == ["1", "3", "4", "6"]
+    assert catalog.index.position("6") == 3
+    assert catalog.index.position("2") is None
+    assert json.loads(catalog.select(catalog.index.query(tags=["animals"])))[0]["id"] == "3"
+    positions, _, total = catalog.search.search("design number 6")
+    assert total >= 1 and json.loads(catalog.row(positions[0]))["id"] == "6"
+    (tag_rows,) = conn.execute("SELECT COUNT(*) FROM hoodie_tags").fetchone()
+    assert tag_rows == 4
+
+
+def test_import_json_replaces_catalog(tmp_path):
+    json_path, db_path = tmp_path / "hoodies.json", tmp_path / "hoodies.db"
+    write_catalog(json_path, make_items(10))
+    import_json(str(db_path), str(json_path))
+    write_catalog(json_path, make_items(4))
+    import_json(str(db_path), str(json_path))
+
+    conn = connect(str(db_path), readonly=True)
+    try:
+        assert ids(SqliteCatalog(conn)) == ["1", "2", "3", "4"]
+    finally:
+        conn.close()
+
+
+def test_version_follows_imports(conn):
+    upsert_hoodies(conn, make_items(3))
+    catalog = SqliteCatalog(conn)
+    before = catalog.version
+    upsert_hoodies(conn, make_items(4))
+    assert catalog.version != before == str(data_version(conn) - 1)
+
+
+def test_compressed_body_matches_latest_rows(conn):
+    upsert_hoodies(conn, make_items(3))
+    catalog = SqliteCatalog(conn)
+    body, _ = catalog.full_body()
+    assert gzip.decompress(catalog.compressed_body(None, "gzip")) == body
+
+    upsert_hoodies(conn, make_items(5))
+    assert len(json.loads(gzip.decompress(catalog.compressed_body(None, "gzip")))) == 5
+
+
+def test_full_bodies_are_cached_per_data_version(conn, monkeypatch):
+    upsert_hoodies(conn, make_items(3))
+    catalog = SqliteCatalog(conn)
+    reads = []
+    page = catalog.page
+    monkeypatch.setattr(catalog, "page", lambda *args: reads.append(args) or page(*args))
+
+    first = catalog.full_body()
+    zipped = catalog.compressed_body(None, "gzip")
+    assert catalog.full_body() is first
+    assert catalog.compressed_body(None, "gzip") is zipped
+    assert len(reads) == 1
+
+    upsert_hoodies(conn, make_items(4))
+    assert len(json.loads(catalog.full_body()[0])) == 4
+    assert len(reads) == 2
+
+
+def test_routes_query_sqlite_off_the_event_loop(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.api import routes
+    from app.main import app
+    from app.sqlite_catalog import SqliteCatalogStore
+
+    db_path = tmp_path / "hoodies.db"
+    writer = connect(str(db_path))
+    upsert_hoodies(writer, make_items(30))
+    writer.close()
+    monkeypatch.setattr(routes, "catalog_cache", SqliteCatalogStore(str(db_path)))
+
+    calls = []
+    real = routes.run_in_threadpool
+
+    async def recording(func, *args):
+        calls.append(func.__name__)
+        return await real(func, *args)
+
+    monkeypatch.setattr(routes, "run_in_threadpool", recording)
+    client = TestClient(app)
+    for url, expected in (
+        ("/hoodies", "list_body"),
+        ("/hoodies?limit=5", "list_body"),
+        ("/hoodies/4", "hoodie_body"),
+        ("/search?q=animals", "search_body"),
+        ("/pairs/next", "sample_pair"),
+    ):
+        calls.clear()
+        assert client.get(url).status_code == 200
+        assert expected in calls
+    assert client.get("/hoodies/999").status_code == 404
+    assert client.get("/hoodies?fields=nope").status_code == 400
+
+
+def written_statements(conn, func):
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        func()
+    finally:
+        conn.set_trace_callback(None)
+    return [s for s in statements if s.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE"))]
+
+
+def test_resync_of_unchanged_catalog_writes_nothing(conn):
+    items = make_items(8)
+    assert upsert_hoodies(conn, items) == 8
+    before = data_version(conn)
+
+    assert written_statements(conn, lambda: upsert_hoodies(conn, items, prune=True)) == []
+    assert data_version(conn) == before
+
+
+def test_upsert_rewrites_only_changed_rows(conn):
+    upsert_hoodies(conn, make_items(8))
+    changed = make_items(8)
+    changed[2]["tags"] = ["space"]
+
+    statements = written_statements(conn, lambda: upsert_hoodies(conn, changed, prune=True))
+    assert sum(s.startswith("UPDATE hoodies ") for s in statements) == 1
+    assert sum("hoodies_fts" in s for s in statements) == 2  # delete + insert for the one row
+    assert not any(s.startswith("UPDATE hoodies SET pos") for s in statements)
+
+    catalog = SqliteCatalog(conn)
+    assert catalog.index.query(tags=["space"]) == [2]
+    positions, _, _ = catalog.search.search("space")
+    assert list(positions) == [2]
+
+
+def test_reload_of_corrupt_database_raises_value_error(tmp_path):
+    from app.sqlite_catalog import SqliteCatalogStore
+
+    db_path = tmp_path / "hoodies.db"
+    writer = connect(str(db_path))
+    upsert_hoodies(writer, make_items(3))
+    writer.close()
+    store = SqliteCatalogStore(str(db_path))
+    old = store.get()
+
+    db_path.write_bytes(b"not a database" * 100)
+    with pytest.raises(ValueError):
+        store.reload()
+    assert store.get() is old
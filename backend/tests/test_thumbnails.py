@@ -0,0 +1,123 @@
+import asyncio
+import io
+import os
+import threading
+import urllib.request
+
+import pytest
+from PIL import Image
+
+from app.api import routes
+from app.thumbnails import ThumbnailService
+from tests.conftest import make_items, write_catalog
+
+
+def save_image(path, color):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", (800, 600), color).save(path, "JPEG")
+
+
+@pytest.fixture
+def images(tmp_path, monkeypatch):
+    image_dir = tmp_path / "images"
+    save_image(image_dir / "original" / "1.jpg", "red")
+    service = ThumbnailService(str(image_dir), str(tmp_path / "thumbs"), 10 * 1024 * 1024)
+    monkeypatch.setattr(routes, "thumbnails", service)
+    return image_dir
+
+
+def pixel(body):
+    with Image.open(io.BytesIO(body)) as img:
+        return img.convert("RGB").getpixel((0, 0))
+
+
+def test_thumbnail_is_resized_and_revalidates(client, images):
+    response = client.get("/images/original/1?w=160&format=jpeg")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/jpeg"
+    with Image.open(io.BytesIO(response.content)) as img:
+        assert img.size == (160, 120)
+
+    etag = response.headers["etag"]
+    again = client.get("/images/original/1?w=160&format=jpeg", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+
+
+def bump_mtime(path):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_changed_source_image_regenerates_thumbnail(client, images):
+    first = client.get("/images/original/1?w=160&format=jpeg")
+    assert pixel(first.content)[0] > 200
+
+    # Same id, same URL, new image; the catalog doesn't change
+    save_image(images / "original" / "1.jpg", "blue")
+    bump_mtime(images / "original" / "1.jpg")
+
+    second = client.get("/images/original/1?w=160&format=jpeg", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 200
+    assert second.headers["etag"] != first.headers["etag"]
+    assert pixel(second.content)[2] > 200
+
+
+def test_new_catalog_version_keeps_thumbnail(client, images, catalog_path):
+    first = client.get("/images/original/1?w=160&format=jpeg")
+    items = make_items(30)
+    items[0]["caption"] = "recaptioned"
+    write_catalog(catalog_path, items)
+    bump_mtime(catalog_path)
+    routes.catalog_cache.reload()
+
+    again = client.get("/images/original/1?w=160&format=jpeg", headers={"If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
+
+
+def test_cache_hits_are_read_off_the_event_loop(tmp_path, images):
+    service = ThumbnailService(str(images), str(tmp_path / "thumbs"), 10 * 1024 * 1024)
+    url = "https://example.com/original/1.jpg"
+    readers = []
+    real_get = service.cache.get
+
+    def get(key):
+        readers.append(threading.get_ident())
+        return real_get(key)
+
+    service.cache.get = get
+
+    async def run():
+        key = await service.key_for("original", url, 160, "jpeg")
+        await service.get(key, "original", url, 160, "jpeg")
+        assert await service.get(key, "original", url, 160, "jpeg")
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+    assert len(readers) == 2 and loop_thread not in readers
+
+
+def test_remote_source_is_keyed_on_its_validator(tmp_path, monkeypatch):
+    service = ThumbnailService(str(tmp_path / "images"), str(tmp_path / "thumbs"), 1024, check_interval=0)
+    validators = iter(['"v1"', '"v1"', '"v2"'])
+
+    class Head:
+        def __init__(self):
+            self.headers = {"ETag": next(validators)}
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+    url = "https://example.com/original/1.jpg"
+    monkeypatch.setattr(urllib.request, "urlopen", lambda request, timeout: Head())
+    first = service.variant_key(service.source_identity("original", url), 160, "jpeg")
+    same = service.variant_key(service.source_identity("original", url), 160, "jpeg")
+    changed = service.variant_key(service.source_identity("original", url), 160, "jpeg")
+    assert first == same != changed
+
+
+def test_bad_width_and_unknown_hoodie(client, images):
+    assert client.get("/images/original/1?w=123").status_code == 400
+    assert client.get("/images/original/999").status_code == 404
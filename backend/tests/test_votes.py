@@ -0,0 +1,111 @@
+import asyncio
+import json
+import os
+
+from app import votes
+from app.votes import VoteStore
+
+
+def totals(store):
+    return {k: list(v) for k, v in store.counts.items()}
+
+
+def reopen(directory):
+    store = VoteStore(str(directory))
+    store.load()
+    return store
+
+
+def test_votes_survive_restart(tmp_path):
+    async def run():
+        store = VoteStore(str(tmp_path))
+        await store.submit([("1", "ai"), ("1", "original"), ("2", "ai")])
+        await store.close()
+
+    asyncio.run(run())
+    assert totals(reopen(tmp_path)) == {"1": [1, 1], "2": [0, 1]}
+
+
+def test_two_workers_sharing_a_directory_keep_every_vote(tmp_path):
+    async def run():
+        a, b = VoteStore(str(tmp_path)), VoteStore(str(tmp_path))
+        await a.start()
+        await b.start()
+        for i in range(4):
+            await a.submit([("1", "ai")])
+            await b.submit([("1", "original" if i % 2 else "ai")])
+        await a.close()
+        await b.close()
+
+    asyncio.run(run())
+    assert totals(reopen(tmp_path)) == {"1": [2, 6]}
+    # And again, now that both segments were folded into the snapshot
+    assert totals(reopen(tmp_path)) == {"1": [2, 6]}
+
+
+def test_live_worker_segment_is_replayed_not_folded(tmp_path):
+    async def run():
+        live = VoteStore(str(tmp_path))
+        await live.submit([("1", "ai"), ("2", "ai")])
+
+        # A worker starting meanwhile sees the votes but leaves the segment alone
+        other = reopen(tmp_path)
+        assert totals(other) == {"1": [0, 1], "2": [0, 1]}
+        assert os.path.exists(tmp_path / live.segment)
+
+        await live.submit([("2", "original")])
+        await live.close()
+        await other.close()
+
+    asyncio.run(run())
+    assert totals(reopen(tmp_path)) == {"1": [0, 1], "2": [1, 1]}
+
+
+def test_compaction_folds_segment_into_snapshot(tmp_path):
+    async def run():
+        store = VoteStore(str(tmp_path), compact_every=2)
+        await store.start()
+        await store.submit([("1", "ai"), ("1", "ai"), ("2", "original")])
+        first = store.segment
+        await store._compact()
+        assert not os.path.exists(tmp_path / first)
+        await store.submit([("2", "ai")])
+        await store.close()
+
+    asyncio.run(run())
+    with open(tmp_path / "snapshot.json", encoding="utf-8") as f:
+        assert json.load(f)["counts"] == {"1": [0, 2], "2": [1, 0]}
+    assert totals(reopen(tmp_path)) == {"1": [0, 2], "2": [1, 1]}
+
+
+def test_torn_last_record_is_skipped(tmp_path):
+    async def run():
+        store = VoteStore(str(tmp_path))
+        await store.submit([("1", "ai")])
+        os.write(store._fd, b'{"hoodie_id":"1","cho')
+        await store.close()
+
+    asyncio.run(run())
+    assert totals(reopen(tmp_path)) == {"1": [0, 1]}
+
+
+def test_segments_are_folded_without_fcntl(tmp_path, monkeypatch):
+    monkeypatch.setattr(votes, "fcntl", None)
+
+    async def run():
+        # Left open, as by a worker that crashed
+        crashed = VoteStore(str(tmp_path))
+        await crashed.submit([("1", "ai"), ("2", "original")])
+        crashed._task.cancel()
+
+        store = reopen(tmp_path)
+        assert totals(store) == {"1": [0, 1], "2": [1, 0]}
+        assert not os.path.exists(tmp_path / crashed.segment)
+        assert os.listdir(tmp_path).count(store.segment) == 1
+        await store.close()
+        os.close(crashed._fd)
+
+    asyncio.run(run())
+    segments = [name for name in os.listdir(tmp_path) if name.startswith("votes-")]
+    assert totals(reopen(tmp_path)) == {"1": [0, 1], "2": [1, 0]}
+    assert not any(os.path.exists(tmp_path / name) for name in segments)
@@ -2,6 +2,7 @@ import { Link } from "react-router-dom";
 import { Card, CardContent } from "@/components/ui/card";
 import { Badge } from "@/components/ui/badge";
 import { HoodiePair } from "@/types/hoodie";
+import { getThumbnailSrcSet } from "@/services/api";
 import { ExternalLink } from "lucide-react";
 
 interface HoodieCardProps {
@@ -15,6 +16,10 @@ export const HoodieCard = ({ hoodie }: HoodieCardProps) => {
   // Randomly choose between original and AI image for display
   const showOriginal = Math.random() < 0.5;
   const displayImage = showOriginal ? hoodie.original_image_url : hoodie.ai_image_url;
+  // Fallback data isn't in the backend's catalog, so it has no thumbnails
+  const thumbnailSrcSet = hoodie.fromBackend
+    ? getThumbnailSrcSet(hoodie.id, showOriginal ? "original" : "ai")
+    : undefined;
 
   return (
     <Link to={`/hoodie/${hoodie.id}`} className="group">
@@ -22,6 +27,9 @@ export const HoodieCard = ({ hoodie }: HoodieCardProps) => {
         <div className="aspect-[3/4] overflow-hidden">
           <img
             src={displayImage}
+            srcSet={thumbnailSrcSet}
+            sizes="(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw"
+            loading="lazy"
             alt={hoodie.name}
             className="w-full h-full object-cover transition-transform duration-500 group-hover:scale-110"
           />
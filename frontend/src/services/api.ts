@@ -58,6 +58,18 @@ export const getImageUrl = (imageUrl: string): string => {
   return imageUrl;
 };
 
+// Widths the backend's /images endpoint serves thumbnails at
+const THUMBNAIL_WIDTHS = [320, 640];
+
+export const getThumbnailSrcSet = (hoodieId: string, kind: "original" | "ai"): string | undefined => {
+  if (!BACKEND_URL) {
+    return undefined;
+  }
+  return THUMBNAIL_WIDTHS
+    .map((width) => `${BACKEND_URL}/images/${kind}/${hoodieId}?w=${width} ${width}w`)
+    .join(", ");
+};
+
 export const processHoodiesData = async (hoodies: BackendHoodie[]): Promise<HoodiePair[]> => {
   // Get real vote data from Supabase
   const voteDataArray = await getAllVoteData();
@@ -85,7 +97,8 @@ export const processHoodiesData = async (hoodies: BackendHoodie[]): Promise<Hood
       votes: {
         original: voteData?.votes_original || 0,
         ai: voteData?.votes_ai || 0
-      }
+      },
+      fromBackend: !mockBackendData.includes(hoodie)
     };
     
     hoodiePairs.push(hoodiePair);
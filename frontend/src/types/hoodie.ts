@@ -24,4 +24,6 @@ export interface HoodiePair {
     original: number;
     ai: number;
   };
+  // False for the built-in fallback data, which the backend can't serve thumbnails for
+  fromBackend?: boolean;
 }
\ No newline at end of file